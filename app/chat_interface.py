@@ -114,6 +114,13 @@ def display_stats(engine):
             st.sidebar.markdown("**Ocean Regions:**")
             for region, count in stats.get('regions', {}).items():
                 st.sidebar.markdown(f"- {region}: {count:,} profiles")
+        
+        index = stats.get('index')
+        if index:
+            st.sidebar.caption(
+                f"Index catalogue (selected for download, not all loaded yet): "
+                f"{index['profile_count']:,} profiles from {index['float_count']:,} floats, {index['date_range']}"
+            )
                 
     except Exception as e:
         st.sidebar.error(f"Failed to load stats: {e}")
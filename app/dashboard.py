@@ -511,6 +511,52 @@ def render_header():
     """, unsafe_allow_html=True)
 
 
+@st.cache_data(ttl=3600)
+def get_index_stats():
+    """Index statistics sidecar written by download_index.py (None if missing)"""
+    from src.data.index_stats import load_index_statistics
+    return load_index_statistics()
+
+
+@st.cache_data(ttl=3600)
+def get_region_climatology(max_pressure=100):
+    """
+    Upper-ocean (standard levels <= max_pressure dbar) climatological means per
+    region from the climatology cube: {'Pacific': {'Temperature': ..., 'Salinity': ...}}
+    (None if the cube has not been built)
+    """
+    from src.data.climatology import open_climatology
+    cube = open_climatology()
+    if cube is None:
+        return None
+    means = {}
+    with cube:
+        for region in cube.regions:
+            values = {}
+            for parameter in ['temperature', 'salinity']:
+                stats = cube.region_stats(region, parameter)
+                stats = stats[(stats['pressure'] <= max_pressure) & (stats['count'] > 0)]
+                if not stats.empty:
+                    values[parameter.title()] = (stats['mean'] * stats['count']).sum() / stats['count'].sum()
+            means[region.split()[0]] = values
+    return means
+
+
+@st.cache_data(ttl=600)
+def get_profile_density(resolution=3):
+    """
+    Loaded profiles per H3 cell (grouped on the precomputed cell ids, see
+    src/data/spatial.py); None if the database is unavailable or empty
+    """
+    try:
+        from src.database.connection import engine
+        from src.data.spatial import profile_density
+        density = profile_density(engine, resolution=resolution)
+    except Exception:
+        return None
+    return density if not density.empty else None
+
+
 def render_stat_cards():
     """Render premium stat cards"""
     col1, col2, col3, col4 = st.columns(4)
@@ -522,6 +568,14 @@ def render_stat_cards():
         ("5", "Ocean Regions", "🌍")
     ]
     
+    # Catalogue counts from the index statistics sidecar when available: profiles
+    # selected for download, not what has been loaded into the database
+    index_stats = get_index_stats()
+    if index_stats:
+        stats[0] = (f"{index_stats['float_count']:,}", "Floats in Index", "🎈")
+        stats[1] = (f"{index_stats['profile_count']:,}", "Profiles in Index", "🌊")
+        stats[3] = (f"{len(index_stats['per_grid_cell']):,}", "1° Cells in Index", "🌍")
+    
     for col, (number, label, icon) in zip([col1, col2, col3, col4], stats):
         with col:
             st.markdown(f"""
@@ -556,6 +610,16 @@ def render_overview_tab():
             'Avg Temp (°C)': [19.5, 17.2, 22.1, 2.5, -1.2]
         })
         
+        # Upper 100 dbar climatology; regions without cube data stay empty
+        climatology = get_region_climatology()
+        if climatology:
+            st.caption("Upper 100 dbar climatology from the ARGO cube (empty: no data for that region)")
+            df['Avg Temp (°C)'] = [
+                climatology.get(ocean, {}).get('Temperature', np.nan) for ocean in df['Ocean']
+            ]
+        else:
+            st.caption("Sample values: build the climatology cube to show measured means")
+        
         fig = px.bar(df, x='Ocean', y='Avg Temp (°C)',
                      color='Avg Temp (°C)',
                      color_continuous_scale=['#6366f1', '#8b5cf6', '#ec4899'])
@@ -575,11 +639,19 @@ def render_overview_tab():
         st.markdown('<div class="content-card">', unsafe_allow_html=True)
         st.markdown('<div class="section-subheader">📈 Profile Collection Trends</div>', unsafe_allow_html=True)
         
-        dates = pd.date_range('2023-01-01', '2024-12-31', freq='M')
-        df_time = pd.DataFrame({
-            'Date': dates,
-            'Profiles': [1000 + i*100 + np.random.randint(-50, 50) for i in range(len(dates))]
-        })
+        index_stats = get_index_stats()
+        if index_stats and index_stats['per_month']:
+            st.caption("Profiles per month in the filtered index catalogue")
+            df_time = pd.DataFrame({
+                'Date': pd.to_datetime(list(index_stats['per_month'].keys())),
+                'Profiles': list(index_stats['per_month'].values())
+            })
+        else:
+            dates = pd.date_range('2023-01-01', '2024-12-31', freq='M')
+            df_time = pd.DataFrame({
+                'Date': dates,
+                'Profiles': [1000 + i*100 + np.random.randint(-50, 50) for i in range(len(dates))]
+            })
         
         fig = px.area(df_time, x='Date', y='Profiles')
         fig.update_traces(
@@ -769,6 +841,17 @@ def render_analytics_tab():
         'Value': [19.5, 17.2, 22.1, 2.5, -1.2, 34.8, 35.2, 35.5, 34.2, 32.1]
     })
     
+    # Upper 100 dbar climatology; regions without cube data stay empty
+    climatology = get_region_climatology()
+    if climatology:
+        st.caption("Upper 100 dbar climatology from the ARGO cube (empty: no data for that region)")
+        df_compare['Value'] = [
+            climatology.get(ocean, {}).get(metric, np.nan)
+            for ocean, metric in zip(df_compare['Ocean'], df_compare['Metric'])
+        ]
+    else:
+        st.caption("Sample values: build the climatology cube to show measured means")
+    
     fig = px.bar(df_compare, x='Ocean', y='Value', color='Metric',
                  barmode='group',
                  color_discrete_sequence=['#6366f1', '#ec4899'])
@@ -789,6 +872,23 @@ def render_map_tab():
     st.markdown('<div class="section-header">🗺️ Global Ocean Map</div>', unsafe_allow_html=True)
     
     st.markdown('<div class="content-card">', unsafe_allow_html=True)
+    
+    density = get_profile_density()
+    if density is not None:
+        st.caption("Loaded profiles per H3 cell (resolution 3)")
+        fig = px.scatter_geo(density, lat='latitude', lon='longitude',
+                             size='profiles', color='profiles',
+                             hover_data={'h3_cell': True, 'floats': True},
+                             color_continuous_scale=['#6366f1', '#8b5cf6', '#ec4899'])
+        fig.update_layout(
+            paper_bgcolor='rgba(255,255,255,0)',
+            font=dict(family='Inter', color='#334155'),
+            margin=dict(l=0, r=0, t=20, b=0)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    
     st.info("🌍 **Interactive Map**: ARGO float locations across all ocean regions will be displayed here once data is loaded. The map will show real-time positions, trajectories, and data collection points.")
     
     # Sample map
@@ -0,0 +1,132 @@
+"""
+Climatology Answers
+Answers 'average <parameter> in <region> [in <month/season>] [at <depth>]'
+questions from the climatology cube instead of scanning argo_measurements.
+
+Anything else in the question (float ids, years, 'recent' or 'last N months',
+coordinates, comparisons) is left to the SQL path.
+"""
+
+import re
+import calendar
+import pandas as pd
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.ai.query_examples import OCEAN_REGIONS, METRICS, QUERY_PATTERNS, TIME_PERIODS
+from src.data.climatology import open_climatology
+
+MONTH_NAMES = {name.lower(): month for month, name in enumerate(calendar.month_name) if name}
+DEPTH_UNITS = r"(?:m|meters?|metres?|dbar|db)\b"
+DEPTH_PATTERN = re.compile(rf"(\d+(?:\.\d+)?)\s*{DEPTH_UNITS}")
+AVERAGE_PATTERN = re.compile(rf"\b(?:{'|'.join(QUERY_PATTERNS['average'])})\b")
+REGION_WORDS = {name.split()[0].lower(): name for name in OCEAN_REGIONS}
+REGION_PATTERN = re.compile(rf"\b({'|'.join(REGION_WORDS)})\b")
+PARAMETER_PATTERN = re.compile(r"\b(temperature|salinity)\b")
+PERIODS = {**TIME_PERIODS, **{name: [month] for name, month in MONTH_NAMES.items()}}
+# 'may' only counts as the month after a preposition ("in May", not "what may ...")
+PERIOD_PATTERN = re.compile(
+    rf"\b({'|'.join(word for word in PERIODS if word != 'may')})\b|\b(?:in|during|of|for)\s+(may)\b"
+)
+# Words a cube question may contain besides its region, parameter, period and depth
+FILLER_WORDS = {
+    "what", "whats", "s", "is", "was", "the", "a", "an", "of", "in", "at", "during", "for", "and",
+    "ocean", "water", "waters", "sea", "surface", "depth", "level", "month", "season",
+    "climatological", "typical", "overall", "value", "tell", "me", "give", "show", "please",
+    "can", "you", "celsius", "psu",
+}
+
+
+def _take(pattern, text):
+    """Matches of pattern (its matching group if it has one) and the text with them blanked"""
+    matches = [m.group(m.lastindex or 0) for m in pattern.finditer(text)]
+    return matches, pattern.sub(" ", text)
+
+
+def parse_climatology_question(question):
+    """
+    Region, parameter, months and depth of a question the cube can answer
+
+    Returns:
+        (region, parameter, months or None, depth match or None), or None when
+        the question asks for more than one regional average
+    """
+    q = question.lower()
+    depths, rest = _take(DEPTH_PATTERN, q)
+    depth = DEPTH_PATTERN.search(q)
+    averages, rest = _take(AVERAGE_PATTERN, rest)
+    regions, rest = _take(REGION_PATTERN, rest)
+    parameters, rest = _take(PARAMETER_PATTERN, rest)
+    periods, rest = _take(PERIOD_PATTERN, rest)
+
+    if not averages or len(set(regions)) != 1 or len(set(parameters)) != 1 or len(depths) > 1:
+        return None
+    # Numbers (float ids, years, coordinates) and any other words need SQL
+    if set(re.findall(r"[a-z]+|\d+", rest)) - FILLER_WORDS:
+        return None
+
+    months = sorted({month for word in periods for month in PERIODS[word]}) or None
+    return REGION_WORDS[regions[0]], parameters[0], months, depth
+
+
+def answer_from_climatology(question):
+    """
+    Answer a regional average question from the climatology cube
+
+    Returns:
+        process_question-style result dict, or None when the question needs
+        SQL or the cube has no data for it
+    """
+    parsed = parse_climatology_question(question)
+    if parsed is None:
+        return None
+    region, parameter, months, depth = parsed
+
+    # Opened per question: the pipeline swaps in a new cube after each update
+    cube = open_climatology()
+    if cube is None:
+        return None
+    with cube:
+        stats = cube.region_stats(region, parameter, months=months)
+    stats = stats[stats["count"] > 0]
+    if stats.empty:
+        return None
+    if depth:
+        row = stats.iloc[(stats["pressure"] - float(depth.group(1))).abs().argmin()]
+    else:
+        row = stats.iloc[0]  # Shallowest level with data
+
+    unit = METRICS[parameter]["unit"]
+    period = f" ({', '.join(calendar.month_abbr[m] for m in months)})" if months else ""
+    spread = f"standard deviation {row['std']:.2f} {unit}, " if row["count"] > 1 else ""
+    response = (
+        f"The climatological mean {parameter} in the {region} at {row['pressure']:g} dbar{period} "
+        f"is {row['mean']:.2f} {unit} ({spread}from {int(row['count']):,} standard-level values)."
+    )
+    if depth and row["pressure"] != float(depth.group(1)):
+        response += (
+            f" There is no standard-level data at {depth.group(0)}, so this is the nearest standard level "
+            f"with data ({row['pressure']:g} dbar)."
+        )
+
+    data = [{
+        "region": region,
+        "parameter": parameter,
+        "pressure": float(row["pressure"]),
+        "requested_pressure": float(depth.group(1)) if depth else None,
+        "count": int(row["count"]),
+        "mean": float(row["mean"]),
+        "std": None if pd.isna(row["std"]) else float(row["std"]),
+    }]
+    logger.success(f"Answered from the climatology cube: {region}, {parameter}, {row['pressure']:g} dbar")
+    return {
+        "success": True,
+        "question": question,
+        "sql": None,
+        "data": data,
+        "response": response,
+        "row_count": len(data)
+    }
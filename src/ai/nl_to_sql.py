@@ -31,8 +31,10 @@ class NLToSQLConverter:
 
 DATABASE SCHEMA:
 - argo_floats: float_id, platform_type, status
-- argo_profiles: profile_id, float_id, latitude, longitude, location (PostGIS), date, ocean_region, n_levels
+- argo_profiles: profile_id, float_id, latitude, longitude, location (PostGIS), date, n_levels, h3_index_res7, h3_index_res5, h3_index_res3 (H3 cells of the position)
 - argo_measurements: profile_id, level, pressure, temperature, salinity, temperature_qc, salinity_qc, pressure_qc
+- ocean_region_cells: region_name, h3_index_res3 (H3 cells covering each region)
+- argo_summaries: profile_id, mixed_layer_depth, thermocline_depth, max_depth, surface_temperature, surface_salinity, mean_temperature, mean_salinity, temperature_range, salinity_range, profile_quality_score, measurement_count
 
 OCEAN REGIONS:
 - Pacific Ocean
@@ -48,9 +50,11 @@ QUALITY CONTROL:
 IMPORTANT RULES:
 1. Always JOIN argo_profiles and argo_measurements when querying measurements
 2. Always filter by QC flags (temperature_qc = '1', salinity_qc = '1')
-3. Use ocean_region column for region filtering
+3. Filter regions with JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3 and c.region_name = '<region>'; never use geometry functions
 4. Pressure in dbar ≈ depth in meters
-5. Return only the SQL query, no explanations
+5. Use argo_summaries (JOIN argo_profiles) for per-profile statistics such as surface values, means or mixed layer depth
+6. For maps, heatmaps or spatial density, GROUP BY an H3 column (h3_index_res5 by default)
+7. Return only the SQL query, no explanations
 
 EXAMPLE QUERIES:
 """
@@ -15,13 +15,30 @@ QUERY_EXAMPLES = [
         "sql": """
             SELECT AVG(m.temperature) as avg_temp
             FROM argo_profiles p
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
             JOIN argo_measurements m ON p.profile_id = m.profile_id
-            WHERE p.ocean_region = 'Pacific Ocean'
+            WHERE c.region_name = 'Pacific Ocean'
               AND m.temperature IS NOT NULL
               AND m.temperature_qc = '1';
         """,
         "explanation": "Calculate average temperature from all measurements in Pacific Ocean with good quality control"
     },
+    {
+        "question": "What is the average surface temperature and mixed layer depth in the Indian Ocean?",
+        "intent": "statistical_query",
+        "region": "Indian Ocean",
+        "metric": "temperature",
+        "aggregation": "average",
+        "sql": """
+            SELECT AVG(s.surface_temperature) as avg_surface_temp,
+                   AVG(s.mixed_layer_depth) as avg_mixed_layer_depth
+            FROM argo_summaries s
+            JOIN argo_profiles p ON s.profile_id = p.profile_id
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
+            WHERE c.region_name = 'Indian Ocean';
+        """,
+        "explanation": "Per-profile statistics come precomputed (from good quality data) in argo_summaries, one row per profile"
+    },
     {
         "question": "Show me all floats in the Indian Ocean",
         "intent": "data_retrieval",
@@ -30,12 +47,28 @@ QUERY_EXAMPLES = [
             SELECT DISTINCT f.float_id, COUNT(p.profile_id) as profile_count
             FROM argo_floats f
             JOIN argo_profiles p ON f.float_id = p.float_id
-            WHERE p.ocean_region = 'Indian Ocean'
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
+            WHERE c.region_name = 'Indian Ocean'
             GROUP BY f.float_id
             ORDER BY profile_count DESC;
         """,
         "explanation": "List all unique floats that have profiles in the Indian Ocean"
     },
+    {
+        "question": "Show a heatmap of profile density in the Indian Ocean",
+        "intent": "spatial_aggregation",
+        "region": "Indian Ocean",
+        "sql": """
+            SELECT p.h3_index_res5 as h3_cell,
+                   COUNT(*) as profile_count
+            FROM argo_profiles p
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
+            WHERE c.region_name = 'Indian Ocean'
+            GROUP BY p.h3_index_res5
+            ORDER BY profile_count DESC;
+        """,
+        "explanation": "Group profiles by their precomputed H3 cell (res 5, ~250 km²) instead of testing geometries"
+    },
     {
         "question": "What was the temperature in summer 2023?",
         "intent": "temporal_query",
@@ -62,16 +95,17 @@ QUERY_EXAMPLES = [
         "metric": "salinity",
         "sql": """
             SELECT 
-                p.ocean_region,
+                c.region_name,
                 AVG(m.salinity) as avg_salinity,
                 STDDEV(m.salinity) as std_salinity,
                 COUNT(*) as measurement_count
             FROM argo_profiles p
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
             JOIN argo_measurements m ON p.profile_id = m.profile_id
-            WHERE p.ocean_region IN ('Atlantic Ocean', 'Pacific Ocean')
+            WHERE c.region_name IN ('Atlantic Ocean', 'Pacific Ocean')
               AND m.salinity IS NOT NULL
               AND m.salinity_qc = '1'
-            GROUP BY p.ocean_region;
+            GROUP BY c.region_name;
         """,
         "explanation": "Compare average salinity and standard deviation between Atlantic and Pacific oceans"
     },
@@ -82,15 +116,16 @@ QUERY_EXAMPLES = [
         "metric": "temperature",
         "sql": """
             SELECT 
-                p.ocean_region,
+                c.region_name,
                 AVG(m.temperature) as avg_temp,
                 COUNT(*) as measurement_count
             FROM argo_profiles p
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
             JOIN argo_measurements m ON p.profile_id = m.profile_id
             WHERE m.pressure BETWEEN 950 AND 1050
               AND m.temperature IS NOT NULL
               AND m.temperature_qc = '1'
-            GROUP BY p.ocean_region
+            GROUP BY c.region_name
             ORDER BY avg_temp DESC;
         """,
         "explanation": "Find average temperature at approximately 1000m depth (950-1050 dbar pressure) by ocean region"
@@ -102,11 +137,12 @@ QUERY_EXAMPLES = [
         "sql": """
             SELECT 
                 COUNT(*) as total_profiles,
-                COUNT(DISTINCT float_id) as unique_floats,
-                ocean_region
-            FROM argo_profiles
-            WHERE EXTRACT(YEAR FROM date) = 2023
-            GROUP BY ocean_region
+                COUNT(DISTINCT p.float_id) as unique_floats,
+                c.region_name
+            FROM argo_profiles p
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
+            WHERE EXTRACT(YEAR FROM p.date) = 2023
+            GROUP BY c.region_name
             ORDER BY total_profiles DESC;
         """,
         "explanation": "Count total profiles and unique floats collected in 2023, grouped by ocean region"
@@ -122,7 +158,6 @@ QUERY_EXAMPLES = [
                 p.latitude,
                 p.longitude,
                 p.date,
-                p.ocean_region,
                 m.temperature,
                 m.pressure
             FROM argo_profiles p
@@ -165,8 +200,9 @@ QUERY_EXAMPLES = [
                 STDDEV(m.salinity) as std_salinity,
                 COUNT(*) as measurement_count
             FROM argo_profiles p
+            JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
             JOIN argo_measurements m ON p.profile_id = m.profile_id
-            WHERE p.ocean_region = 'Arctic Ocean'
+            WHERE c.region_name = 'Arctic Ocean'
               AND m.salinity IS NOT NULL
               AND m.salinity_qc = '1';
         """,
@@ -183,11 +219,10 @@ QUERY_EXAMPLES = [
                 p.latitude,
                 p.longitude,
                 p.date,
-                p.ocean_region,
                 MAX(m.pressure) as max_depth
             FROM argo_profiles p
             JOIN argo_measurements m ON p.profile_id = m.profile_id
-            GROUP BY p.profile_id, p.float_id, p.latitude, p.longitude, p.date, p.ocean_region
+            GROUP BY p.profile_id, p.float_id, p.latitude, p.longitude, p.date
             HAVING MAX(m.pressure) > 1500
             ORDER BY max_depth DESC
             LIMIT 100;
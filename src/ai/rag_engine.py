@@ -18,6 +18,8 @@ from src.utils.config import settings
 from src.database.connection import get_db_engine
 from src.ai.nl_to_sql import NLToSQLConverter
 from src.ai.query_examples import OCEAN_REGIONS, METRICS
+from src.ai.climatology_answers import answer_from_climatology
+from src.data.index_stats import OCEAN_NAMES, load_index_statistics
 
 
 class RAGQueryEngine:
@@ -37,6 +39,11 @@ class RAGQueryEngine:
         logger.info(f"Processing question: {question}")
         
         try:
+            # Regional averages come straight from the climatology cube
+            climatology_result = answer_from_climatology(question)
+            if climatology_result:
+                return climatology_result
+            
             # Step 1: Generate SQL query
             sql_result = self.nl_to_sql.generate_sql(question)
             
@@ -194,7 +201,14 @@ Response:"""
         return summary
     
     def get_database_stats(self):
-        """Get database statistics for context"""
+        """
+        Get database statistics for context
+        
+        Counts describe what is loaded in the database. The index statistics
+        sidecar, when present, is added under "index": the catalogue of
+        profiles selected for download, which can be far larger than what
+        has been downloaded and loaded so far.
+        """
         try:
             stats = {}
             
@@ -220,13 +234,26 @@ Response:"""
                 
                 # Regions
                 result = conn.execute(text("""
-                    SELECT ocean_region, COUNT(*) as count
-                    FROM argo_profiles
-                    GROUP BY ocean_region
+                    SELECT c.region_name, COUNT(*) as count
+                    FROM argo_profiles p
+                    JOIN ocean_region_cells c ON c.h3_index_res3 = p.h3_index_res3
+                    GROUP BY c.region_name
                     ORDER BY count DESC
                 """))
                 stats["regions"] = dict(result.fetchall())
             
+            index_stats = load_index_statistics()
+            if index_stats:
+                stats["index"] = {
+                    "float_count": index_stats["float_count"],
+                    "profile_count": index_stats["profile_count"],
+                    "date_range": f"{index_stats['date_min']} to {index_stats['date_max']}",
+                    "regions": {
+                        OCEAN_NAMES.get(code, code): count
+                        for code, count in index_stats["per_ocean"].items()
+                    },
+                }
+            
             return stats
             
         except Exception as e:
@@ -243,6 +270,11 @@ Response:"""
         # Handle greetings
         if any(word in message_lower for word in ["hi", "hello", "hey"]):
             stats = self.get_database_stats()
+            index = stats.get('index')
+            index_line = (
+                f"\n- Index catalogue: {index['profile_count']:,} profiles from {index['float_count']:,} floats "
+                f"selected for download" if index else ""
+            )
             return f"""Hello! I'm FloatChat, your AI assistant for ARGO ocean data.
 
 I have access to:
@@ -250,7 +282,7 @@ I have access to:
 - {stats.get('profile_count', 'N/A'):,} ocean profiles
 - {stats.get('measurement_count', 'N/A'):,} measurements
 - Data from {stats.get('date_range', 'N/A')}
-- Coverage: {', '.join(stats.get('regions', {}).keys())}
+- Coverage: {', '.join(stats.get('regions', {}).keys())}{index_line}
 
 What would you like to know about ARGO ocean data?"""
         
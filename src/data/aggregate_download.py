@@ -0,0 +1,147 @@
+"""
+ARGO Per-Float Aggregate Downloads
+Plans which floats to fetch as one GDAC `<wmo>_prof.nc` multi-profile file
+instead of one `*_NNN.nc` per cycle, based on how much of each float's
+history the selection covers
+"""
+
+import pandas as pd
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.data.index_filters import float_ids_from_files
+from src.data.index_store import INDEX_CSV_DTYPES
+
+COUNT_CHUNKSIZE = 500_000
+
+
+def get_aggregate_file(file_path):
+    """'aoml/2901234/profiles/R2901234_001.nc' -> 'aoml/2901234/2901234_prof.nc'"""
+    dac, wmo = file_path.split('/')[:2]
+    return f"{dac}/{wmo}/{wmo}_prof.nc"
+
+
+def is_aggregate_file(path):
+    """True for per-float multi-profile files"""
+    return Path(path).name.endswith('_prof.nc')
+
+
+def covered_by_aggregates(files, aggregates):
+    """
+    Boolean mask of single-profile files whose float is mirrored as an aggregate
+
+    Args:
+        files: Series of index paths
+        aggregates: Collection of `<wmo>_prof.nc` index paths (other paths ignored)
+    """
+    aggregates = {f for f in aggregates if is_aggregate_file(f)}
+    if not aggregates:
+        return pd.Series(False, index=files.index)
+    single = ~files.map(is_aggregate_file)
+    return single & files.map(get_aggregate_file).isin(aggregates)
+
+
+def route_changes_to_aggregates(changes, completed):
+    """
+    Send index changes of floats mirrored as `<wmo>_prof.nc` to that file
+
+    Such floats have no single-profile files locally: any added, updated or
+    deleted cycle re-fetches the aggregate instead, whose re-parse replaces
+    every profile it held.
+
+    Args:
+        changes: IndexChangeSet.changes rows ('change', 'file', 'date_update')
+        completed: Index paths already in the download manifest
+
+    Returns:
+        (aggregates, singles) - one 'file'/'date_update' row per aggregate to
+        re-fetch, and the change rows of all other floats
+    """
+    covered = covered_by_aggregates(changes['file'], completed)
+    aggregates = (
+        changes.loc[covered, ['file', 'date_update']]
+        .assign(file=lambda d: d['file'].map(get_aggregate_file))
+        .groupby('file', as_index=False)['date_update'].max()
+    )
+    if len(aggregates):
+        logger.info(f"Routing {int(covered.sum()):,} changes to {len(aggregates):,} per-float aggregate files")
+    return aggregates, changes.loc[~covered]
+
+
+def count_float_profiles(index_file):
+    """
+    Profiles per float in the raw (unfiltered) GDAC index
+
+    Only the 'file' column is read, in chunks, so this stays cheap on the
+    multi-million-row index.
+    """
+    counts = pd.Series(dtype='int64')
+    chunks = pd.read_csv(
+        index_file,
+        comment='#',
+        skipinitialspace=True,
+        usecols=['file'],
+        dtype={'file': INDEX_CSV_DTYPES['file']},
+        chunksize=COUNT_CHUNKSIZE
+    )
+    for chunk in chunks:
+        counts = counts.add(float_ids_from_files(chunk['file']).value_counts(), fill_value=0)
+    return counts.astype('int64')
+
+
+def plan_aggregate_downloads(df, total_counts, min_coverage=0.8, completed=()):
+    """
+    Split a selection into per-float aggregate files and single-profile files
+
+    A float is fetched as `<wmo>_prof.nc` when the selection holds at least
+    ``min_coverage`` of its profiles in the GDAC index and none of its
+    single-profile files is already downloaded (so no profile is parsed twice).
+    The aggregate also carries the float's unselected cycles; ``min_coverage``
+    bounds how many.
+
+    Args:
+        df: Selected index rows ('file', optional 'date_update' and 'priority')
+        total_counts: Series float_id -> profile count (count_float_profiles())
+        min_coverage: Fraction of a float's profiles that must be selected
+        completed: Index paths already in the download manifest
+
+    Returns:
+        (aggregates, singles) - DataFrames of 'file'/'date_update'/'priority' rows;
+        an aggregate row carries the latest date_update and best priority of
+        the float's selection
+    """
+    if 'date_update' not in df:
+        df = df.assign(date_update=pd.NaT)
+    if 'priority' not in df:
+        df = df.assign(priority=range(len(df)))
+    df = df[['file', 'date_update', 'priority']].assign(float_id=float_ids_from_files(df['file']).to_numpy())
+
+    selected = df.groupby('float_id').agg(
+        n_selected=('file', 'size'),
+        date_update=('date_update', 'max'),
+        priority=('priority', 'min'),
+        first_file=('file', 'first'),
+    )
+    coverage = selected['n_selected'] / total_counts.reindex(selected.index)
+
+    completed = set(completed)
+    already_single = df.loc[df['file'].isin(completed), 'float_id'].unique()
+
+    aggregate = (coverage >= min_coverage) & ~selected.index.isin(already_single)
+    aggregates = pd.DataFrame({
+        'file': [get_aggregate_file(f) for f in selected.loc[aggregate, 'first_file']],
+        'date_update': selected.loc[aggregate, 'date_update'].to_numpy(),
+        'priority': selected.loc[aggregate, 'priority'].to_numpy(),
+    })
+    singles = df.loc[~df['float_id'].isin(selected.index[aggregate]), ['file', 'date_update', 'priority']]
+
+    n_profiles = int(selected.loc[aggregate, 'n_selected'].sum())
+    logger.info(
+        f"Aggregate mode: {n_profiles:,} profiles from {len(aggregates):,} per-float files, "
+        f"{len(singles):,} single-profile files "
+        f"({len(aggregates) + len(singles):,} requests instead of {len(df):,})"
+    )
+    return aggregates, singles
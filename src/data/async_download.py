@@ -0,0 +1,224 @@
+"""
+ARGO Async NetCDF Downloader
+asyncio + httpx downloader sharing one pooled client across all files:
+connections are kept alive (and multiplexed over HTTP/2 when the `h2`
+package is installed) instead of paying a TCP+TLS handshake per file
+"""
+
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from loguru import logger
+from tqdm import tqdm
+import httpx
+
+from src.data.concurrency import (
+    AIMDController, ERROR, OK, THROTTLE_STATUSES, THROTTLED, parse_retry_after
+)
+from src.data.download_integrity import PartialDownload
+
+# Defaults (download_netcdf.py passes its own settings)
+DEFAULT_CONCURRENCY = 32
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_TIMEOUT = 30
+DEFAULT_QUEUE_SIZE = 1000  # Downloads queued ahead of the workers
+MAX_BACKOFF = 60  # Seconds
+
+
+def http2_available():
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_client(concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Shared AsyncClient with a connection pool sized for the concurrency limit"""
+    return httpx.AsyncClient(
+        http2=http2_available(),
+        limits=httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+        ),
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+    )
+
+
+def _classify_error(error):
+    """Map an exception to a controller outcome and optional Retry-After"""
+    if isinstance(error, httpx.HTTPStatusError):
+        response = error.response
+        if response.status_code in THROTTLE_STATUSES:
+            return THROTTLED, parse_retry_after(response.headers.get('Retry-After'))
+        return ERROR, None
+    if isinstance(error, (httpx.TimeoutException, httpx.RemoteProtocolError)):
+        return THROTTLED, None
+    return ERROR, None
+
+
+async def download_file_async(client, url, output_path, controller, chunk_size=DEFAULT_CHUNK_SIZE,
+                              retry_attempts=DEFAULT_RETRY_ATTEMPTS, overwrite=False, limiter=None):
+    """
+    Download a single file over the shared client with retry logic
+    
+    Every attempt takes a slot from the controller and reports its outcome, so
+    throttling and timeouts shrink the window for all tasks. Retries wait for
+    the server's Retry-After if given, otherwise a jittered exponential backoff.
+    Bytes go to a .part file that later attempts resume with a Range request;
+    the verified file is renamed into place (see download_integrity). A shared
+    BandwidthLimiter, if given, paces the reads.
+
+    Returns:
+        (success, error, info) like download_netcdf.download_file
+    """
+    for retry in range(retry_attempts + 1):
+        # A stale partial is only kept when we aren't replacing the file
+        download = PartialDownload(output_path, resume=retry > 0 or not overwrite)
+        await controller.acquire()
+        outcome, retry_after, error, info = OK, None, None, None
+        
+        try:
+            async with client.stream("GET", url, headers=download.request_headers()) as response:
+                if response.status_code != 416:
+                    response.raise_for_status()
+
+                with download:
+                    if download.start(response.status_code, response.headers):
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            download.write(chunk)
+                            if limiter:
+                                await limiter.athrottle(len(chunk))
+
+            info = download.finish()
+
+        except Exception as e:
+            error = e
+            outcome, retry_after = _classify_error(e)
+
+        finally:
+            await controller.release(download.size, outcome, retry_after)
+
+        if error is None:
+            return True, None, info
+
+        if retry < retry_attempts:
+            logger.warning(f"Retry {retry + 1}/{retry_attempts} for {url}")
+            delay = retry_after or min(2 ** retry, MAX_BACKOFF) * random.uniform(0.5, 1.5)
+            await asyncio.sleep(delay)
+        else:
+            return False, str(error) or type(error).__name__, None
+
+
+async def _download_all(downloads, controller, chunk_size, retry_attempts, overwrite, on_success,
+                        pbar, limiter=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Run every download through one client, throttled by the controller
+
+    A producer feeds downloads, in the given (priority) order, into a bounded
+    queue drained by a fixed pool of workers, so memory stays flat however long
+    the list is and the first items are also the first to finish.
+
+    on_success may block (manifest writes, a full parse queue downstream), so it
+    runs on one helper thread, in completion order: a worker waiting for it
+    holds no request slot and the event loop keeps the other transfers moving.
+    """
+    successful = 0
+    failed_urls = []
+    queue = asyncio.Queue(maxsize=queue_size)
+    n_workers = controller.maximum
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="on-success") as callbacks:
+        async with create_client(controller.maximum) as client:
+
+            async def producer():
+                for item in downloads:
+                    await queue.put(item)
+                for _ in range(n_workers):
+                    await queue.put(None)
+
+            async def worker():
+                nonlocal successful
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+
+                    url, path = item
+                    success, error, info = await download_file_async(
+                        client, url, Path(path), controller, chunk_size, retry_attempts, overwrite, limiter
+                    )
+
+                    if success:
+                        successful += 1
+                        if on_success:
+                            await loop.run_in_executor(callbacks, on_success, path, info)
+                    else:
+                        failed_urls.append((url, error))
+                        logger.error(f"Failed: {url} - {error}")
+
+                    stats = controller.stats()
+                    pbar.update(1)
+                    pbar.set_postfix({
+                        'success': successful,
+                        'failed': len(failed_urls),
+                        'window': stats['window'],
+                        'MB/s': f"{stats['bytes_per_second'] / 1024 / 1024:.1f}",
+                        'err': f"{stats['error_rate']:.0%}"
+                    })
+
+            await asyncio.gather(producer(), *(worker() for _ in range(n_workers)))
+
+    return successful, failed_urls
+
+
+def download_files_async(downloads, concurrency=DEFAULT_CONCURRENCY, chunk_size=DEFAULT_CHUNK_SIZE,
+                         retry_attempts=DEFAULT_RETRY_ATTEMPTS, controller=None, overwrite=False,
+                         on_success=None, limiter=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Download (url, local_path) pairs concurrently, in the order given
+
+    Args:
+        downloads: List (or iterable) of (url, local_path) tuples, highest priority first
+        concurrency: Fixed number of simultaneous requests (ignored if controller given)
+        chunk_size: Streaming chunk size in bytes
+        retry_attempts: Retries per file
+        controller: AIMDController adapting the window to throughput and throttling
+        overwrite: Discard leftover .part files instead of resuming them
+        on_success: Called as on_success(local_path, info) for each verified file,
+                    off the event loop on a single helper thread
+        limiter: BandwidthLimiter capping the total download rate
+        queue_size: Downloads queued ahead of the workers
+
+    Returns:
+        (successful_count, [(url, error), ...])
+    """
+    controller = controller or AIMDController.fixed(concurrency)
+    total = len(downloads) if hasattr(downloads, '__len__') else None
+    count = f"{total:,}" if total is not None else "streamed"
+    logger.info(
+        f"Async download: {count} files, window {controller.window} "
+        f"(range {controller.minimum}-{controller.maximum}), "
+        f"HTTP/2 {'on' if http2_available() else 'off (install h2 to enable)'}"
+    )
+
+    if limiter:
+        logger.info(f"Bandwidth cap: {limiter.rate / 1024 / 1024:.1f} MB/s")
+
+    with tqdm(total=total, desc="Downloading", unit="file") as pbar:
+        result = asyncio.run(_download_all(
+            downloads, controller, chunk_size, retry_attempts, overwrite, on_success,
+            pbar, limiter, queue_size
+        ))
+
+    stats = controller.stats()
+    logger.info(
+        f"Final window: {stats['window']}, requests: {stats['total_requests']:,}, "
+        f"throttled: {stats['total_throttled']:,}, errors: {stats['total_errors']:,}"
+    )
+    return result
@@ -0,0 +1,201 @@
+"""
+ARGO Ingestion Benchmarks
+Compares time and peak memory of alternative ingestion code paths on local data
+Each variant runs in a fresh process so peak RSS measurements don't interfere
+"""
+
+import multiprocessing as mp
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+import xarray as xr
+from loguru import logger
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+from src.data.download_index import (
+    INDEX_PARSE_CHUNKSIZE, filter_by_date, get_index_path, parse_index_file, stream_filter_index
+)
+from src.data.index_store import write_index_store
+from src.data.parse_netcdf import (
+    NETCDF_ENGINES, PARSE_VARIABLES, engine_available, netcdf_format, open_argo_dataset
+)
+
+# Setup logging
+setup_logger()
+
+
+def _peak_rss_mb():
+    """Peak resident set size of the current process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(queue, target, args):
+    """Child-process entry point: run target and report elapsed time and memory"""
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    target(*args)
+    queue.put({
+        'seconds': time.perf_counter() - start,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': _peak_rss_mb(),
+    })
+
+
+def run_isolated(target, *args):
+    """Run target(*args) in a fresh interpreter and return its measurements"""
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(queue, target, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    result['delta_rss_mb'] = result['peak_rss_mb'] - result['baseline_rss_mb']
+    return result
+
+
+def _log_results(title, results):
+    """Log a small comparison table"""
+    logger.info("\n" + "="*60)
+    logger.info(title)
+    logger.info("="*60)
+    for name, result in results.items():
+        logger.info(
+            f"{name:<20} {result['seconds']:>8.2f} s   "
+            f"peak {result['peak_rss_mb']:>8.1f} MB   "
+            f"(+{result['delta_rss_mb']:.1f} MB over baseline)"
+        )
+    logger.info("="*60 + "\n")
+
+
+# ============================================
+# Index parsing: in-memory vs streaming
+# ============================================
+
+def _index_in_memory(index_file, store_dir):
+    df = parse_index_file(index_file)
+    df = filter_by_date(df)
+    write_index_store(df, store_dir)
+
+
+def _index_streaming(index_file, store_dir, chunksize):
+    stream_filter_index(index_file, chunksize=chunksize, store_dir=store_dir)
+
+
+def benchmark_index_memory(index_file=None, chunksize=None):
+    """
+    Compare the whole-file index parse + filter with the streaming chunked parser
+
+    Args:
+        index_file: Raw index to parse (defaults to the downloaded global index)
+        chunksize: Rows per chunk for the streaming parser
+    """
+    index_file = Path(index_file) if index_file else get_index_path()
+    chunksize = chunksize or INDEX_PARSE_CHUNKSIZE
+
+    if not index_file.exists():
+        raise FileNotFoundError(f"Index file not found: {index_file}")
+
+    logger.info(f"Benchmarking index parsing on {index_file} "
+                f"({index_file.stat().st_size / 1024 / 1024:.1f} MB)")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="floatchat_bench_"))
+    try:
+        results = {
+            'in-memory': run_isolated(_index_in_memory, index_file, work_dir / "in_memory"),
+            f'streaming ({chunksize:,})': run_isolated(
+                _index_streaming, index_file, work_dir / "streaming", chunksize
+            ),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    _log_results("INDEX PARSING BENCHMARK", results)
+    return results
+
+
+# ============================================
+# NetCDF reading: default open vs lean reader per engine
+# ============================================
+
+def _read_default(nc_files):
+    for nc_file in nc_files:
+        with xr.open_dataset(nc_file) as ds:
+            ds[[name for name in PARSE_VARIABLES if name in ds.variables]].load()
+
+
+def _read_lean(nc_files, engine):
+    for nc_file in nc_files:
+        with open_argo_dataset(nc_file, engine) as ds:
+            ds.load()
+
+
+def benchmark_netcdf_readers(nc_files=None, limit=500):
+    """
+    Compare per-file read time of xr.open_dataset defaults with the lean
+    reader (PARSE_VARIABLES only) on each installed engine, per file format
+
+    Args:
+        nc_files: Files to read (defaults to the downloaded NetCDF files)
+        limit: Max files per format
+    """
+    if nc_files is None:
+        nc_files = sorted((Path(settings.data_raw_dir) / "netcdf").rglob("*.nc"))
+    by_format = {}
+    for nc_file in map(Path, nc_files):
+        by_format.setdefault(netcdf_format(nc_file), []).append(nc_file)
+    if not by_format:
+        raise FileNotFoundError("No NetCDF files to benchmark")
+
+    all_results = {}
+    for fmt, files in sorted(by_format.items()):
+        files = files[:limit]
+        logger.info(f"Benchmarking NetCDF readers on {len(files):,} {fmt} files")
+        results = {'default': run_isolated(_read_default, files)}
+        for engine in NETCDF_ENGINES[fmt]:
+            if engine_available(engine):
+                results[f'lean ({engine})'] = run_isolated(_read_lean, files, engine)
+            else:
+                logger.info(f"Skipping {engine}: not installed")
+        for result in results.values():
+            result['ms_per_file'] = result['seconds'] / len(files) * 1000
+
+        _log_results(f"NETCDF READER BENCHMARK ({fmt}, {len(files):,} files)", results)
+        for name, result in results.items():
+            logger.info(f"{name:<20} {result['ms_per_file']:>8.2f} ms/file")
+        all_results[fmt] = results
+    return all_results
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ARGO ingestion benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    index_parser = subparsers.add_parser('index', help='Index parsing time and peak memory')
+    index_parser.add_argument('--index-file', help='Raw index file (default: downloaded global index)')
+    index_parser.add_argument('--chunksize', type=int, help='Rows per chunk for the streaming parser')
+
+    netcdf_parser = subparsers.add_parser('netcdf', help='Per-file NetCDF read time by reader and engine')
+    netcdf_parser.add_argument('files', nargs='*', help='NetCDF files (default: downloaded files)')
+    netcdf_parser.add_argument('--limit', type=int, default=500, help='Max files per format')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'index':
+        benchmark_index_memory(args.index_file, args.chunksize)
+    elif args.benchmark == 'netcdf':
+        benchmark_netcdf_readers(args.files or None, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+"""
+ARGO Climatology Cube
+Count, sum and sum of squares of the standard-level temperature and salinity
+per 1° cell, standard pressure level and calendar month, in a chunked,
+compressed NetCDF cube (data/processed/climatology/climatology.nc) built from
+the 'levels' lake table.
+
+The moments are additive, so an update only adds the contributions of new
+profiles and subtracts those of re-parsed or removed ones. The rows already
+counted are kept in a ledger partitioned like the lake, and the cube records
+the lake file each ledger partition was taken from, so an update reads and
+rewrites only the partitions the lake has rewritten since. A per-region
+rollup of the same moments answers named-region questions without reading
+the grid.
+
+    python src/data/climatology.py [--rebuild]
+"""
+
+import json
+import os
+import shutil
+import uuid
+import netCDF4
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.utils.logger import setup_logger
+from src.ai.query_examples import OCEAN_REGIONS
+from src.data.index_filters import points_in_polygon, region_polygons
+from src.data.lake import LEVELS, get_lake_dir
+from src.data.standard_levels import LEVEL_PARAMETERS, LEVEL_SCHEMA, STANDARD_LEVELS, level_index
+
+N_LAT = 180  # 1° cells
+N_LON = 360
+N_CELLS = N_LAT * N_LON
+N_MONTHS = 12
+MOMENTS = ['count', 'sum', 'sumsq']
+REGIONS = list(OCEAN_REGIONS)
+
+CUBE_FILE = "climatology.nc"
+LEDGER_DIR = "profiles"
+
+# Profiles already counted in the cube: their cell, month and level values,
+# one file per lake partition (profiles/<partition>/part-<generation>.parquet)
+LEDGER_SCHEMA = pa.schema(
+    [('profile_id', pa.string()), ('cell', pa.int32()), ('month', pa.int8())]
+    + [LEVEL_SCHEMA.field(name) for name in LEVEL_PARAMETERS]
+)
+
+
+def get_climatology_dir(processed_dir=None):
+    """Climatology directory inside the processed directory"""
+    return Path(processed_dir or settings.data_processed_dir) / "climatology"
+
+
+def grid_cells(latitude, longitude):
+    """Flat 1° cell index of each position (-1 where it is missing)"""
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = (np.asarray(longitude, dtype=np.float64) + 180.0) % 360.0 - 180.0
+    ok = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90)
+    row = np.clip(np.floor(np.where(ok, lat, 0) + 90), 0, N_LAT - 1)
+    col = np.clip(np.floor(np.where(ok, lon, 0) + 180), 0, N_LON - 1)
+    return np.where(ok, row * N_LON + col, -1).astype(np.int32)
+
+
+def region_masks():
+    """(len(REGIONS), N_CELLS) cells whose centres lie inside each region"""
+    lat, lon = np.meshgrid(np.arange(N_LAT) - 89.5, np.arange(N_LON) - 179.5, indexing='ij')
+    lat, lon = lat.ravel(), lon.ravel()
+    masks = np.zeros((len(REGIONS), N_CELLS), dtype=bool)
+    for i, name in enumerate(REGIONS):
+        for polygon in region_polygons(name):
+            masks[i] |= points_in_polygon(lon, lat, polygon)
+    return masks
+
+
+def _level_block(table, name):
+    """Fixed-size list column -> (rows, levels) float32 array"""
+    column = table[name].combine_chunks()
+    return column.flatten().to_numpy(zero_copy_only=False).reshape(len(column), column.type.list_size)
+
+
+def _contributions(cells, months, blocks, sign):
+    """
+    Moments of a set of profile rows, aggregated per cube position
+
+    Returns:
+        {parameter: (month, level, cell, {moment: values})} for the finite values
+    """
+    contributions = {}
+    for name, values in blocks.items():
+        row, level = np.nonzero(np.isfinite(values))
+        v = values[row, level].astype(np.float64)
+        key = (months[row].astype(np.int64) * values.shape[1] + level) * N_CELLS + cells[row]
+        key, inverse = np.unique(key, return_inverse=True)
+        moments = {
+            'count': np.bincount(inverse, minlength=len(key)) * sign,
+            'sum': np.bincount(inverse, weights=v, minlength=len(key)) * sign,
+            'sumsq': np.bincount(inverse, weights=v * v, minlength=len(key)) * sign,
+        }
+        month, rest = np.divmod(key, values.shape[1] * N_CELLS)
+        level, cell = np.divmod(rest, N_CELLS)
+        contributions[name] = (month, level, cell, moments)
+    return contributions
+
+
+def _create_cube(path, levels):
+    """Empty cube; unwritten chunks read as zeros"""
+    with netCDF4.Dataset(path, 'w') as nc:
+        nc.title = "ARGO standard-level climatology moments"
+        nc.createDimension('month', N_MONTHS)
+        nc.createDimension('pressure', len(levels))
+        nc.createDimension('latitude', N_LAT)
+        nc.createDimension('longitude', N_LON)
+        nc.createDimension('region', len(REGIONS))
+
+        nc.createVariable('month', 'i1', ('month',))[:] = np.arange(1, N_MONTHS + 1)
+        pressure = nc.createVariable('pressure', 'f8', ('pressure',))
+        pressure[:] = levels
+        pressure.units = 'dbar'
+        nc.createVariable('latitude', 'f4', ('latitude',))[:] = np.arange(N_LAT) - 89.5
+        nc.createVariable('longitude', 'f4', ('longitude',))[:] = np.arange(N_LON) - 179.5
+        region = nc.createVariable('region', str, ('region',))
+        for i, name in enumerate(REGIONS):
+            region[i] = name
+
+        for name in LEVEL_PARAMETERS:
+            for moment in MOMENTS:
+                dtype = 'i4' if moment == 'count' else 'f8'
+                nc.createVariable(
+                    f'{name}_{moment}', dtype, ('month', 'pressure', 'latitude', 'longitude'),
+                    zlib=True, complevel=4, chunksizes=(1, 1, N_LAT, N_LON), fill_value=0
+                )
+                nc.createVariable(f'{name}_region_{moment}', dtype, ('region', 'month', 'pressure'), fill_value=0)
+
+
+def _apply(path, contributions, masks):
+    """Add contributions to the grid (one month at a time) and to the region rollup"""
+    with netCDF4.Dataset(path, 'r+') as nc:
+        nc.set_auto_mask(False)
+        for name, (month, level, cell, moments) in contributions.items():
+            inside = masks[:, cell]
+            for moment, values in moments.items():
+                grid = nc[f'{name}_{moment}']
+                for m in np.unique(month):
+                    sel = month == m
+                    plane = grid[m].reshape(grid.shape[1], N_CELLS)
+                    plane[level[sel], cell[sel]] += values[sel].astype(plane.dtype)
+                    grid[m] = plane.reshape(grid.shape[1:])
+
+                rollup = nc[f'{name}_region_{moment}']
+                totals = rollup[:]
+                for r in range(len(REGIONS)):
+                    np.add.at(totals[r], (month[inside[r]], level[inside[r]]), values[inside[r]].astype(totals.dtype))
+                rollup[:] = totals
+
+
+def _lake_partitions(lake_dir):
+    """{partition directory: [size, mtime_ns]} of the levels lake table files"""
+    table_dir = Path(lake_dir) / LEVELS
+    partitions = {}
+    for f in sorted(table_dir.rglob("*.parquet")) if table_dir.exists() else []:
+        partition, stat = f.parent.relative_to(table_dir).as_posix(), f.stat()
+        size, mtime = partitions.get(partition, (0, 0))
+        partitions[partition] = [size + stat.st_size, max(mtime, stat.st_mtime_ns)]
+    return partitions
+
+
+def _read_state(cube_file):
+    """{partition: [size, mtime_ns, generation]} counted in the cube, or None if it has no ledger"""
+    with netCDF4.Dataset(cube_file) as nc:
+        return json.loads(nc.ledger) if 'ledger' in nc.ncattrs() else None
+
+
+def _ledger_file(ledger_dir, partition, generation):
+    return ledger_dir / partition / f"part-{generation}.parquet"
+
+
+def _read_ledger(ledger_dir, state, partitions):
+    """Ledger rows of some partitions"""
+    tables = [pq.read_table(_ledger_file(ledger_dir, p, state[p][2])) for p in partitions if p in state]
+    return pa.concat_tables(tables) if tables else LEDGER_SCHEMA.empty_table()
+
+
+def _read_levels(lake_dir, partition):
+    """Profile rows of one levels lake partition as ledger rows (positionless profiles dropped)"""
+    table = pa.concat_tables(
+        pq.read_table(f, columns=['profile_id', 'latitude', 'longitude', 'date'] + LEVEL_PARAMETERS)
+        for f in sorted((Path(lake_dir) / LEVELS / partition).glob("*.parquet"))
+    )
+    cells = grid_cells(table['latitude'].to_numpy(zero_copy_only=False), table['longitude'].to_numpy(zero_copy_only=False))
+    months = pd.DatetimeIndex(table['date'].to_numpy(zero_copy_only=False)).month.to_numpy()
+    keep = (cells >= 0) & ~np.isnan(months.astype(np.float64))
+    return pa.table(
+        [table['profile_id'].filter(keep), pa.array(cells[keep]), pa.array((months[keep] - 1).astype(np.int8))]
+        + [table[name].filter(keep) for name in LEVEL_PARAMETERS],
+        schema=LEDGER_SCHEMA,
+    )
+
+
+def _remove_stale_ledger_files(ledger_dir, state):
+    """Drop ledger files the cube no longer refers to (older generations, removed partitions)"""
+    for f in sorted(ledger_dir.rglob("*.parquet")):
+        partition = f.parent.relative_to(ledger_dir).as_posix()
+        if partition not in state or f != _ledger_file(ledger_dir, partition, state[partition][2]):
+            f.unlink()
+    for directory in sorted((d for d in ledger_dir.rglob("*") if d.is_dir()), reverse=True):
+        if not any(directory.iterdir()):
+            directory.rmdir()
+
+
+def _row_moments(table, sign):
+    cells = table['cell'].to_numpy()
+    months = table['month'].to_numpy()
+    return _contributions(cells, months, {name: _level_block(table, name) for name in LEVEL_PARAMETERS}, sign)
+
+
+def update_climatology(lake_dir=None, climatology_dir=None, rebuild=False):
+    """
+    Bring the climatology cube up to date with the levels lake table
+
+    Only lake partitions rewritten since the last update are read: their
+    profiles not in the ledger are added, profiles whose cell, month or
+    values changed are replaced, and profiles no longer in the lake are
+    subtracted.
+
+    Args:
+        lake_dir: Lake root (default: data/processed/lake)
+        climatology_dir: Cube directory (default: data/processed/climatology)
+        rebuild: Start from an empty cube
+
+    Returns:
+        {'added': n, 'replaced': n, 'removed': n}
+    """
+    lake_dir = Path(lake_dir) if lake_dir else get_lake_dir()
+    climatology_dir = Path(climatology_dir) if climatology_dir else get_climatology_dir()
+    climatology_dir.mkdir(parents=True, exist_ok=True)
+    cube_file = climatology_dir / CUBE_FILE
+    ledger_dir = climatology_dir / LEDGER_DIR
+
+    state = None
+    if cube_file.exists() and not rebuild:
+        with netCDF4.Dataset(cube_file) as nc:
+            levels = nc['pressure'][:].filled(np.nan)
+        state = _read_state(cube_file)
+        if len(levels) != len(STANDARD_LEVELS) or not np.allclose(levels, STANDARD_LEVELS):
+            logger.warning("Climatology was built on other standard levels - rebuilding")
+            state = None
+        elif state is None:
+            logger.warning("Climatology has no partition ledger - rebuilding")
+    rebuild = state is None
+    state = state or {}
+
+    # Partitions the lake rewrote (or dropped) since they were counted
+    lake_partitions = _lake_partitions(lake_dir)
+    changed = sorted(
+        p for p in set(state) | set(lake_partitions)
+        if p not in lake_partitions or state.get(p, [None, None])[:2] != lake_partitions[p]
+    )
+    current_parts = {p: _read_levels(lake_dir, p) for p in changed if p in lake_partitions}
+    current = pa.concat_tables(current_parts.values()) if current_parts else LEDGER_SCHEMA.empty_table()
+    ledger = _read_ledger(ledger_dir, state, changed)
+
+    # Diff the rewritten partitions against the rows already counted from them
+    ledger_ids = pd.Index(ledger['profile_id'].to_numpy(zero_copy_only=False))
+    current_ids = current['profile_id'].to_numpy(zero_copy_only=False)
+    position = ledger_ids.get_indexer(current_ids)
+    known = position >= 0
+    same = np.zeros(len(current), dtype=bool)
+    if known.any():
+        old = ledger.take(position[known])
+        new = current.filter(known)
+        unchanged = (
+            (old['cell'].to_numpy() == new['cell'].to_numpy())
+            & (old['month'].to_numpy() == new['month'].to_numpy())
+        )
+        for name in LEVEL_PARAMETERS:
+            a, b = _level_block(old, name), _level_block(new, name)
+            unchanged &= ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+        same[known] = unchanged
+
+    gone = ~ledger_ids.isin(current_ids)
+    subtract = np.zeros(len(ledger), dtype=bool)
+    subtract[position[known & ~same]] = True
+    subtract |= gone
+    add = ~same
+
+    counts = {
+        'added': int((~known).sum()),
+        'replaced': int((known & ~same).sum()),
+        'removed': int(gone.sum()),
+    }
+    if not rebuild and not changed:
+        logger.success("Climatology is up to date")
+        return counts
+
+    # Update a copy and swap it in, so open readers never see a half-applied update
+    work_file = cube_file.with_name(cube_file.name + '.tmp')
+    if rebuild:
+        _create_cube(work_file, STANDARD_LEVELS)
+    else:
+        shutil.copyfile(cube_file, work_file)
+    masks = region_masks()
+    if subtract.any():
+        _apply(work_file, _row_moments(ledger.filter(subtract), -1), masks)
+    if add.any():
+        _apply(work_file, _row_moments(current.filter(add), 1), masks)
+
+    # New ledger files of the rewritten partitions; the cube only points at
+    # them once it is swapped in, so an interrupted update leaves both as they were
+    generation = uuid.uuid4().hex
+    for p in changed:
+        state.pop(p, None)
+    for p, rows in current_parts.items():
+        _ledger_file(ledger_dir, p, generation).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(rows, _ledger_file(ledger_dir, p, generation), compression='zstd')
+        state[p] = lake_partitions[p] + [generation]
+    with netCDF4.Dataset(work_file, 'r+') as nc:
+        nc.ledger = json.dumps(state, sort_keys=True)
+    os.replace(work_file, cube_file)
+    _remove_stale_ledger_files(ledger_dir, state)
+
+    logger.success(
+        f"Climatology updated from {len(changed):,} lake partitions: {counts['added']:,} profiles added, "
+        f"{counts['replaced']:,} replaced, {counts['removed']:,} removed"
+    )
+    return counts
+
+
+def _statistics(count, total, sumsq, levels):
+    """Moments summed over everything but the level axis -> per-level count/mean/std"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        variance = (sumsq - total * mean) / (count - 1)
+    return pd.DataFrame({
+        'pressure': levels,
+        'count': count.astype(np.int64),
+        'mean': np.where(count > 0, mean, np.nan),
+        'std': np.where(count > 1, np.sqrt(np.clip(variance, 0, None)), np.nan),
+    })
+
+
+class ClimatologyCube:
+    """
+    Read access to the climatology cube
+
+    Region statistics come from the in-memory rollup; box statistics read
+    only the requested months, levels and cells from the grid.
+
+    Usage::
+
+        with ClimatologyCube() as cube:
+            cube.region_stats('Indian Ocean', 'temperature', months=[6, 7, 8], pressure=1000)
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else get_climatology_dir() / CUBE_FILE
+        self._nc = netCDF4.Dataset(self.path)
+        self._nc.set_auto_mask(False)
+        self.levels = self._nc['pressure'][:]
+        self.regions = list(self._nc['region'][:])
+        self._rollup = {
+            (name, moment): self._nc[f'{name}_region_{moment}'][:]
+            for name in LEVEL_PARAMETERS for moment in MOMENTS
+        }
+
+    def _selection(self, parameter, months, pressure):
+        if parameter not in LEVEL_PARAMETERS:
+            raise ValueError(f"Unknown parameter {parameter!r}; choose from {', '.join(LEVEL_PARAMETERS)}")
+        month_index = np.arange(N_MONTHS) if months is None else np.asarray(months, dtype=np.int64) - 1
+        level_positions = (
+            np.arange(len(self.levels)) if pressure is None else np.array([level_index(pressure, self.levels)])
+        )
+        return month_index, level_positions
+
+    def region_stats(self, region, parameter='temperature', months=None, pressure=None):
+        """
+        Per-level count/mean/std of a parameter in a region
+
+        Args:
+            region: Name from OCEAN_REGIONS
+            parameter: 'temperature' or 'salinity'
+            months: Calendar months 1-12 to pool (default: all)
+            pressure: One standard level (default: every level)
+        """
+        if region not in self.regions:
+            raise ValueError(f"Unknown region {region!r}; choose from: {', '.join(self.regions)}")
+        month_index, levels = self._selection(parameter, months, pressure)
+        r = self.regions.index(region)
+        count, total, sumsq = (
+            self._rollup[(parameter, moment)][r][np.ix_(month_index, levels)].sum(axis=0) for moment in MOMENTS
+        )
+        return _statistics(count, total, sumsq, self.levels[levels])
+
+    def box_stats(self, lat_min, lat_max, lon_min, lon_max, parameter='temperature', months=None, pressure=None):
+        """
+        Per-level count/mean/std over the 1° cells overlapping a box
+
+        lon_min > lon_max means the box crosses the antimeridian.
+        """
+        month_index, levels = self._selection(parameter, months, pressure)
+        rows = slice(int(np.floor(lat_min + 90)), int(np.ceil(lat_max + 90)))
+        first, last = int(np.floor(lon_min + 180)) % N_LON, int(np.ceil(lon_max + 180)) % N_LON or N_LON
+        columns = [slice(first, last)] if first < last else [slice(first, N_LON), slice(0, last)]
+
+        moments = []
+        for moment in MOMENTS:
+            grid = self._nc[f'{parameter}_{moment}']
+            total = np.zeros(len(levels))
+            for m in month_index:
+                for i, k in enumerate(levels):
+                    total[i] += sum(grid[m, k, rows, cols].sum() for cols in columns)
+            moments.append(total)
+        return _statistics(*moments, self.levels[levels])
+
+    def close(self):
+        self._nc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def open_climatology(climatology_dir=None):
+    """ClimatologyCube of the processed directory, or None if it was never built"""
+    path = (Path(climatology_dir) if climatology_dir else get_climatology_dir()) / CUBE_FILE
+    return ClimatologyCube(path) if path.exists() else None
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build or update the ARGO climatology cube')
+    parser.add_argument('--rebuild', action='store_true', help='Start from an empty cube')
+    args = parser.parse_args()
+
+    setup_logger()
+    update_climatology(rebuild=args.rebuild)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+ARGO Columnar Buffers
+Arrow schemas for parsed profiles/measurements and a Parquet writer that
+accumulates typed column chunks (float32 values, int8 QC flags,
+dictionary-encoded profile ids) and flushes them as record batches, so
+memory is bounded by one batch whatever the archive size
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+
+BATCH_ROWS = 1_000_000  # Buffered rows per record batch / row group
+
+QC_MISSING = -1  # Blank/unknown QC flag; written as null
+
+# Measured parameters: column prefix -> ARGO variable name
+PARAMETERS = {
+    'pressure': 'PRES',
+    'temperature': 'TEMP',
+    'salinity': 'PSAL',
+}
+
+# TEOS-10 properties derived at parse time (see src/data/derived.py)
+DERIVED_COLUMNS = [
+    'depth',
+    'absolute_salinity',
+    'conservative_temperature',
+    'potential_temperature',
+    'potential_density',
+    'sigma_theta',
+    'buoyancy_frequency',
+]
+
+# Per-profile statistics computed at parse time (see src/data/summaries.py)
+SUMMARY_COLUMNS = [
+    'mixed_layer_depth',
+    'thermocline_depth',
+    'max_depth',
+    'surface_temperature',
+    'surface_salinity',
+    'mean_temperature',
+    'mean_salinity',
+    'temperature_range',
+    'salinity_range',
+    'profile_quality_score',
+    'measurement_count',
+]
+
+# H3 cells of the profile position, finest first (see src/data/spatial.py)
+H3_RESOLUTIONS = [7, 5, 3]
+H3_COLUMNS = [f'h3_index_res{res}' for res in H3_RESOLUTIONS]
+
+PROFILE_SCHEMA = pa.schema([
+    ('profile_id', pa.string()),
+    ('float_id', pa.string()),
+    ('cycle_number', pa.int32()),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('date', pa.timestamp('ns')),
+    ('n_levels', pa.int32()),
+    ('data_mode', pa.string()),  # R (real-time), A (adjusted) or D (delayed mode)
+] + [
+    (name, pa.string()) for name in H3_COLUMNS
+] + [
+    (name, pa.int32() if name == 'measurement_count' else pa.float32()) for name in SUMMARY_COLUMNS
+])
+
+# Raw values, delayed-mode adjusted values with their QC/error, the best
+# available value (adjusted for A/D profiles, raw for R) per parameter, and
+# the properties derived from the best values
+MEASUREMENT_SCHEMA = pa.schema(
+    [
+        ('profile_id', pa.dictionary(pa.int32(), pa.string())),
+        ('level', pa.int32()),
+    ]
+    + [(name, pa.float32()) for name in PARAMETERS]
+    + [(f'{name}_qc', pa.int8()) for name in PARAMETERS]
+    + [(f'{name}_adjusted', pa.float32()) for name in PARAMETERS]
+    + [(f'{name}_adjusted_qc', pa.int8()) for name in PARAMETERS]
+    + [(f'{name}_adjusted_error', pa.float32()) for name in PARAMETERS]
+    + [(f'{name}_best', pa.float32()) for name in PARAMETERS]
+    + [(f'{name}_best_qc', pa.int8()) for name in PARAMETERS]
+    + [(name, pa.float32()) for name in DERIVED_COLUMNS]
+)
+
+
+def _arrow_column(values, field):
+    """NumPy column -> Arrow array of the field's type (NaN floats and QC_MISSING become null)"""
+    values = np.asarray(values)
+    if pa.types.is_fixed_size_list(field.type):
+        # (rows, list_size) block; NaN stays NaN inside the lists
+        flat = pa.array(values.reshape(-1), type=field.type.value_type)
+        return pa.FixedSizeListArray.from_arrays(flat, type=field.type)
+    if pa.types.is_dictionary(field.type):
+        return pa.array(values, type=field.type.value_type).dictionary_encode().cast(field.type)
+    if pa.types.is_floating(field.type):
+        return pa.array(values, type=field.type, from_pandas=True)
+    if pa.types.is_int8(field.type):
+        # QC flags use QC_MISSING; partition months are float with NaN for NaT dates
+        missing = values == QC_MISSING
+        if values.dtype.kind == 'f':
+            missing |= np.isnan(values)
+            values = np.where(missing, 0, values)
+        return pa.array(values, type=field.type, mask=missing)
+    return pa.array(values, type=field.type, from_pandas=True)
+
+
+def record_batch(chunks, schema):
+    """Concatenate columnar chunks (dicts of NumPy arrays) into one Arrow record batch"""
+    chunks = [chunk for chunk in chunks if len(chunk[schema.names[0]])]
+    if not chunks:
+        return pa.RecordBatch.from_pylist([], schema=schema)
+    columns = [
+        _arrow_column(np.concatenate([chunk[field.name] for chunk in chunks]), field)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def frame_from_columns(chunks, schema):
+    """Concatenate columnar chunks into one DataFrame"""
+    return record_batch(chunks, schema).to_pandas()
+
+
+class ColumnBatchWriter:
+    """
+    Buffer columnar chunks and write them to Parquet one record batch at a time
+
+    Usage::
+
+        with ColumnBatchWriter(path, MEASUREMENT_SCHEMA) as writer:
+            for result in results:
+                writer.append(result['measurements'])
+    """
+
+    def __init__(self, path, schema, batch_rows=BATCH_ROWS, **writer_options):
+        self.path = Path(path)
+        self.schema = schema
+        self.batch_rows = batch_rows
+        self.writer_options = writer_options
+        self.rows = 0
+        self._chunks = []
+        self._tables = []
+        self._buffered = 0
+        self._writer = None
+
+    def append(self, columns):
+        n = len(columns[self.schema.names[0]])
+        if not n:
+            return
+        if self._tables:
+            self.flush()
+        self._chunks.append(columns)
+        self._buffered += n
+        if self._buffered >= self.batch_rows:
+            self.flush()
+
+    def append_table(self, table):
+        """Buffer rows that are already Arrow data of the writer's schema (a table or record batch)"""
+        if not table.num_rows:
+            return
+        if self._chunks:
+            self.flush()
+        self._tables.append(pa.Table.from_batches([table]) if isinstance(table, pa.RecordBatch) else table)
+        self._buffered += table.num_rows
+        if self._buffered >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self._chunks:
+            batch = record_batch(self._chunks, self.schema)
+        elif self._tables:
+            # One chunk per column, so the rows go out as a single batch / row group
+            batch = pa.concat_tables(self._tables).combine_chunks().to_batches()[0]
+        else:
+            return
+        self._write(batch)
+        self.rows += batch.num_rows
+        self._chunks = []
+        self._tables = []
+        self._buffered = 0
+
+    def _write(self, batch):
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema, **self.writer_options)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        """Flush and close; returns True if any rows were written"""
+        self.flush()
+        if self._writer is None:
+            return False
+        self._writer.close()
+        self._writer = None
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class PartitionedBatchWriter(ColumnBatchWriter):
+    """
+    ColumnBatchWriter into a Hive-partitioned directory
+
+    Every flush writes one file per partition it touches, named
+    '<prefix>-<flush>-<i>.parquet' so concurrent writers sharing the
+    directory never collide.
+    """
+
+    def __init__(self, path, schema, partition_cols, prefix, batch_rows=BATCH_ROWS):
+        super().__init__(path, schema, batch_rows)
+        self.partitioning = ds.partitioning(
+            pa.schema([schema.field(name) for name in partition_cols]), flavor='hive'
+        )
+        self.prefix = prefix
+        self._flushes = 0
+
+    def _write(self, batch):
+        ds.write_dataset(
+            pa.Table.from_batches([batch]),
+            self.path,
+            format='parquet',
+            partitioning=self.partitioning,
+            basename_template=f"{self.prefix}-{self._flushes:05d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        self._flushes += 1
+
+    def close(self):
+        self.flush()
+        return self.rows > 0
@@ -0,0 +1,212 @@
+"""
+Adaptive Concurrency Control
+AIMD (additive-increase / multiplicative-decrease) limiter for the async
+NetCDF downloader: widens the request window while throughput keeps
+improving and halves it on throttling (429/5xx) or timeouts. Also a token
+bucket capping total download bandwidth
+"""
+
+import asyncio
+import threading
+import time
+
+# Attempt outcomes reported to the controller
+OK = 'ok'
+ERROR = 'error'          # Failed, but not a sign of server overload (e.g. 404)
+THROTTLED = 'throttled'  # 429, 5xx or timeout: back off
+
+# HTTP statuses that signal the server wants us to slow down
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AIMDController:
+    """
+    Concurrency window shared by all download tasks
+
+    Tasks call ``await acquire()`` before a request and ``await release(...)``
+    after it. Every ``interval`` seconds the window grows by ``increase`` if
+    requests succeeded and throughput did not drop; any throttling signal
+    multiplies it by ``decrease`` (at most once per interval, so one burst of
+    503s doesn't collapse it to the minimum). A Retry-After pauses new requests.
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=128, increase=1, decrease=0.5,
+                 interval=2.0, tolerance=0.05):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.window = min(max(initial, self.minimum), self.maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.interval = interval
+        self.tolerance = tolerance
+
+        self.in_flight = 0
+        self.bytes_per_second = 0.0
+        self.error_rate = 0.0
+        self.total_bytes = 0
+        self.total_requests = 0
+        self.total_errors = 0
+        self.total_throttled = 0
+
+        self._condition = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._last_throughput = None
+        self._reset_interval(time.monotonic())
+
+    @classmethod
+    def fixed(cls, concurrency):
+        """Controller that never changes its window (plain semaphore behaviour)"""
+        return cls(initial=concurrency, minimum=concurrency, maximum=concurrency)
+
+    def _reset_interval(self, now):
+        self._interval_start = now
+        self._interval_bytes = 0
+        self._interval_ok = 0
+        self._interval_errors = 0
+        self._interval_throttled = 0
+
+    def _get_condition(self):
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        """Wait for a free slot in the current window"""
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < self.window:
+                    break
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=pause if pause > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+
+    async def release(self, nbytes=0, outcome=OK, retry_after=None):
+        """
+        Report the result of one request and free its slot
+
+        Args:
+            nbytes: Bytes received
+            outcome: OK, ERROR or THROTTLED
+            retry_after: Seconds the server asked us to wait (Retry-After)
+        """
+        condition = self._get_condition()
+        async with condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.total_requests += 1
+            self.total_bytes += nbytes
+            self._interval_bytes += nbytes
+
+            if outcome == OK:
+                self._interval_ok += 1
+            else:
+                self.total_errors += 1
+                self._interval_errors += 1
+
+            if outcome == THROTTLED:
+                self.total_throttled += 1
+                self._interval_throttled += 1
+                if now - self._last_decrease >= self.interval:
+                    self.window = max(self.minimum, int(self.window * self.decrease))
+                    self._last_decrease = now
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+
+            self._maybe_adjust(now)
+            condition.notify_all()
+
+    def _maybe_adjust(self, now):
+        """Close the measurement interval and apply additive increase"""
+        elapsed = now - self._interval_start
+        if elapsed < self.interval:
+            return
+
+        throughput = self._interval_bytes / elapsed
+        attempts = self._interval_ok + self._interval_errors
+        self.error_rate = self._interval_errors / attempts if attempts else 0.0
+
+        improving = (
+            self._last_throughput is None
+            or throughput >= self._last_throughput * (1 - self.tolerance)
+        )
+        if not self._interval_throttled and self._interval_ok and improving:
+            self.window = min(self.maximum, self.window + self.increase)
+
+        self.bytes_per_second = throughput
+        self._last_throughput = throughput
+        self._reset_interval(now)
+
+    def stats(self):
+        """Current window, in-flight requests, throughput and error rate"""
+        return {
+            'window': self.window,
+            'in_flight': self.in_flight,
+            'bytes_per_second': self.bytes_per_second,
+            'error_rate': self.error_rate,
+            'total_bytes': self.total_bytes,
+            'total_requests': self.total_requests,
+            'total_errors': self.total_errors,
+            'total_throttled': self.total_throttled,
+        }
+
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by all download workers (threads or coroutines)
+
+    Workers report every chunk they receive; once the bucket is in debt the
+    reporting worker sleeps until the average rate is back under the cap, which
+    in turn stops it reading from its socket.
+    """
+
+    def __init__(self, bytes_per_second, burst=None):
+        self.rate = float(bytes_per_second)
+        self.capacity = float(burst or bytes_per_second)  # default: 1 s of burst
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_mbps(cls, megabytes_per_second):
+        """Limiter for a cap in MB/s, or None when the cap is 0 (unlimited)"""
+        if not megabytes_per_second or megabytes_per_second <= 0:
+            return None
+        return cls(megabytes_per_second * 1024 * 1024)
+
+    def reserve(self, nbytes):
+        """Spend ``nbytes`` of budget; returns the seconds to wait before continuing"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= nbytes
+            return max(0.0, -self._tokens / self.rate)
+
+    def throttle(self, nbytes):
+        """Blocking variant for thread workers"""
+        delay = self.reserve(nbytes)
+        if delay:
+            time.sleep(delay)
+
+    async def athrottle(self, nbytes):
+        """Async variant for coroutine workers"""
+        delay = self.reserve(nbytes)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def parse_retry_after(value):
+    """Retry-After header (seconds form) -> float seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date form: not worth parsing, fall back to our own backoff
+        return None
@@ -0,0 +1,63 @@
+"""
+ARGO Derived Properties
+TEOS-10 quantities computed with gsw on whole (N_PROF, N_LEVELS) blocks
+right after parsing, so they are stored next to the measurements instead of
+being recomputed per query
+"""
+
+import warnings
+import gsw
+import numpy as np
+
+
+def _to_levels(midpoints):
+    """(N_PROF, N_LEVELS-1) mid-level values -> (N_PROF, N_LEVELS), averaging the two neighbours"""
+    pad = np.full((midpoints.shape[0], 1), np.nan)
+    above = np.hstack([pad, midpoints])
+    below = np.hstack([midpoints, pad])
+    return np.where(np.isnan(above), below, np.where(np.isnan(below), above, (above + below) / 2))
+
+
+def derive_properties(pressure, temperature, salinity, latitude, longitude):
+    """
+    TEOS-10 properties of a block of profiles
+
+    Args:
+        pressure, temperature, salinity: (N_PROF, N_LEVELS) sea pressure (dbar),
+            in-situ temperature (ITS-90 °C) and practical salinity, levels in order
+        latitude, longitude: (N_PROF,) profile positions
+
+    Returns:
+        dict of (N_PROF, N_LEVELS) float32 blocks keyed by DERIVED_COLUMNS:
+        depth (m), absolute_salinity (g/kg), conservative_temperature and
+        potential_temperature (°C, 0 dbar reference), potential_density
+        (kg/m³, 0 dbar reference), sigma_theta (potential density - 1000)
+        and buoyancy_frequency (N², 1/s²; NaN where not computable)
+    """
+    p = np.asarray(pressure, dtype=np.float64)
+    t = np.asarray(temperature, dtype=np.float64)
+    sp = np.asarray(salinity, dtype=np.float64)
+    lat = np.asarray(latitude, dtype=np.float64)[:, np.newaxis]
+    lon = np.asarray(longitude, dtype=np.float64)[:, np.newaxis]
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        sa = gsw.SA_from_SP(sp, p, lon, lat)
+        ct = gsw.CT_from_t(sa, t, p)
+        sigma0 = gsw.sigma0(sa, ct)
+        properties = {
+            'depth': -gsw.z_from_p(p, lat),
+            'absolute_salinity': sa,
+            'conservative_temperature': ct,
+            'potential_temperature': gsw.pt_from_CT(sa, ct),
+            'potential_density': sigma0 + 1000.0,
+            'sigma_theta': sigma0,
+        }
+        if p.shape[1] > 1:
+            n2, _ = gsw.Nsquared(sa, ct, p, lat, axis=1)
+            n2 = np.where(np.isfinite(n2), n2, np.nan)
+            properties['buoyancy_frequency'] = _to_levels(n2)
+        else:
+            properties['buoyancy_frequency'] = np.full(p.shape, np.nan)
+
+    return {name: values.astype(np.float32) for name, values in properties.items()}
@@ -8,18 +8,36 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 from loguru import logger
+import json
+import os
 import sys
+from tqdm import tqdm
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.utils.config import settings
 from src.utils.logger import setup_logger
+from src.data.index_store import (
+    INDEX_CSV_DTYPES, INDEX_DATE_FORMAT, IndexStoreWriter, write_index_store
+)
+from src.data.index_filters import IndexFilter
+from src.data.index_diff import compute_index_changes, get_previous_store_path
+from src.data.index_stats import (
+    IndexStatsAccumulator, compute_index_statistics, load_index_statistics, save_index_statistics
+)
 
 # Setup logging
 setup_logger()
 
-# ARGO Index URL
-ARGO_INDEX_URL = "https://data-argo.ifremer.fr/ar_index_global_prof.txt"
+# ARGO Index URL (override with ARGO_INDEX_URL, e.g. to point at a local mirror)
+ARGO_INDEX_URL = settings.argo_index_url
+
+# Download settings
+INDEX_CHUNK_SIZE = 1024 * 1024  # 1 MB chunks for the multi-hundred-MB index
+REQUEST_TIMEOUT = 60
+
+# Rows per chunk for the streaming index parser (bounds peak memory)
+INDEX_PARSE_CHUNKSIZE = 100_000
 
 # Global Coverage - All Ocean Regions
 # No geographic filtering - download from all regions:
@@ -30,44 +48,139 @@ ARGO_INDEX_URL = "https://data-argo.ifremer.fr/ar_index_global_prof.txt"
 # - Arctic Ocean
 
 # Date range: 2018-2024 (6 years for ~20-25 GB dataset)
-DATE_START = "2018-01-01"
-DATE_END = "2024-12-31"
+# Override with INDEX_DATE_START/INDEX_DATE_END; other filters see IndexFilter
+DATE_START = settings.index_date_start
+DATE_END = settings.index_date_end
 
 
-def download_index_file():
-    """Download the ARGO global index file"""
-    logger.info(f"Downloading ARGO index from {ARGO_INDEX_URL}")
-    
-    # Create index directory
+def get_index_path():
+    """Local path of the raw ARGO global index file"""
     index_dir = Path(settings.data_raw_dir) / "index"
     index_dir.mkdir(parents=True, exist_ok=True)
+    return index_dir / "ar_index_global_prof.txt"
+
+
+def _sync_state_path(index_file):
+    """Sidecar file holding the validators of the last successful fetch"""
+    return index_file.with_suffix(".sync.json")
+
+
+def load_sync_state(index_file):
+    """Load ETag/Last-Modified/length recorded for the local index, if any"""
+    state_file = _sync_state_path(index_file)
+    if not state_file.exists():
+        return None
     
-    index_file = index_dir / "ar_index_global_prof.txt"
+    try:
+        with open(state_file) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable sync state {state_file}: {e}")
+        return None
+
+
+def save_sync_state(index_file, url, response, length):
+    """Record the validators and byte length of the local index"""
+    state = {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'length': length,
+        'synced_at': datetime.now().isoformat()
+    }
+    with open(_sync_state_path(index_file), 'w') as f:
+        json.dump(state, f, indent=2)
+    return state
+
+
+def _write_chunks(chunks, f, total_size, desc):
+    """Copy streamed response chunks into an open file with a progress bar"""
+    written = 0
+    with tqdm(total=total_size or None, desc=desc,
+              unit='B', unit_scale=True, unit_divisor=1024) as pbar:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+            pbar.update(len(chunk))
+    return written
+
+
+def _save_index(response, url, index_file):
+    """Stream a 200 response into the local index and record its validators"""
+    response.raise_for_status()
+    tmp_file = index_file.with_suffix(".txt.part")
+    
+    total_size = int(response.headers.get('content-length', 0))
+    logger.info(f"Index file size: {total_size / 1024 / 1024:.2f} MB")
+    
+    # Write to a temp file so an interrupted download never replaces a good index
+    with open(tmp_file, 'wb') as f:
+        chunks = response.iter_content(chunk_size=INDEX_CHUNK_SIZE)
+        length = _write_chunks(chunks, f, total_size, "Downloading index")
+    os.replace(tmp_file, index_file)
+    
+    save_sync_state(index_file, url, response, length)
+    logger.success(f"Index file downloaded: {index_file}")
+    return index_file
+
+
+def download_index_file(url=ARGO_INDEX_URL):
+    """Download the complete ARGO global index file"""
+    logger.info(f"Downloading ARGO index from {url}")
     
     try:
-        # Download with progress
-        response = requests.get(ARGO_INDEX_URL, stream=True)
-        response.raise_for_status()
+        response = requests.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+        return _save_index(response, url, get_index_path())
         
-        total_size = int(response.headers.get('content-length', 0))
-        logger.info(f"Index file size: {total_size / 1024 / 1024:.2f} MB")
+    except Exception as e:
+        logger.error(f"Failed to download index: {e}")
+        raise
+
+
+def sync_index_file(url=ARGO_INDEX_URL):
+    """
+    Refresh the local ARGO index with one conditional request
+    
+    Sends the ETag/Last-Modified stored by the previous fetch:
+    - 304 Not Modified: the local index is already current
+    - 200: the index changed and is downloaded in full
+    
+    The GDAC regenerates the whole file whenever it changes (new
+    '# Date of update' header, rows inserted and rewritten in place, not just
+    appended), so a changed index is never patched piecewise.
+    """
+    index_file = get_index_path()
+    state = load_sync_state(index_file)
+    
+    if state is None or not index_file.exists() or state.get('url') != url:
+        logger.info("No previous sync state - downloading full index")
+        return download_index_file(url)
+    
+    if index_file.stat().st_size != state['length']:
+        logger.warning("Local index size differs from sync state - downloading full index")
+        return download_index_file(url)
+    
+    headers = {}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    
+    logger.info(f"Syncing ARGO index from {url} (local copy: {state['length'] / 1024 / 1024:.2f} MB)")
+    
+    try:
+        response = requests.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
         
-        # Save to file
-        with open(index_file, 'wb') as f:
-            downloaded = 0
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total_size > 0:
-                    progress = (downloaded / total_size) * 100
-                    print(f"\rDownloading: {progress:.1f}%", end='', flush=True)
+        if response.status_code == 304:
+            response.close()
+            logger.success("Index is up to date (304 Not Modified)")
+            return index_file
         
-        print()  # New line after progress
-        logger.success(f"Index file downloaded: {index_file}")
-        return index_file
+        logger.info("Remote index changed - downloading full index")
+        return _save_index(response, url, index_file)
         
     except Exception as e:
-        logger.error(f"Failed to download index: {e}")
+        logger.error(f"Failed to sync index: {e}")
         raise
 
 
@@ -81,7 +194,8 @@ def parse_index_file(index_file):
         df = pd.read_csv(
             index_file,
             comment='#',
-            skipinitialspace=True
+            skipinitialspace=True,
+            dtype=INDEX_CSV_DTYPES
         )
         
         logger.info(f"Total profiles in index: {len(df):,}")
@@ -96,77 +210,136 @@ def parse_index_file(index_file):
 
 def filter_by_date(df):
     """Filter profiles by date range (GLOBAL coverage - all regions)"""
-    logger.info(f"Filtering for dates: {DATE_START} to {DATE_END} (GLOBAL coverage)")
+    return filter_index(df, IndexFilter(date_start=DATE_START, date_end=DATE_END))
+
+
+def filter_index(df, index_filter):
+    """Filter profiles with an IndexFilter (dates, regions, institutions, ...)"""
+    logger.info(f"Filtering index: {index_filter.describe()}")
     
     # Convert date column to datetime
-    df['date'] = pd.to_datetime(df['date'], format='%Y%m%d%H%M%S', errors='coerce')
-    
-    # Filter by date range
-    start_date = pd.to_datetime(DATE_START)
-    end_date = pd.to_datetime(DATE_END)
+    df['date'] = pd.to_datetime(df['date'], format=INDEX_DATE_FORMAT, errors='coerce')
     
-    mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-    filtered_df = df[mask].copy()
+    filtered_df = df[index_filter.mask(df)]
     
-    logger.info(f"Profiles in date range: {len(filtered_df):,}")
+    logger.info(f"Profiles matching filters: {len(filtered_df):,}")
     
     return filtered_df
 
 
-def save_filtered_index(df):
-    """Save filtered index to CSV"""
-    output_file = Path(settings.data_raw_dir) / "index" / "global_argo_2018_2024.csv"
+def iter_index_chunks(index_file, chunksize=INDEX_PARSE_CHUNKSIZE):
+    """Iterate over the raw index in typed, fixed-size DataFrame chunks"""
+    return pd.read_csv(
+        index_file,
+        comment='#',
+        skipinitialspace=True,
+        dtype=INDEX_CSV_DTYPES,
+        chunksize=chunksize
+    )
+
+
+def stream_filter_index(index_file, index_filter=None, chunksize=INDEX_PARSE_CHUNKSIZE,
+                        store_dir=None, keep_previous=False):
+    """
+    Parse and filter the index chunk by chunk, writing matches to the index store
+    
+    Peak memory is bounded by ``chunksize`` rather than the size of the index:
+    each chunk is filtered and appended to the store before the next is read.
+    Statistics of the selection are accumulated on the way and saved as a sidecar.
+    
+    Args:
+        index_file: Raw ar_index_global_prof.txt
+        index_filter: IndexFilter to apply (defaults to the INDEX_* settings)
+        chunksize: Rows per chunk
+        store_dir: Output store (defaults to the filtered index store)
+        keep_previous: Keep the replaced store as a snapshot for index diffing
     
-    df.to_csv(output_file, index=False)
-    logger.success(f"Filtered index saved: {output_file}")
+    Returns:
+        Path of the written index store
+    """
+    logger.info(f"Streaming index {index_file} in chunks of {chunksize:,} rows")
+    index_filter = index_filter or IndexFilter.from_settings()
+    logger.info(f"Filtering index: {index_filter.describe()}")
     
-    return output_file
+    total_rows = 0
+    stats = IndexStatsAccumulator()
+    previous_dir = get_previous_store_path(store_dir) if keep_previous else None
+    
+    with IndexStoreWriter(store_dir, previous_dir=previous_dir) as writer:
+        for chunk in iter_index_chunks(index_file, chunksize):
+            chunk['date'] = pd.to_datetime(chunk['date'], format=INDEX_DATE_FORMAT, errors='coerce')
+            selected = chunk[index_filter.mask(chunk)]
+            writer.write(selected)
+            stats.update(selected)
+            total_rows += len(chunk)
+    
+    save_index_statistics(stats.to_dict(), writer.store_dir)
+    
+    logger.info(f"Total profiles in index: {total_rows:,}")
+    logger.info(f"Profiles matching filters: {writer.rows_written:,}")
+    
+    return writer.store_dir
 
 
-def print_statistics(df):
-    """Print statistics about the filtered dataset"""
+def save_filtered_index(df):
+    """Save filtered index to the typed, year-partitioned Parquet store"""
+    output_dir = write_index_store(df)
+    save_index_statistics(compute_index_statistics(df), output_dir)
+    logger.success(f"Filtered index saved: {output_dir}")
+    
+    return output_dir
+
+
+def print_statistics(stats=None):
+    """Print statistics about the filtered dataset (from the statistics sidecar)"""
+    stats = stats or load_index_statistics()
+    if stats is None:
+        logger.warning("No index statistics available - run the index filtering first")
+        return
+    
     logger.info("\n" + "="*60)
     logger.info("FILTERED DATASET STATISTICS")
     logger.info("="*60)
     
-    logger.info(f"Total Profiles: {len(df):,}")
-    logger.info(f"Unique Floats: {df['file'].str.split('/').str[0].nunique():,}")
-    logger.info(f"Date Range: {df['date'].min()} to {df['date'].max()}")
-    logger.info(f"Latitude Range: {df['latitude'].min():.2f}° to {df['latitude'].max():.2f}°")
-    logger.info(f"Longitude Range: {df['longitude'].min():.2f}° to {df['longitude'].max():.2f}°")
+    logger.info(f"Total Profiles: {stats['profile_count']:,}")
+    logger.info(f"Unique Floats: {stats['float_count']:,}")
+    logger.info(f"Date Range: {stats['date_min']} to {stats['date_max']}")
+    if stats['latitude_range']:
+        lat_min, lat_max = stats['latitude_range']
+        lon_min, lon_max = stats['longitude_range']
+        logger.info(f"Latitude Range: {lat_min:.2f}° to {lat_max:.2f}°")
+        logger.info(f"Longitude Range: {lon_min:.2f}° to {lon_max:.2f}°")
     
     # Profiles per year
-    df['year'] = df['date'].dt.year
-    profiles_per_year = df.groupby('year').size()
     logger.info("\nProfiles per year:")
-    for year, count in profiles_per_year.items():
+    for year, count in stats['per_year'].items():
         logger.info(f"  {year}: {count:,}")
     
     logger.info("="*60 + "\n")
 
 
-def main():
+def main(full_refresh=False, index_filter=None):
     """Main execution"""
+    index_filter = index_filter or IndexFilter.from_settings()
+    
     logger.info("Starting ARGO Index Download and Filtering")
-    logger.info(f"Target Region: GLOBAL (All Ocean Regions)")
-    logger.info(f"Target Period: {DATE_START} to {DATE_END}")
+    logger.info(f"Target Selection: {index_filter.describe()}")
     logger.info(f"Expected Dataset Size: 20-25 GB")
     
     try:
-        # Step 1: Download index
-        index_file = download_index_file()
+        # Step 1: Download index (incremental unless a full refresh is requested)
+        index_file = download_index_file() if full_refresh else sync_index_file()
         
-        # Step 2: Parse index
-        df = parse_index_file(index_file)
+        # Step 2: Parse, filter and save in bounded-memory chunks
+        output_file = stream_filter_index(index_file, index_filter, keep_previous=True)
         
-        # Step 3: Filter by date (GLOBAL coverage - no region filter)
-        df = filter_by_date(df)
+        # Step 3: Diff against the previous snapshot to drive incremental downloads
+        changes = compute_index_changes(output_file)
+        changes_file = changes.save()
+        logger.info(f"Index change set saved: {changes_file}")
         
-        # Step 4: Save filtered index
-        output_file = save_filtered_index(df)
-        
-        # Step 5: Print statistics
-        print_statistics(df)
+        # Step 4: Print statistics
+        print_statistics(load_index_statistics(output_file))
         
         logger.success("Index download and filtering complete!")
         logger.info(f"Next step: Download NetCDF files using: python src/data/download_netcdf.py")
@@ -179,4 +352,15 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Download and filter the ARGO global index')
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Re-download the whole index instead of syncing the appended tail'
+    )
+    IndexFilter.add_arguments(parser)
+    
+    args = parser.parse_args()
+    main(full_refresh=args.full, index_filter=IndexFilter.from_args(args))
@@ -0,0 +1,206 @@
+"""
+ARGO Download Integrity
+Temp-file writes with atomic rename, HTTP Range resume and size/checksum
+verification, shared by the threaded and async NetCDF download engines
+"""
+
+import base64
+import hashlib
+import os
+import re
+from pathlib import Path
+
+PART_SUFFIX = '.part'
+
+# netCDF classic / 64-bit offset, and netCDF-4 (HDF5) signatures
+NETCDF_MAGIC = (b'CDF\x01', b'CDF\x02', b'\x89HDF\r\n\x1a\n')
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(?:(\d+)-\d+|\*)/(\d+)")
+_DIGEST_MD5 = re.compile(r"\bmd5\s*=\s*:?([A-Za-z0-9+/=]+):?", re.IGNORECASE)
+
+
+class IntegrityError(Exception):
+    """Downloaded bytes don't match what the server announced"""
+
+
+def partial_path(path):
+    """'.../R2901234_001.nc' -> '.../R2901234_001.nc.part'"""
+    path = Path(path)
+    return path.with_name(path.name + PART_SUFFIX)
+
+
+def file_md5(path, block_size=1024 * 1024):
+    """MD5 hex digest of a local file"""
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def parse_content_range(value):
+    """'bytes 100-199/500' -> (100, 500); 'bytes */500' -> (None, 500); else None"""
+    match = _CONTENT_RANGE.match(value or '')
+    if not match:
+        return None
+    start = int(match.group(1)) if match.group(1) is not None else None
+    return start, int(match.group(2))
+
+
+def announced_md5(headers, ranged):
+    """
+    MD5 of the whole file announced by the server, as hex (or None)
+
+    Digest/Repr-Digest describe the full representation; Content-MD5 only the
+    body, so it is ignored for ranged responses.
+    """
+    for name in ('Repr-Digest', 'Digest'):
+        match = _DIGEST_MD5.search(headers.get(name) or '')
+        if match:
+            return base64.b64decode(match.group(1)).hex()
+
+    content_md5 = headers.get('Content-MD5')
+    if content_md5 and not ranged:
+        return base64.b64decode(content_md5).hex()
+    return None
+
+
+class PartialDownload:
+    """
+    One file being written to its .part sibling
+
+    Usage per attempt::
+
+        download = PartialDownload(path, resume=True)
+        response = get(url, headers=download.request_headers())
+        with download:
+            if download.start(response.status_code, response.headers):
+                for chunk in body:
+                    download.write(chunk)
+        info = download.finish()
+
+    The final path only ever appears through os.replace() of a verified file,
+    so an existing final path is always complete. A failed attempt leaves the
+    .part file behind for the next attempt to resume with a Range request.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = Path(path)
+        self.part = partial_path(self.path)
+        if not resume and self.part.exists():
+            self.part.unlink()
+
+        self.offset = self.part.stat().st_size if self.part.exists() else 0
+        self.size = 0
+        self.expected_size = None
+        self.expected_md5 = None
+        self.etag = None
+        self._md5 = hashlib.md5()
+        self._file = None
+
+    def request_headers(self):
+        """Range header continuing the existing partial file"""
+        return {'Range': f'bytes={self.offset}-'} if self.offset else {}
+
+    def start(self, status_code, headers):
+        """
+        Prepare the .part file for the response body
+
+        Returns False when there is no body to read because the server reports
+        (416) that the partial file already holds the whole resource.
+        """
+        self.etag = headers.get('ETag')
+
+        if status_code == 416:
+            content_range = parse_content_range(headers.get('Content-Range'))
+            if self.offset and content_range and content_range[1] == self.offset:
+                self.expected_size = self.offset
+                self.expected_md5 = announced_md5(headers, ranged=True)
+                self._hash_existing()
+                return False
+            self._discard()
+            raise IntegrityError(f"Range not satisfiable for {self.path.name} (partial file discarded)")
+
+        if status_code == 206:
+            content_range = parse_content_range(headers.get('Content-Range'))
+            if not content_range or content_range[0] != self.offset:
+                self._discard()
+                raise IntegrityError(f"Unexpected Content-Range {headers.get('Content-Range')!r}")
+            self.expected_size = content_range[1]
+            self.expected_md5 = announced_md5(headers, ranged=True)
+            self._hash_existing()
+            mode = 'ab'
+        else:
+            # Full body (the server may ignore Range): start over
+            self.offset = 0
+            encoding = (headers.get('Content-Encoding') or 'identity').lower()
+            length = headers.get('Content-Length')
+            # Content-Length counts encoded bytes, the client hands us decoded ones
+            self.expected_size = int(length) if length and encoding == 'identity' else None
+            self.expected_md5 = announced_md5(headers, ranged=False)
+            mode = 'wb'
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.part, mode)
+        return True
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self._md5.update(chunk)
+        self.size += len(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Keep whatever was written for the next attempt to resume
+        self.close()
+        return False
+
+    def finish(self):
+        """
+        Verify the .part file and atomically move it into place
+
+        Returns:
+            {'size', 'mtime', 'checksum' (md5 hex), 'etag'} of the completed file
+        """
+        self.close()
+        total = self.offset + self.size
+        checksum = self._md5.hexdigest()
+
+        if self.expected_size is not None and total != self.expected_size:
+            if total > self.expected_size:
+                self._discard()
+            raise IntegrityError(f"Size mismatch for {self.path.name}: {total} != {self.expected_size}")
+
+        if self.expected_md5 and checksum != self.expected_md5:
+            self._discard()
+            raise IntegrityError(f"Checksum mismatch for {self.path.name}")
+
+        if self.path.suffix == '.nc':
+            with open(self.part, 'rb') as f:
+                head = f.read(8)
+            if not head.startswith(NETCDF_MAGIC):
+                self._discard()
+                raise IntegrityError(f"Not a NetCDF file: {self.path.name}")
+
+        os.replace(self.part, self.path)
+        mtime = os.stat(self.path).st_mtime
+        return {'size': total, 'mtime': mtime, 'checksum': checksum, 'etag': self.etag}
+
+    def _hash_existing(self):
+        """Feed the bytes already on disk into the checksum"""
+        with open(self.part, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                self._md5.update(block)
+
+    def _discard(self):
+        self.close()
+        if self.part.exists():
+            self.part.unlink()
+        self.offset = 0
@@ -7,7 +7,7 @@ Supports parallel downloads with progress tracking
 import requests
 import pandas as pd
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from loguru import logger
 import sys
 import time
@@ -17,64 +17,233 @@ from tqdm import tqdm
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.utils.config import settings
 from src.utils.logger import setup_logger
+from src.data.index_store import get_index_store_path, read_index_store
+from src.data.index_diff import DELETE, IndexChangeSet
+from src.data.async_download import download_files_async
+from src.data.concurrency import AIMDController, BandwidthLimiter
+from src.data.download_integrity import NETCDF_MAGIC, PartialDownload, announced_md5, file_md5, partial_path
+from src.data.manifest import PENDING, FileManifest
+from src.data.aggregate_download import (
+    count_float_profiles, covered_by_aggregates, plan_aggregate_downloads, route_changes_to_aggregates
+)
+from src.data.download_index import get_index_path
+from src.data.scheduler import prioritize
 
 # Setup logging
 setup_logger()
 
-# ARGO GDAC Base URL
-ARGO_BASE_URL = "https://data-argo.ifremer.fr"
+# ARGO GDAC Base URL (override with ARGO_GDAC_URL, e.g. to point at a local mirror)
+ARGO_BASE_URL = settings.argo_gdac_url.rstrip("/")
 
 # Download settings for GLOBAL dataset (20-25 GB)
-MAX_WORKERS = 10  # Parallel downloads (increased for faster download)
-CHUNK_SIZE = 8192  # Download chunk size
+DOWNLOAD_ENGINE = settings.download_engine  # "async" (pooled HTTP/2 client) or "threads"
+DOWNLOAD_CONCURRENCY = settings.download_concurrency  # Initial request window for the async engine
+DOWNLOAD_ADAPTIVE = settings.download_adaptive  # AIMD window between the min/max below
+DOWNLOAD_MIN_CONCURRENCY = settings.download_min_concurrency
+DOWNLOAD_MAX_CONCURRENCY = settings.download_max_concurrency
+DOWNLOAD_AGGREGATE = settings.download_aggregate  # Per-float <wmo>_prof.nc where coverage allows
+AGGREGATE_MIN_COVERAGE = settings.download_aggregate_min_coverage
+BANDWIDTH_LIMIT = settings.download_bandwidth_limit  # MB/s across all workers, 0 = unlimited
+QUEUE_SIZE = settings.download_queue_size  # Downloads queued/in flight at once
+MAX_WORKERS = 10  # Parallel downloads for the thread engine
+CHUNK_SIZE = 64 * 1024  # Download chunk size
 RETRY_ATTEMPTS = 3  # Retry failed downloads
 BATCH_SIZE = 1000  # Process in batches for progress tracking
 
 
-def load_filtered_index():
-    """Load the filtered index file (GLOBAL coverage)"""
-    index_file = Path(settings.data_raw_dir) / "index" / "global_argo_2018_2024.csv"
+def load_filtered_index(columns=None, filters=None, index_filter=None):
+    """
+    Load the filtered index (GLOBAL coverage)
     
-    if not index_file.exists():
-        logger.error(f"Filtered index not found: {index_file}")
+    Args:
+        columns: Subset of index columns to load (default: all)
+        filters: pyarrow filter expression pushed down to the Parquet store,
+                 see src.data.index_store.build_store_filters()
+        index_filter: IndexFilter narrowing the selection further (e.g. one region);
+                      its coarse predicates are pushed down, the rest applied after
+    """
+    store_dir = get_index_store_path()
+    
+    if not store_dir.exists():
+        logger.error(f"Filtered index not found: {store_dir}")
         logger.info("Run download_index.py first!")
-        raise FileNotFoundError(f"Index file not found: {index_file}")
+        raise FileNotFoundError(f"Index store not found: {store_dir}")
+    
+    if index_filter is not None:
+        store_filters = index_filter.to_store_filters()
+        if store_filters is not None:
+            filters = store_filters if filters is None else filters & store_filters
+    
+    df = read_index_store(store_dir, columns=columns, filters=filters)
+    
+    if index_filter is not None:
+        df = index_filter.apply(df)
     
-    df = pd.read_csv(index_file)
     logger.info(f"Loaded {len(df):,} profiles from GLOBAL index (2018-2024)")
     
     return df
 
 
-def download_file(url, output_path, retry=0):
-    """Download a single file with retry logic"""
+def download_file(url, output_path, retry=0, overwrite=False, limiter=None):
+    """
+    Download a single file with retry logic
+    
+    Writes to a .part file, resumes it with a Range request on retry and
+    atomically renames it into place once size/checksum are verified.
+    
+    Returns:
+        (success, error, info) - info holds size/checksum/etag of the verified file
+    """
+    # A stale partial is only kept when we aren't replacing the file
+    download = PartialDownload(output_path, resume=retry > 0 or not overwrite)
+    
     try:
-        response = requests.get(url, stream=True, timeout=30)
-        response.raise_for_status()
-        
-        # Create parent directory
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        response = requests.get(url, stream=True, timeout=30, headers=download.request_headers())
+        if response.status_code != 416:
+            response.raise_for_status()
         
         # Download file
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                f.write(chunk)
+        with download:
+            if download.start(response.status_code, response.headers):
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    download.write(chunk)
+                    if limiter:
+                        limiter.throttle(len(chunk))
         
-        return True, None
+        return True, None, download.finish()
         
     except Exception as e:
         if retry < RETRY_ATTEMPTS:
             logger.warning(f"Retry {retry + 1}/{RETRY_ATTEMPTS} for {url}")
             time.sleep(2 ** retry)  # Exponential backoff
-            return download_file(url, output_path, retry + 1)
+            return download_file(url, output_path, retry + 1, overwrite, limiter)
         else:
-            return False, str(e)
+            return False, str(e), None
+
+
+def verify_existing_file(url, local_path):
+    """
+    Check a local file the manifest doesn't know about against the server
+    
+    Files from before the manifest may be truncated. A HEAD request gives the
+    size (and MD5 when the server announces one) to compare with the local copy.
+    
+    Returns:
+        info for FileManifest.record_download() if the file is complete, else None
+    """
+    try:
+        response = requests.head(url, timeout=30, allow_redirects=True)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.debug(f"Could not verify {local_path.name}: {e}")
+        return None
+    
+    stat = local_path.stat()
+    length = response.headers.get('Content-Length')
+    if length is None or int(length) != stat.st_size:
+        return None
+    
+    if local_path.suffix == '.nc':
+        with open(local_path, 'rb') as f:
+            if not f.read(8).startswith(NETCDF_MAGIC):
+                return None
+    
+    checksum = file_md5(local_path)
+    expected_md5 = announced_md5(response.headers, ranged=False)
+    if expected_md5 and checksum != expected_md5:
+        return None
+    
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'checksum': checksum,
+            'etag': response.headers.get('ETag')}
+
 
+def get_netcdf_dir():
+    """Root of the local NetCDF mirror"""
+    return Path(settings.data_raw_dir) / "netcdf"
 
-def download_netcdf_files(df, limit=None):
-    """Download NetCDF files in parallel"""
+
+def download_files_threaded(downloads, overwrite=False, on_success=None, limiter=None,
+                            queue_size=QUEUE_SIZE):
+    """
+    Download (url, local_path) pairs with a thread pool of plain requests
+    
+    At most ``queue_size`` futures exist at a time; new downloads are submitted,
+    in the given (priority) order, as earlier ones complete.
+    """
+    successful = 0
+    failed_urls = []
+    downloads_iter = iter(downloads)
+    futures = {}
+    total = len(downloads) if hasattr(downloads, '__len__') else None
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        
+        def submit_next():
+            item = next(downloads_iter, None)
+            if item is not None:
+                url, path = item
+                futures[executor.submit(download_file, url, path, 0, overwrite, limiter)] = item
+        
+        # Fill the bounded queue
+        for _ in range(max(queue_size, MAX_WORKERS)):
+            submit_next()
+        
+        # Process completed downloads with progress bar
+        with tqdm(total=total, desc="Downloading", unit="file") as pbar:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, path = futures.pop(future)
+                    success, error, info = future.result()
+                    submit_next()
+                    
+                    if success:
+                        successful += 1
+                        if on_success:
+                            on_success(path, info)
+                    else:
+                        failed_urls.append((url, error))
+                        logger.error(f"Failed: {url} - {error}")
+                    
+                    pbar.update(1)
+                    pbar.set_postfix({
+                        'success': successful,
+                        'failed': len(failed_urls)
+                    })
+    
+    return successful, failed_urls
+
+
+def create_download_controller():
+    """Concurrency controller for the async engine, from settings"""
+    if not DOWNLOAD_ADAPTIVE:
+        return AIMDController.fixed(DOWNLOAD_CONCURRENCY)
+    
+    return AIMDController(
+        initial=DOWNLOAD_CONCURRENCY,
+        minimum=DOWNLOAD_MIN_CONCURRENCY,
+        maximum=DOWNLOAD_MAX_CONCURRENCY
+    )
+
+
+def download_netcdf_files(df, limit=None, overwrite=False, aggregate=None, on_complete=None):
+    """
+    Download NetCDF files in parallel
+    
+    Args:
+        df: Index rows to fetch ('file' column)
+        limit: Only the first ``limit`` rows (for testing)
+        overwrite: Re-download files that already exist locally (re-processed on the GDAC)
+        aggregate: Fetch per-float <wmo>_prof.nc files for floats the selection
+                   mostly covers (default: DOWNLOAD_AGGREGATE; ignored with overwrite)
+        on_complete: Called with the local path of each verified file as soon as
+                     it is recorded (e.g. to hand it to a parser)
+    """
     logger.info("Starting NetCDF file downloads...")
     
+    # Most valuable data first (DOWNLOAD_PRIORITY)
+    df = prioritize(df)
+    
     # Limit number of files if specified (for testing)
     if limit:
         df = df.head(limit)
@@ -82,57 +251,101 @@ def download_netcdf_files(df, limit=None):
     
     # Prepare download list
     downloads = []
-    netcdf_dir = Path(settings.data_raw_dir) / "netcdf"
+    netcdf_dir = get_netcdf_dir()
+    manifest = FileManifest(root=netcdf_dir)
+    
+    if overwrite:
+        # Replaced files are incomplete until their new version is verified
+        manifest.remove(df['file'])
+        completed = set()
+    else:
+        completed = manifest.completed()
+        # Floats already mirrored as <wmo>_prof.nc never get single-profile files too
+        covered = covered_by_aggregates(df['file'], completed)
+        if covered.any():
+            logger.info(f"Skipping {int(covered.sum()):,} profiles held by downloaded aggregate files")
+            df = df.loc[~covered]
+    
+    if aggregate is None:
+        aggregate = DOWNLOAD_AGGREGATE
+    if aggregate and not overwrite:
+        total_counts = count_float_profiles(get_index_path())
+        aggregates, singles = plan_aggregate_downloads(
+            df, total_counts, AGGREGATE_MIN_COVERAGE, completed
+        )
+        df = pd.concat([aggregates, singles], ignore_index=True).sort_values('priority', kind='stable')
     
-    for idx, row in df.iterrows():
-        file_path = row['file']  # e.g., "aoml/2901234/profiles/D2901234_001.nc"
+    date_updates = df['date_update'] if 'date_update' in df else pd.Series(None, index=df.index, dtype=object)
+    source_dates = {}
+    existing = []
+    
+    for file_path, date_update in zip(df['file'], date_updates):  # e.g., "aoml/2901234/profiles/D2901234_001.nc"
+        # Skip files the manifest knows are complete (no stat needed)
+        if file_path in completed:
+            continue
+        
         url = f"{ARGO_BASE_URL}/{file_path}"
         
         # Create local path
         local_path = netcdf_dir / file_path
+        source_dates[local_path] = date_update if pd.notna(date_update) else None
         
-        # Skip if already downloaded
-        if local_path.exists():
+        if overwrite:
+            # The stale copy must not be mistaken for a finished download
+            local_path.unlink(missing_ok=True)
+        elif local_path.exists():
+            existing.append((url, local_path))
             continue
         
         downloads.append((url, local_path))
     
+    def record_download(local_path, info):
+        manifest.record_download(local_path, info, source_dates.get(local_path))
+        if on_complete:
+            on_complete(local_path)
+    
+    if existing:
+        # Verified in place; anything else is fetched into its own .part file,
+        # so the old copy stays at its final path until a new one replaces it
+        logger.info(f"Verifying {len(existing):,} local files missing from the manifest...")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            infos = executor.map(lambda item: verify_existing_file(*item), existing)
+            verified = 0
+            for (url, local_path), info in zip(existing, infos):
+                if info is not None:
+                    record_download(local_path, info)
+                    verified += 1
+                else:
+                    downloads.append((url, local_path))
+        logger.info(f"Verified {verified:,} existing files")
+    
     logger.info(f"Files to download: {len(downloads):,}")
     
     if len(downloads) == 0:
+        manifest.close()
         logger.success("All files already downloaded!")
         return
     
-    # Download in parallel with progress bar
-    successful = 0
-    failed = 0
-    failed_urls = []
+    limiter = BandwidthLimiter.from_mbps(BANDWIDTH_LIMIT)
     
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Submit all downloads
-        futures = {
-            executor.submit(download_file, url, path): (url, path)
-            for url, path in downloads
-        }
-        
-        # Process completed downloads with progress bar
-        with tqdm(total=len(downloads), desc="Downloading", unit="file") as pbar:
-            for future in as_completed(futures):
-                url, path = futures[future]
-                success, error = future.result()
-                
-                if success:
-                    successful += 1
-                else:
-                    failed += 1
-                    failed_urls.append((url, error))
-                    logger.error(f"Failed: {url} - {error}")
-                
-                pbar.update(1)
-                pbar.set_postfix({
-                    'success': successful,
-                    'failed': failed
-                })
+    # Download in parallel with progress bar
+    with manifest:
+        if DOWNLOAD_ENGINE == 'async':
+            successful, failed_urls = download_files_async(
+                downloads,
+                chunk_size=CHUNK_SIZE,
+                retry_attempts=RETRY_ATTEMPTS,
+                controller=create_download_controller(),
+                overwrite=overwrite,
+                on_success=record_download,
+                limiter=limiter,
+                queue_size=QUEUE_SIZE
+            )
+        else:
+            successful, failed_urls = download_files_threaded(
+                downloads, overwrite=overwrite, on_success=record_download, limiter=limiter
+            )
+    failed = len(failed_urls)
     
     # Summary
     logger.info("\n" + "="*60)
@@ -146,56 +359,116 @@ def download_netcdf_files(df, limit=None):
     # Save failed URLs for retry
     if failed_urls:
         failed_file = Path(settings.data_raw_dir) / "index" / "failed_downloads.txt"
+        failed_file.parent.mkdir(parents=True, exist_ok=True)
         with open(failed_file, 'w') as f:
             for url, error in failed_urls:
                 f.write(f"{url}\t{error}\n")
         logger.warning(f"Failed URLs saved to: {failed_file}")
 
 
+def remove_obsolete_files(changes):
+    """Delete local files that were removed from, or renamed in, the index"""
+    netcdf_dir = get_netcdf_dir()
+    removed = 0
+    obsolete = changes.obsolete_files
+    
+    for file_path in obsolete:
+        local_path = netcdf_dir / file_path
+        if local_path.exists():
+            local_path.unlink()
+            removed += 1
+        partial_path(local_path).unlink(missing_ok=True)
+    
+    with FileManifest(root=netcdf_dir) as manifest:
+        manifest.remove(obsolete)
+    
+    logger.info(f"Removed {removed:,} obsolete NetCDF files")
+    return removed
+
+
+def download_index_changes(changes=None, limit=None, on_complete=None):
+    """
+    Apply an index change set to the local mirror
+    
+    Only files added or re-processed since the previous index snapshot are
+    fetched (overwriting stale copies); deleted/superseded files are removed.
+    Floats mirrored as a per-float aggregate re-fetch that file instead.
+    
+    Returns:
+        Local paths of the files that need (re-)parsing
+    """
+    changes = changes or IndexChangeSet.load()
+    counts = changes.summary()
+    logger.info(f"Applying index changes: {counts}")
+    
+    remove_obsolete_files(changes)
+    
+    with FileManifest(root=get_netcdf_dir()) as manifest:
+        completed = manifest.completed()
+    aggregates, singles = route_changes_to_aggregates(changes.changes, completed)
+    to_download = pd.concat(
+        [aggregates, singles.loc[singles['change'] != DELETE, ['file', 'date_update']]], ignore_index=True
+    )
+    if limit:
+        to_download = to_download.head(limit)
+    download_netcdf_files(to_download, overwrite=True, on_complete=on_complete)
+    
+    # Everything from this change set that is downloaded but not yet parsed
+    with FileManifest(root=get_netcdf_dir()) as manifest:
+        pending = set(manifest.files(parse_status=PENDING))
+        return [manifest.local_path(f) for f in to_download['file'] if f in pending]
+
+
 def get_download_statistics():
-    """Get statistics about downloaded files"""
-    netcdf_dir = Path(settings.data_raw_dir) / "netcdf"
+    """Get statistics about downloaded files (from the manifest, no filesystem walk)"""
+    with FileManifest(root=get_netcdf_dir()) as manifest:
+        stats = manifest.statistics()
     
-    if not netcdf_dir.exists():
+    total_files = stats['total_files']
+    if total_files == 0:
         logger.info("No NetCDF files downloaded yet")
         return
     
-    # Count files
-    nc_files = list(netcdf_dir.rglob("*.nc"))
-    total_files = len(nc_files)
-    
-    # Calculate total size
-    total_size = sum(f.stat().st_size for f in nc_files)
-    total_size_mb = total_size / 1024 / 1024
-    
-    # Count unique floats
-    float_dirs = set(f.parent.parent.name for f in nc_files)
+    total_size_mb = stats['total_size'] / 1024 / 1024
     
     logger.info("\n" + "="*60)
     logger.info("DOWNLOADED FILES STATISTICS")
     logger.info("="*60)
     logger.info(f"Total Files: {total_files:,}")
-    logger.info(f"Unique Floats: {len(float_dirs):,}")
+    logger.info(f"Unique Floats: {stats['float_count']:,}")
     logger.info(f"Total Size: {total_size_mb:.2f} MB")
     logger.info(f"Average File Size: {total_size_mb/total_files:.2f} MB")
+    logger.info(f"Parse Status: {stats['parse_status']}")
+    logger.info(f"Load Status: {stats['load_status']}")
     logger.info("="*60 + "\n")
+    
+    return stats
 
 
-def main():
+def main(incremental=False, aggregate=None):
     """Main execution"""
     logger.info("Starting ARGO NetCDF Download (GLOBAL Dataset)")
     logger.info("Target: 20-25 GB, All Ocean Regions, 2018-2024")
     
     try:
+        if incremental:
+            # Only what changed since the previous index refresh
+            download_index_changes()
+            get_download_statistics()
+            logger.success("Incremental NetCDF download complete!")
+            return
+        
+
         # Load filtered index
         df = load_filtered_index()
         
         # Download ALL files for global coverage
         logger.info("Downloading COMPLETE global dataset...")
         logger.info(f"Expected download time: 4-6 hours (depends on internet speed)")
-        logger.info(f"Parallel workers: {MAX_WORKERS}")
+        logger.info(f"Download engine: {DOWNLOAD_ENGINE} "
+                    f"(concurrency: {DOWNLOAD_CONCURRENCY if DOWNLOAD_ENGINE == 'async' else MAX_WORKERS})")
         
-        download_netcdf_files(df, limit=None)  # No limit - download all
+        download_netcdf_files(df, limit=None, aggregate=aggregate)  # No limit - download all
         
         # Show statistics
         get_download_statistics()
@@ -209,4 +482,21 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Download ARGO NetCDF profile files')
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch files added/modified since the previous index refresh'
+    )
+    
+    parser.add_argument(
+        '--aggregate',
+        action='store_true',
+        default=None,
+        help='Fetch per-float <wmo>_prof.nc files where the selection covers most of a float'
+    )
+    
+    args = parser.parse_args()
+    main(incremental=args.incremental, aggregate=args.aggregate)
@@ -0,0 +1,191 @@
+"""
+ARGO Index Diffing
+Compares the current and previous filtered index snapshots on file and
+date_update to find exactly which profiles were added, re-processed or removed
+"""
+
+import pandas as pd
+from dataclasses import dataclass
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.data.index_store import get_index_store_path, read_index_store
+
+# Change types
+ADD = 'add'
+MODIFY = 'modify'
+DELETE = 'delete'
+
+CHANGE_COLUMNS = ['change', 'file', 'old_file', 'date_update', 'profile_id']
+
+
+def get_previous_store_path(store_dir=None):
+    """Snapshot of the index store from the previous run"""
+    store_dir = Path(store_dir) if store_dir else get_index_store_path()
+    return store_dir.with_name(store_dir.name + ".previous")
+
+
+def get_changes_path():
+    """Change set written by the last index refresh"""
+    return Path(settings.data_raw_dir) / "index" / "index_changes.parquet"
+
+
+def profile_keys(files):
+    """
+    Data-mode independent key of each profile file
+
+    'aoml/2901234/profiles/R2901234_001.nc' and '.../D2901234_001.nc' both map to
+    'aoml/2901234/2901234_001', so a delayed-mode file replacing its real-time
+    predecessor is detected as a modification rather than a delete + add.
+    """
+    parts = files.astype(str).str.rsplit("/", n=1)
+    directory = parts.str[0].str.replace(r"/profiles$", "", regex=True)
+    name = parts.str[1].str.replace(r"^[A-Z]+", "", regex=True).str.replace(r"\.nc$", "", regex=True)
+    return directory + "/" + name
+
+
+def profile_ids_from_files(files):
+    """
+    '.../D2901234_001.nc' -> '2901234_001', matching parse_netcdf profile ids
+
+    Descending files ('..._001D.nc') map to NaN: parse_netcdf gives them the
+    id of the ascending profile of the same cycle, whose rows must survive a
+    change to the descending file alone.
+    """
+    parts = files.astype(str).str.extract(r"(\d+)_(\d+)\.nc$")
+    return parts[0] + "_" + parts[1].str.lstrip("0").str.zfill(3)
+
+
+@dataclass
+class IndexChangeSet:
+    """Add/modify/delete changes between two index snapshots"""
+
+    changes: pd.DataFrame
+
+    @property
+    def added(self):
+        return self.changes[self.changes['change'] == ADD]
+
+    @property
+    def modified(self):
+        return self.changes[self.changes['change'] == MODIFY]
+
+    @property
+    def deleted(self):
+        return self.changes[self.changes['change'] == DELETE]
+
+    @property
+    def to_download(self):
+        """Files that must be (re-)downloaded and re-parsed"""
+        return self.changes.loc[self.changes['change'] != DELETE, 'file'].tolist()
+
+    @property
+    def obsolete_files(self):
+        """Local files no longer in the index (deleted or superseded by a new name)"""
+        deleted = self.deleted['file']
+        renamed = self.modified.loc[self.modified['old_file'] != self.modified['file'], 'old_file']
+        return pd.concat([deleted, renamed]).tolist()
+
+    @property
+    def stale_profile_ids(self):
+        """Profiles whose stored rows must be removed before (re)loading"""
+        stale = self.changes[self.changes['change'] != ADD]
+        return stale['profile_id'].dropna().unique().tolist()
+
+    def is_empty(self):
+        return len(self.changes) == 0
+
+    def summary(self):
+        return {
+            ADD: len(self.added),
+            MODIFY: len(self.modified),
+            DELETE: len(self.deleted),
+        }
+
+    def save(self, path=None):
+        path = Path(path) if path else get_changes_path()
+        self.changes.to_parquet(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        path = Path(path) if path else get_changes_path()
+        if not path.exists():
+            raise FileNotFoundError(f"Index change set not found: {path}")
+        return cls(pd.read_parquet(path))
+
+
+def diff_index(previous_df, current_df):
+    """
+    Compute the change set between two index snapshots
+
+    Args:
+        previous_df, current_df: DataFrames with 'file' and 'date_update' columns
+                                 (previous_df may be None for a first run)
+
+    Returns:
+        IndexChangeSet
+    """
+    current = current_df[['file', 'date_update']].copy()
+    current['key'] = profile_keys(current['file'])
+
+    if previous_df is None or len(previous_df) == 0:
+        previous = pd.DataFrame({'file': pd.Series(dtype=str), 'date_update': pd.Series(dtype='datetime64[s]'),
+                                 'key': pd.Series(dtype=str)})
+    else:
+        previous = previous_df[['file', 'date_update']].copy()
+        previous['key'] = profile_keys(previous['file'])
+
+    merged = previous.merge(current, on='key', how='outer', suffixes=('_old', ''), indicator=True)
+
+    added = merged['_merge'] == 'right_only'
+    deleted = merged['_merge'] == 'left_only'
+    both = merged['_merge'] == 'both'
+    modified = both & (
+        (merged['file'] != merged['file_old'])
+        | (merged['date_update'].fillna(pd.Timestamp(0)) != merged['date_update_old'].fillna(pd.Timestamp(0)))
+    )
+
+    merged['change'] = None
+    merged.loc[added, 'change'] = ADD
+    merged.loc[modified, 'change'] = MODIFY
+    merged.loc[deleted, 'change'] = DELETE
+    merged.loc[deleted, 'file'] = merged.loc[deleted, 'file_old']
+    merged.loc[deleted, 'date_update'] = merged.loc[deleted, 'date_update_old']
+
+    changes = merged[merged['change'].notna()].rename(columns={'file_old': 'old_file'})
+    changes = changes.assign(profile_id=profile_ids_from_files(changes['file']))
+    changes = changes[CHANGE_COLUMNS].reset_index(drop=True)
+
+    return IndexChangeSet(changes)
+
+
+def compute_index_changes(store_dir=None):
+    """
+    Diff the current index store against the snapshot kept from the previous run
+
+    Returns:
+        IndexChangeSet (everything is an 'add' when there is no previous snapshot)
+    """
+    store_dir = Path(store_dir) if store_dir else get_index_store_path()
+    previous_dir = get_previous_store_path(store_dir)
+    columns = ['file', 'date_update']
+
+    current_df = read_index_store(store_dir, columns=columns)
+    previous_df = read_index_store(previous_dir, columns=columns) if previous_dir.exists() else None
+
+    if previous_df is None:
+        logger.info("No previous index snapshot - treating every profile as new")
+
+    change_set = diff_index(previous_df, current_df)
+    counts = change_set.summary()
+    logger.info(
+        f"Index changes: {counts[ADD]:,} added, {counts[MODIFY]:,} modified, "
+        f"{counts[DELETE]:,} deleted"
+    )
+
+    return change_set
@@ -0,0 +1,374 @@
+"""
+ARGO Index Predicate Engine
+Vectorized date / bounding-box / polygon / institution / profiler / float filters
+over the ARGO profile index, configurable from settings or the command line
+"""
+
+import re
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.ai.query_examples import OCEAN_REGIONS
+from src.data.index_store import INDEX_DATE_FORMAT, build_store_filters
+
+# (lat_min, lat_max, lon_min, lon_max)
+BBox = Tuple[float, float, float, float]
+# Closed ring of (lon, lat) vertices
+Polygon = List[Tuple[float, float]]
+
+_COORD_PATTERN = re.compile(r"(\d+(?:\.\d+)?)°\s*([NSEW])")
+_WKT_EXTERIOR_RING = re.compile(r"\(\(([^()]+)\)")  # First ring of each polygon
+
+
+def _coordinate(text):
+    """'60°S' -> -60.0, '120°E' -> 120.0"""
+    match = _COORD_PATTERN.search(text)
+    if not match:
+        raise ValueError(f"Cannot parse coordinate: {text!r}")
+    value = float(match.group(1))
+    return -value if match.group(2) in "SW" else value
+
+
+def parse_region_bounds(bounds):
+    """
+    Parse an OCEAN_REGIONS bounds string into (lat_min, lat_max, lon_min, lon_max)
+
+    Handles "120°E to 70°W, 60°S to 60°N", "All longitudes, south of 60°S" and
+    "All longitudes, north of 60°N". lon_min > lon_max means the box crosses
+    the antimeridian.
+    """
+    lon_part, lat_part = [part.strip() for part in bounds.split(",", 1)]
+
+    if lon_part.lower().startswith("all longitudes"):
+        lon_min, lon_max = -180.0, 180.0
+    else:
+        lon_min, lon_max = [_coordinate(p) for p in lon_part.split(" to ")]
+
+    lat_lower = lat_part.lower()
+    if lat_lower.startswith("south of"):
+        lat_min, lat_max = -90.0, _coordinate(lat_part)
+    elif lat_lower.startswith("north of"):
+        lat_min, lat_max = _coordinate(lat_part), 90.0
+    else:
+        lat_min, lat_max = [_coordinate(p) for p in lat_part.split(" to ")]
+
+    return lat_min, lat_max, lon_min, lon_max
+
+
+def bbox_to_polygons(bbox):
+    """Box -> list of rectangular (lon, lat) polygons, split at the antimeridian"""
+    lat_min, lat_max, lon_min, lon_max = bbox
+    spans = [(lon_min, lon_max)] if lon_min <= lon_max else [(lon_min, 180.0), (-180.0, lon_max)]
+    return [
+        [(w, lat_min), (e, lat_min), (e, lat_max), (w, lat_max), (w, lat_min)]
+        for w, e in spans
+    ]
+
+
+def region_polygons(region_name):
+    """Polygons covering a named region from OCEAN_REGIONS"""
+    if region_name not in OCEAN_REGIONS:
+        raise ValueError(
+            f"Unknown region {region_name!r}; choose from: {', '.join(OCEAN_REGIONS)}"
+        )
+    return bbox_to_polygons(parse_region_bounds(OCEAN_REGIONS[region_name]["bounds"]))
+
+
+def _closed_ring(points):
+    ring = [(float(x), float(y)) for x, y in points]
+    if len(ring) < 3:
+        raise ValueError(f"Polygon ring needs at least 3 vertices: {ring!r}")
+    return ring if ring[0] == ring[-1] else ring + [ring[0]]
+
+
+def parse_wkt_polygons(wkt):
+    """
+    'POLYGON((lon lat, ...))' or 'MULTIPOLYGON(((...)), ((...)))' -> list of
+    (lon, lat) rings (exterior rings only; holes are ignored)
+    """
+    if not re.match(r"\s*(MULTI)?POLYGON\b", wkt, re.IGNORECASE):
+        raise ValueError(f"Expected a WKT POLYGON or MULTIPOLYGON: {wkt[:60]!r}")
+    rings = [
+        _closed_ring(point.split()[:2] for point in ring.split(','))
+        for ring in _WKT_EXTERIOR_RING.findall(wkt)
+    ]
+    if not rings:
+        raise ValueError(f"No polygon rings in WKT: {wkt[:60]!r}")
+    return rings
+
+
+def _geojson_geometries(obj):
+    """Geometries of a GeoJSON FeatureCollection / Feature / geometry object"""
+    kind = obj.get('type')
+    if kind == 'FeatureCollection':
+        return [g for feature in obj['features'] for g in _geojson_geometries(feature)]
+    if kind == 'Feature':
+        return _geojson_geometries(obj['geometry']) if obj.get('geometry') else []
+    if kind == 'GeometryCollection':
+        return [g for geometry in obj['geometries'] for g in _geojson_geometries(geometry)]
+    return [obj]
+
+
+def load_geojson_polygons(path):
+    """(lon, lat) exterior rings of every Polygon/MultiPolygon in a GeoJSON file"""
+    with open(path) as f:
+        geometries = _geojson_geometries(json.load(f))
+    rings = []
+    for geometry in geometries:
+        if geometry['type'] == 'Polygon':
+            rings.append(_closed_ring(geometry['coordinates'][0]))
+        elif geometry['type'] == 'MultiPolygon':
+            rings.extend(_closed_ring(polygon[0]) for polygon in geometry['coordinates'])
+    if not rings:
+        raise ValueError(f"No Polygon/MultiPolygon geometries in {path}")
+    return rings
+
+
+def parse_polygons(value):
+    """
+    Polygon filter from settings or the command line: WKT POLYGON/MULTIPOLYGON
+    text or the path of a GeoJSON file (empty -> [])
+    """
+    value = (value or '').strip()
+    if not value:
+        return []
+    if re.match(r"(MULTI)?POLYGON\b", value, re.IGNORECASE):
+        return parse_wkt_polygons(value)
+    path = Path(value).expanduser()
+    if not path.exists():
+        raise ValueError(f"Polygon filter is neither WKT nor an existing GeoJSON file: {value!r}")
+    return load_geojson_polygons(path)
+
+
+def points_in_polygon(lon, lat, polygon):
+    """
+    Vectorized even-odd ray casting test
+
+    Loops over the (few) polygon edges, each edge evaluated for all points at
+    once. Points exactly on the boundary count as inside.
+    """
+    vertices = np.asarray(polygon, dtype=np.float64)
+    xs, ys = vertices[:, 0], vertices[:, 1]
+
+    inside = np.zeros(lon.shape, dtype=bool)
+    on_edge = np.zeros(lon.shape, dtype=bool)
+
+    for i in range(len(vertices) - 1):
+        x1, y1, x2, y2 = xs[i], ys[i], xs[i + 1], ys[i + 1]
+
+        # Boundary: collinear with the edge and inside its extent
+        cross = (x2 - x1) * (lat - y1) - (y2 - y1) * (lon - x1)
+        on_edge |= (
+            (np.abs(cross) <= 1e-9)
+            & (lon >= min(x1, x2)) & (lon <= max(x1, x2))
+            & (lat >= min(y1, y2)) & (lat <= max(y1, y2))
+        )
+
+        if y1 == y2:
+            continue
+        crosses = (y1 > lat) != (y2 > lat)
+        x_intersect = x1 + (lat - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (lon < x_intersect)
+
+    return inside | on_edge
+
+
+def split_list(value):
+    """Comma-separated setting or list -> stripped items ('a, b,,c' -> ['a', 'b', 'c'])"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _isin(series, values):
+    """Vectorized membership test; categoricals are tested once per category"""
+    values = list(values)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        hits = np.isin(series.cat.categories.to_numpy(dtype=object), values)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, hits[codes], False)
+    return np.isin(series.to_numpy(dtype=object), np.asarray(values, dtype=object))
+
+
+def float_ids_from_files(files):
+    """'aoml/2901234/profiles/D2901234_001.nc' -> '2901234' (vectorized)"""
+    return files.astype(str).str.split("/", n=2).str[1]
+
+
+@dataclass
+class IndexFilter:
+    """
+    Conjunction of index predicates
+
+    Every configured predicate is one vectorized pass over the index arrays;
+    spatial predicates are bbox AND (any region OR any polygon).
+    """
+
+    date_start: Optional[str] = None
+    date_end: Optional[str] = None
+    bbox: Optional[BBox] = None
+    regions: List[str] = field(default_factory=list)
+    polygons: List[Polygon] = field(default_factory=list)
+    institutions: List[str] = field(default_factory=list)
+    profiler_types: List[int] = field(default_factory=list)
+    float_ids: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        # Fail early on unknown region names
+        self._region_polygons = [p for name in self.regions for p in region_polygons(name)]
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_settings(cls, config=settings):
+        """Build the filter from INDEX_* settings"""
+        return cls(
+            date_start=config.index_date_start or None,
+            date_end=config.index_date_end or None,
+            bbox=parse_bbox(config.index_bbox),
+            regions=split_list(config.index_regions),
+            polygons=parse_polygons(config.index_polygons),
+            institutions=split_list(config.index_institutions),
+            profiler_types=[int(p) for p in split_list(config.index_profiler_types)],
+            float_ids=split_list(config.index_float_ids),
+        )
+
+    @staticmethod
+    def add_arguments(parser):
+        """Register index filter options on an argparse parser"""
+        group = parser.add_argument_group('index filters (default: INDEX_* settings)')
+        group.add_argument('--date-start', help='First profile date, e.g. 2018-01-01')
+        group.add_argument('--date-end', help='Last profile date, e.g. 2024-12-31')
+        group.add_argument('--bbox', help='lat_min,lat_max,lon_min,lon_max (write --bbox=-40,30,20,120 for negative values)')
+        group.add_argument('--region', action='append', dest='regions',
+                           help=f"Named region ({', '.join(OCEAN_REGIONS)}); repeatable")
+        group.add_argument('--polygon', action='append', dest='polygons',
+                           help='WKT POLYGON/MULTIPOLYGON (lon lat order) or GeoJSON file path; repeatable')
+        group.add_argument('--institution', action='append', dest='institutions',
+                           help='Institution code (e.g. AO, IF, CS); repeatable')
+        group.add_argument('--profiler-type', action='append', dest='profiler_types', type=int,
+                           help='WMO profiler type code (e.g. 846); repeatable')
+        group.add_argument('--float', action='append', dest='float_ids',
+                           help='Float WMO number to keep; repeatable')
+        return parser
+
+    @classmethod
+    def from_args(cls, args, config=settings):
+        """Command-line options, falling back to settings for anything not given"""
+        base = cls.from_settings(config)
+        return cls(
+            date_start=args.date_start or base.date_start,
+            date_end=args.date_end or base.date_end,
+            bbox=parse_bbox(args.bbox) if args.bbox else base.bbox,
+            regions=args.regions or base.regions,
+            polygons=[p for value in args.polygons for p in parse_polygons(value)] if args.polygons else base.polygons,
+            institutions=args.institutions or base.institutions,
+            profiler_types=args.profiler_types or base.profiler_types,
+            float_ids=args.float_ids or base.float_ids,
+        )
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def mask(self, df):
+        """Boolean NumPy mask of the index rows matching every predicate"""
+        mask = np.ones(len(df), dtype=bool)
+
+        if self.date_start or self.date_end:
+            dates = df['date']
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates, format=INDEX_DATE_FORMAT, errors='coerce')
+            values = dates.to_numpy(dtype='datetime64[s]')
+            # NaT compares False, dropping undated rows
+            if self.date_start:
+                mask &= values >= np.datetime64(pd.Timestamp(self.date_start), 's')
+            if self.date_end:
+                mask &= values <= np.datetime64(pd.Timestamp(self.date_end), 's')
+
+        if self.bbox is not None or self._region_polygons or self.polygons:
+            lat = df['latitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+            lon = df['longitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+            if self.bbox is not None:
+                lat_min, lat_max, lon_min, lon_max = self.bbox
+                if lon_min <= lon_max:
+                    in_lon = (lon >= lon_min) & (lon <= lon_max)
+                else:
+                    in_lon = (lon >= lon_min) | (lon <= lon_max)
+                mask &= (lat >= lat_min) & (lat <= lat_max) & in_lon
+
+            shapes = self._region_polygons + list(self.polygons)
+            if shapes:
+                inside = np.zeros(len(df), dtype=bool)
+                for polygon in shapes:
+                    inside |= points_in_polygon(lon, lat, polygon)
+                mask &= inside
+
+        if self.institutions:
+            mask &= _isin(df['institution'], self.institutions)
+
+        if self.profiler_types:
+            types = pd.to_numeric(df['profiler_type'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            mask &= np.isin(types, self.profiler_types)
+
+        if self.float_ids:
+            mask &= np.isin(float_ids_from_files(df['file']).to_numpy(dtype=object),
+                            np.asarray(self.float_ids, dtype=object))
+
+        return mask
+
+    def apply(self, df):
+        """Rows of df matching the filter"""
+        return df[self.mask(df)]
+
+    def to_store_filters(self):
+        """
+        Coarse pyarrow expression for read_index_store pushdown
+
+        Covers dates, the bounding box (when it doesn't cross the antimeridian) and
+        institutions; apply() afterwards for polygons/profilers/floats.
+        """
+        bbox = self.bbox if self.bbox and self.bbox[2] <= self.bbox[3] else None
+        return build_store_filters(self.date_start, self.date_end, bbox, self.institutions)
+
+    def describe(self):
+        """One-line human readable summary"""
+        parts = [f"dates {self.date_start or '-inf'} to {self.date_end or 'now'}"]
+        if self.bbox:
+            parts.append(f"bbox {self.bbox}")
+        if self.regions:
+            parts.append(f"regions {', '.join(self.regions)}")
+        if self.polygons:
+            parts.append(f"{len(self.polygons)} polygon(s)")
+        if self.institutions:
+            parts.append(f"institutions {', '.join(self.institutions)}")
+        if self.profiler_types:
+            parts.append(f"profiler types {', '.join(map(str, self.profiler_types))}")
+        if self.float_ids:
+            parts.append(f"{len(self.float_ids)} float(s)")
+        if not (self.bbox or self.regions or self.polygons):
+            parts.append("GLOBAL coverage")
+        return "; ".join(parts)
+
+
+def parse_bbox(value):
+    """'lat_min,lat_max,lon_min,lon_max' -> tuple of floats (None if empty)"""
+    items = split_list(value)
+    if not items:
+        return None
+    if len(items) != 4:
+        raise ValueError(f"Bounding box needs 4 values (lat_min,lat_max,lon_min,lon_max): {value!r}")
+    return tuple(float(v) for v in items)
@@ -0,0 +1,141 @@
+"""
+ARGO Index Statistics Sidecar
+Profile/float counts per year, month, institution, ocean and 1° grid cell,
+accumulated while the index is filtered and saved as a small JSON file
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.data.index_store import get_index_store_path
+
+# Ocean codes used in the GDAC index
+OCEAN_NAMES = {
+    'A': 'Atlantic Ocean',
+    'I': 'Indian Ocean',
+    'P': 'Pacific Ocean',
+}
+
+
+def get_index_stats_path(store_dir=None):
+    """Sidecar file next to an index store"""
+    store_dir = Path(store_dir) if store_dir else get_index_store_path()
+    return store_dir.with_name(store_dir.name + ".stats.json")
+
+
+def _count(values):
+    """Counter of the non-null values of a Series"""
+    counts = values.value_counts(dropna=True)
+    return Counter({str(k): int(v) for k, v in counts.items()})
+
+
+class IndexStatsAccumulator:
+    """
+    Mergeable index statistics
+
+    Feed it index chunks (or a whole DataFrame) with update(); every statistic
+    is a count, so chunk results simply add up.
+    """
+
+    def __init__(self):
+        self.profile_count = 0
+        self.floats = set()
+        self.per_year = Counter()
+        self.per_month = Counter()
+        self.per_institution = Counter()
+        self.per_ocean = Counter()
+        self.per_grid_cell = Counter()
+        self.date_min = None
+        self.date_max = None
+        self.lat_range = [np.inf, -np.inf]
+        self.lon_range = [np.inf, -np.inf]
+
+    def update(self, df):
+        """Add one chunk of filtered index rows ('date' already datetime64)"""
+        if len(df) == 0:
+            return self
+
+        self.profile_count += len(df)
+        self.floats.update(df['file'].astype(str).str.split('/', n=2).str[1].unique())
+
+        dates = df['date']
+        self.per_year.update(_count(dates.dt.year.astype('Int64')))
+        self.per_month.update(_count(dates.dt.strftime('%Y-%m')))
+        self.per_institution.update(_count(df['institution'].astype('string')))
+        self.per_ocean.update(_count(df['ocean'].astype('string')))
+
+        lat = df['latitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+        lon = df['longitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        if valid.any():
+            # 1° cells keyed by their south-west corner, e.g. "-12,73"
+            lat_cells = np.floor(lat[valid]).astype(np.int32) + 90
+            lon_cells = np.floor(lon[valid]).astype(np.int32) + 180
+            unique, counts = np.unique(lat_cells * 361 + lon_cells, return_counts=True)
+            for cell, count in zip(unique.tolist(), counts.tolist()):
+                lat_cell, lon_cell = divmod(cell, 361)
+                self.per_grid_cell[f"{lat_cell - 90},{lon_cell - 180}"] += count
+
+            self.lat_range = [min(self.lat_range[0], lat[valid].min()), max(self.lat_range[1], lat[valid].max())]
+            self.lon_range = [min(self.lon_range[0], lon[valid].min()), max(self.lon_range[1], lon[valid].max())]
+
+        chunk_min, chunk_max = dates.min(), dates.max()
+        if pd.notna(chunk_min):
+            self.date_min = chunk_min if self.date_min is None else min(self.date_min, chunk_min)
+            self.date_max = chunk_max if self.date_max is None else max(self.date_max, chunk_max)
+
+        return self
+
+    def to_dict(self):
+        """JSON-serializable statistics"""
+        has_positions = np.isfinite(self.lat_range[0])
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'profile_count': self.profile_count,
+            'float_count': len(self.floats),
+            'date_min': self.date_min.isoformat() if self.date_min is not None else None,
+            'date_max': self.date_max.isoformat() if self.date_max is not None else None,
+            'latitude_range': [float(v) for v in self.lat_range] if has_positions else None,
+            'longitude_range': [float(v) for v in self.lon_range] if has_positions else None,
+            'per_year': dict(sorted(self.per_year.items())),
+            'per_month': dict(sorted(self.per_month.items())),
+            'per_institution': dict(self.per_institution.most_common()),
+            'per_ocean': dict(self.per_ocean.most_common()),
+            'per_grid_cell': dict(self.per_grid_cell.most_common()),
+        }
+
+
+def compute_index_statistics(df):
+    """Statistics of a filtered index DataFrame in one call"""
+    return IndexStatsAccumulator().update(df).to_dict()
+
+
+def save_index_statistics(stats, store_dir=None):
+    """Write the statistics sidecar next to an index store"""
+    path = get_index_stats_path(store_dir)
+    with open(path, 'w') as f:
+        json.dump(stats, f)
+    logger.info(f"Index statistics saved: {path}")
+    return path
+
+
+def load_index_statistics(store_dir=None):
+    """Read the statistics sidecar, or None if it hasn't been produced yet"""
+    path = get_index_stats_path(store_dir)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable index statistics {path}: {e}")
+        return None
@@ -0,0 +1,243 @@
+"""
+ARGO Index Store
+Columnar, typed Parquet cache of the (filtered) ARGO profile index
+Partitioned by year and read with predicate pushdown + memory mapping
+"""
+
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+
+# Name of the filtered index store under data/raw/index/
+FILTERED_INDEX_NAME = "global_argo_2018_2024"
+
+# Date format used by the GDAC index (date, date_update)
+INDEX_DATE_FORMAT = "%Y%m%d%H%M%S"
+
+# Dtypes for reading the raw comma-separated index
+INDEX_CSV_DTYPES = {
+    'file': 'string',
+    'date': 'string',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'ocean': 'category',
+    'profiler_type': 'Int16',
+    'institution': 'category',
+    'date_update': 'string',
+}
+
+# On-disk schema: epoch seconds for dates, float32 positions, dictionary-encoded codes
+INDEX_SCHEMA = pa.schema([
+    ('file', pa.string()),
+    ('date', pa.int64()),
+    ('latitude', pa.float32()),
+    ('longitude', pa.float32()),
+    ('ocean', pa.dictionary(pa.int8(), pa.string())),
+    ('profiler_type', pa.int16()),
+    ('institution', pa.dictionary(pa.int8(), pa.string())),
+    ('date_update', pa.int64()),
+    ('year', pa.int16()),
+])
+
+DATE_COLUMNS = ['date', 'date_update']
+
+
+def get_index_store_path(name=FILTERED_INDEX_NAME):
+    """Directory of a partitioned index store"""
+    return Path(settings.data_raw_dir) / "index" / name
+
+
+def _to_datetime(values):
+    """Convert index date strings (or datetimes) to datetime64"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format=INDEX_DATE_FORMAT, errors='coerce')
+
+
+def _epoch_seconds(dates):
+    """datetime64 Series -> nullable int64 epoch seconds Arrow array"""
+    seconds = dates.to_numpy(dtype='datetime64[s]').astype('int64')
+    return pa.array(seconds, type=pa.int64(), mask=dates.isna().to_numpy())
+
+
+def to_index_table(df):
+    """Convert an index DataFrame to an Arrow table with the store schema"""
+    dates = _to_datetime(df['date'])
+
+    columns = {
+        'file': pa.array(df['file'].astype(str).to_numpy(), type=pa.string()),
+        'date': _epoch_seconds(dates),
+        'latitude': pa.array(df['latitude'].to_numpy(dtype='float32', na_value=float('nan')), type=pa.float32()),
+        'longitude': pa.array(df['longitude'].to_numpy(dtype='float32', na_value=float('nan')), type=pa.float32()),
+        'ocean': pa.array(df['ocean'].astype('string'), type=pa.string()).dictionary_encode(),
+        'profiler_type': pa.array(pd.array(df['profiler_type'], dtype='Int16'), type=pa.int16()),
+        'institution': pa.array(df['institution'].astype('string'), type=pa.string()).dictionary_encode(),
+        'date_update': _epoch_seconds(_to_datetime(df['date_update'])),
+        'year': pa.array(dates.dt.year.to_numpy(dtype='float64', na_value=float('nan')),
+                         from_pandas=True).cast(pa.int16()),
+    }
+
+    table = pa.table(columns)
+    return table.cast(INDEX_SCHEMA)
+
+
+class IndexStoreWriter:
+    """
+    Incrementally write DataFrame chunks into a year-partitioned index store
+
+    Chunks go to a temporary directory that replaces the target on close(), so
+    readers never see a half-written index. If ``previous_dir`` is given, the
+    replaced store is kept there as a snapshot for index diffing. Usable as a
+    context manager.
+    """
+
+    def __init__(self, store_dir=None, previous_dir=None):
+        self.store_dir = Path(store_dir) if store_dir else get_index_store_path()
+        self.previous_dir = Path(previous_dir) if previous_dir else None
+        self.tmp_dir = self.store_dir.with_name(self.store_dir.name + ".tmp")
+        self.rows_written = 0
+        self._n_chunks = 0
+
+        if self.tmp_dir.exists():
+            shutil.rmtree(self.tmp_dir)
+        self.tmp_dir.mkdir(parents=True)
+
+    def write(self, df):
+        """Append one chunk of index rows"""
+        if len(df) == 0:
+            return
+
+        table = to_index_table(df)
+        pq.write_to_dataset(
+            table,
+            root_path=str(self.tmp_dir),
+            partition_cols=['year'],
+            basename_template=f"part-{self._n_chunks:05d}-{{i}}.parquet",
+            compression='zstd',
+        )
+        self._n_chunks += 1
+        self.rows_written += table.num_rows
+
+    def close(self):
+        """Swap the finished store into place"""
+        if self.store_dir.exists():
+            if self.previous_dir:
+                if self.previous_dir.exists():
+                    shutil.rmtree(self.previous_dir)
+                self.store_dir.rename(self.previous_dir)
+            else:
+                shutil.rmtree(self.store_dir)
+        self.tmp_dir.rename(self.store_dir)
+
+        logger.success(f"Index store written: {self.store_dir} ({self.rows_written:,} rows)")
+        return self.store_dir
+
+    def abort(self):
+        """Discard everything written so far"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_index_store(df, store_dir=None):
+    """Write an index DataFrame as a year-partitioned Parquet dataset"""
+    with IndexStoreWriter(store_dir) as writer:
+        writer.write(df)
+    return writer.store_dir
+
+
+def build_store_filters(date_start=None, date_end=None, bbox=None, institutions=None):
+    """
+    Build a pyarrow filter expression for read_index_store
+
+    Args:
+        date_start, date_end: Inclusive date bounds (anything pd.Timestamp accepts)
+        bbox: (lat_min, lat_max, lon_min, lon_max)
+        institutions: Iterable of institution codes
+
+    Returns:
+        pyarrow.compute.Expression or None
+    """
+    expressions = []
+
+    if date_start is not None:
+        start = pd.Timestamp(date_start)
+        expressions.append(pc.field('year') >= start.year)
+        expressions.append(pc.field('date') >= int(start.timestamp()))
+    if date_end is not None:
+        end = pd.Timestamp(date_end)
+        expressions.append(pc.field('year') <= end.year)
+        expressions.append(pc.field('date') <= int(end.timestamp()))
+    if bbox is not None:
+        lat_min, lat_max, lon_min, lon_max = bbox
+        expressions.append(pc.field('latitude') >= lat_min)
+        expressions.append(pc.field('latitude') <= lat_max)
+        expressions.append(pc.field('longitude') >= lon_min)
+        expressions.append(pc.field('longitude') <= lon_max)
+    if institutions:
+        expressions.append(pc.field('institution').isin(list(institutions)))
+
+    if not expressions:
+        return None
+
+    combined = expressions[0]
+    for expression in expressions[1:]:
+        combined = combined & expression
+    return combined
+
+
+def read_index_store(store_dir=None, columns=None, filters=None, decode_dates=True):
+    """
+    Read rows from an index store
+
+    Only partitions/row groups that can match ``filters`` are read, and files are
+    memory-mapped rather than copied into Python buffers.
+
+    Args:
+        store_dir: Store directory (defaults to the filtered index store)
+        columns: Subset of columns to load
+        filters: pyarrow expression, e.g. from build_store_filters()
+        decode_dates: Return date/date_update as datetime64 instead of epoch seconds
+
+    Returns:
+        pandas DataFrame
+    """
+    store_dir = Path(store_dir) if store_dir else get_index_store_path()
+
+    if not store_dir.exists():
+        raise FileNotFoundError(f"Index store not found: {store_dir}")
+
+    schema = INDEX_SCHEMA.remove(INDEX_SCHEMA.get_field_index('year'))
+    table = pq.read_table(
+        str(store_dir),
+        columns=columns or schema.names,
+        filters=filters,
+        memory_map=True,
+        partitioning=ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive'),
+    )
+    df = table.to_pandas()
+
+    if decode_dates:
+        for column in DATE_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], unit='s')
+
+    return df
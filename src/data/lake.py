@@ -0,0 +1,344 @@
+"""
+ARGO Parquet Lake
+Hive-partitioned layout of the processed data
+(``lake/<table>/year=YYYY/month=M/basin=<name>/part-0.parquet``) with rows
+sorted by profile_id (and pressure), zstd + dictionary encoding and
+per-column statistics, so readers prune partitions and row groups instead
+of scanning the whole archive. Tables: profiles, measurements and levels
+(standard pressure level values, see src/data/standard_levels.py)
+"""
+
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.data.columnar import MEASUREMENT_SCHEMA, PROFILE_SCHEMA, ColumnBatchWriter
+from src.data.index_filters import points_in_polygon, region_polygons
+from src.data.standard_levels import LEVEL_SCHEMA, STANDARD_LEVELS, level_index
+
+PROFILES = 'profiles'
+MEASUREMENTS = 'measurements'
+LEVELS = 'levels'
+TABLES = [PROFILES, MEASUREMENTS, LEVELS]
+
+PARTITION_FIELDS = [
+    pa.field('year', pa.int16()),
+    pa.field('month', pa.int8()),
+    pa.field('basin', pa.string()),
+]
+PARTITION_COLS = [f.name for f in PARTITION_FIELDS]
+PARTITIONING = ds.partitioning(pa.schema(PARTITION_FIELDS), flavor='hive')
+
+# Parse output schemas plus the partition keys; profiles also record the
+# manifest path of the file they came from, so re-parses can replace them
+LAKE_SCHEMAS = {
+    PROFILES: pa.schema(list(PROFILE_SCHEMA) + [pa.field('source_file', pa.string())] + PARTITION_FIELDS),
+    MEASUREMENTS: pa.schema(list(MEASUREMENT_SCHEMA) + PARTITION_FIELDS),
+    LEVELS: pa.schema(list(LEVEL_SCHEMA) + PARTITION_FIELDS, metadata=LEVEL_SCHEMA.metadata),
+}
+SORT_KEYS = {
+    PROFILES: [('profile_id', 'ascending')],
+    MEASUREMENTS: [('profile_id', 'ascending'), ('pressure', 'ascending'), ('level', 'ascending')],
+    LEVELS: [('profile_id', 'ascending')],
+}
+
+ROW_GROUP_ROWS = 250_000
+COMPRESSION = 'zstd'
+WRITE_OPTIONS = {'compression': COMPRESSION, 'use_dictionary': True, 'write_statistics': True}
+
+# Basins checked in order; the polar oceans take precedence over the boxes they overlap
+BASINS = {
+    'southern': 'Southern Ocean',
+    'arctic': 'Arctic Ocean',
+    'indian': 'Indian Ocean',
+    'pacific': 'Pacific Ocean',
+    'atlantic': 'Atlantic Ocean',
+}
+OTHER_BASIN = 'other'
+
+
+def get_lake_dir(processed_dir=None):
+    """Lake root inside the processed directory"""
+    return Path(processed_dir or settings.data_processed_dir) / "lake"
+
+
+def ocean_basin(latitude, longitude):
+    """Basin partition name for each position (vectorized)"""
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    basin = np.full(lat.shape, OTHER_BASIN, dtype=object)
+    unassigned = np.ones(lat.shape, dtype=bool)
+    for name, region in BASINS.items():
+        inside = np.zeros(lat.shape, dtype=bool)
+        for polygon in region_polygons(region):
+            inside |= points_in_polygon(lon, lat, polygon)
+        hit = inside & unassigned
+        basin[hit] = name
+        unassigned &= ~hit
+    return basin
+
+
+def add_partition_keys(profiles, *tables):
+    """Add year/month/basin columns to one file's columnar parse results (in place)"""
+    dates = pd.DatetimeIndex(profiles['date'])
+    profiles['year'] = dates.year.to_numpy(dtype=np.float64)
+    profiles['month'] = dates.month.to_numpy(dtype=np.float64)
+    profiles['basin'] = ocean_basin(profiles['latitude'], profiles['longitude'])
+
+    # Rows of the other tables inherit their profile's keys
+    index = pd.Index(profiles['profile_id'])
+    for columns in tables:
+        position = index.get_indexer(columns['profile_id'])
+        for name in PARTITION_COLS:
+            columns[name] = profiles[name][position]
+
+
+def _decode_ids(data, table):
+    """Table with profile_id as plain strings (Arrow cannot sort or compare dictionary columns)"""
+    schema = _file_schema(table)
+    column = schema.get_field_index('profile_id')
+    return data.set_column(column, 'profile_id', data['profile_id'].cast(pa.string()))
+
+
+def _encode_ids(data, table):
+    """Inverse of _decode_ids for tables stored with a dictionary-encoded profile_id"""
+    schema = _file_schema(table)
+    if pa.types.is_dictionary(schema.field('profile_id').type):
+        data = data.set_column(
+            schema.get_field_index('profile_id'), 'profile_id',
+            pc.dictionary_encode(data['profile_id']).cast(schema.field('profile_id').type)
+        )
+    return data
+
+
+def _read_files(files, table):
+    """Concatenate partition files with profile_id decoded to plain strings"""
+    schema = _file_schema(table)
+    tables = [pq.read_table(f, schema=schema) for f in sorted(files)]
+    return _decode_ids(pa.concat_tables(tables) if tables else schema.empty_table(), table)
+
+
+def _remove_partition(output_file):
+    """Delete a partition file and the partition directories it leaves empty"""
+    output_file.unlink(missing_ok=True)
+    for parent in output_file.parents:
+        if parent.name.split('=')[0] not in PARTITION_COLS or any(parent.iterdir()):
+            break
+        parent.rmdir()
+
+
+def _write_partition(data, output_file, table):
+    """
+    Sort one partition and write it atomically (an empty partition is removed)
+
+    Memory is bounded by one partition (one month of one basin).
+    """
+    if data.num_rows == 0:
+        _remove_partition(output_file)
+        return 0
+
+    data = _encode_ids(data.sort_by(SORT_KEYS[table]), table)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    pq.write_table(data, tmp_file, row_group_size=ROW_GROUP_ROWS, **WRITE_OPTIONS)
+    os.replace(tmp_file, output_file)
+    return data.num_rows
+
+
+def _merge_partition(staged, dropped_ids, output_file, table):
+    """
+    Rewrite one existing partition with rows replaced, streaming the old file
+
+    The old (sorted) file is read one record batch at a time; rows of
+    dropped_ids are filtered out (an anti-join) and the sorted staged rows
+    are merged in at their place in profile_id order, so memory is bounded by
+    one batch plus the staged rows. Written atomically through a
+    ColumnBatchWriter; a partition left empty is removed.
+    """
+    schema = _file_schema(table)
+    staged = staged.sort_by(SORT_KEYS[table])
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    with ColumnBatchWriter(tmp_file, schema, batch_rows=ROW_GROUP_ROWS, **WRITE_OPTIONS) as writer:
+        if output_file.exists():
+            for batch in pq.ParquetFile(output_file).iter_batches(batch_size=ROW_GROUP_ROWS):
+                old = _decode_ids(pa.Table.from_batches([batch]).select(schema.names), table)
+                old = old.filter(pc.invert(pc.is_in(old['profile_id'], value_set=dropped_ids)))
+                if old.num_rows == 0:
+                    continue
+                # Kept and staged profile_ids never coincide, so every staged row up
+                # to the batch's last profile belongs before the batch ends
+                n = pc.sum(pc.less_equal(staged['profile_id'], old['profile_id'][-1])).as_py() or 0
+                if n:
+                    old = pa.concat_tables([old, staged.slice(0, n)]).sort_by(SORT_KEYS[table])
+                    staged = staged.slice(n)
+                writer.append_table(_encode_ids(old, table).cast(schema))
+        writer.append_table(_encode_ids(staged, table).cast(schema))
+
+    if writer.rows == 0:
+        tmp_file.unlink(missing_ok=True)
+        _remove_partition(output_file)
+        return 0
+    os.replace(tmp_file, output_file)
+    return writer.rows
+
+
+def _file_schema(table):
+    """Columns stored in the files (partition keys live in the directory names)"""
+    schema = LAKE_SCHEMAS[table]
+    return pa.schema([f for f in schema if f.name not in PARTITION_COLS], metadata=schema.metadata)
+
+
+def _partition_files(table_dir):
+    """{relative partition directory: parquet files} of a Hive-partitioned table"""
+    partitions = {}
+    for f in sorted(Path(table_dir).rglob("*.parquet")):
+        partitions.setdefault(f.parent.relative_to(table_dir).as_posix(), []).append(f)
+    return partitions
+
+
+def lake_partition_sources(lake_dir):
+    """{relative partition directory: set of source files} of the profiles table"""
+    return {
+        partition: set(pc.unique(
+            pa.concat_tables(pq.read_table(f, columns=['source_file']) for f in files)['source_file']
+        ).to_pylist())
+        for partition, files in _partition_files(Path(lake_dir) / PROFILES).items()
+    }
+
+
+def lake_is_current(lake_dir):
+    """
+    Whether every lake table exists with the columns (and types) of the
+    current schemas, and the levels table uses the configured standard levels
+    """
+    for table in TABLES:
+        files = sorted((Path(lake_dir) / table).rglob("*.parquet"))
+        if not files:
+            return False
+        stored, expected = pq.read_schema(files[0]), _file_schema(table)
+        if any(f.name not in stored.names or stored.field(f.name).type != f.type for f in expected):
+            return False
+        if expected.metadata and not (stored.metadata or {}).items() >= expected.metadata.items():
+            return False
+    return True
+
+
+def compact_lake(staging_dir, lake_dir, replace_sources=None, partitions=()):
+    """
+    Write the compacted contents of a staging directory into the lake
+
+    Args:
+        staging_dir: Hive-partitioned per-worker part-files, one directory per table
+        lake_dir: Lake root
+        replace_sources: None rewrites the lake from the staging data alone.
+                         Otherwise only the staged partitions and ``partitions``
+                         are rewritten: their rows from these source files (and
+                         older copies of re-parsed profiles) are replaced by the
+                         staged rows, and every other partition is left untouched
+        partitions: Extra partition directories holding rows of replace_sources
+
+    Returns:
+        {table: rows written}
+    """
+    staging_dir, lake_dir = Path(staging_dir), Path(lake_dir)
+    full = replace_sources is None
+    staged = {table: _partition_files(staging_dir / table) for table in TABLES}
+    affected = sorted(set().union(*staged.values()) | set(partitions))
+
+    if full:
+        for table in TABLES:
+            if (lake_dir / table).exists():
+                shutil.rmtree(lake_dir / table)
+    replace = pa.array(sorted(replace_sources or ()), type=pa.string())
+
+    rows = {table: 0 for table in TABLES}
+    for partition in affected:
+        data = {table: _read_files(staged[table].get(partition, []), table) for table in TABLES}
+        output_files = {table: lake_dir / table / partition / "part-0.parquet" for table in TABLES}
+
+        if full:
+            for table in TABLES:
+                rows[table] += _write_partition(data[table], output_files[table], table)
+            continue
+
+        # Profiles of replaced sources and older copies of re-parsed profiles are dropped
+        new_ids = data[PROFILES]['profile_id'].combine_chunks()
+        dropped_ids = new_ids
+        if output_files[PROFILES].exists():
+            old = pq.read_table(output_files[PROFILES], columns=['profile_id', 'source_file'])
+            old_ids = old['profile_id'].cast(pa.string())
+            stale = pc.or_(pc.is_in(old['source_file'], value_set=replace),
+                           pc.is_in(old_ids, value_set=new_ids))
+            dropped_ids = pa.concat_arrays([old_ids.filter(stale).combine_chunks(), new_ids])
+        # Rows of the per-profile tables follow their profile
+        for table in TABLES:
+            rows[table] += _merge_partition(data[table], dropped_ids, output_files[table], table)
+
+    logger.info(
+        f"Lake: {len(affected):,} partitions written ({rows[PROFILES]:,} profiles, "
+        f"{rows[MEASUREMENTS]:,} measurements, {rows[LEVELS]:,} standard-level rows)"
+    )
+    return rows
+
+
+def lake_dataset(table, lake_dir=None):
+    """pyarrow Dataset over one lake table (partition keys become columns)"""
+    return ds.dataset(
+        get_lake_dir() / table if lake_dir is None else Path(lake_dir) / table,
+        format='parquet',
+        partitioning=PARTITIONING,
+    )
+
+
+def read_lake(table, columns=None, filters=None, lake_dir=None):
+    """
+    Read a lake table into a DataFrame, pruning partitions and row groups
+
+    Args:
+        table: 'profiles', 'measurements' or 'levels'
+        columns: Columns to read (default: all, including the partition keys)
+        filters: pyarrow expression or DNF tuples, e.g.
+                 [('year', '=', 2023), ('basin', '=', 'indian'), ('pressure', '<', 100)]
+        lake_dir: Lake root (default: data/processed/lake)
+    """
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+    return lake_dataset(table, lake_dir).to_table(columns=columns, filter=filters).to_pandas()
+
+
+def read_depth_slice(pressure, parameters=('temperature', 'salinity'), filters=None, lake_dir=None):
+    """
+    Values at one standard pressure level for every matching profile
+
+    Reads only the requested list element of the levels table, so a depth
+    map needs neither a pressure range scan nor interpolation.
+
+    Args:
+        pressure: A standard level (dbar) from STANDARD_PRESSURE_LEVELS
+        parameters: Level parameters to return
+        filters: As for read_lake (on profile_id, latitude, longitude, date or partition keys)
+        lake_dir: Lake root (default: data/processed/lake)
+
+    Returns:
+        DataFrame with profile_id, latitude, longitude, date and one column per
+        parameter (NaN where the profile does not reach the level)
+    """
+    index = level_index(pressure, STANDARD_LEVELS)
+    columns = {name: ds.field(name) for name in ('profile_id', 'latitude', 'longitude', 'date')}
+    columns.update({name: pc.list_element(ds.field(name), index) for name in parameters})
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+    return lake_dataset(LEVELS, lake_dir).to_table(columns=columns, filter=filters).to_pandas()
@@ -5,6 +5,7 @@ Handles floats, profiles, and measurements tables
 """
 
 import pandas as pd
+import pyarrow.dataset as ds
 from pathlib import Path
 from sqlalchemy import create_engine, text
 from loguru import logger
@@ -16,10 +17,20 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.utils.config import settings
 from src.utils.logger import setup_logger
 from src.database.connection import get_db_engine
+from src.data.manifest import FileManifest
+from src.data.columnar import DERIVED_COLUMNS, H3_COLUMNS, MEASUREMENT_SCHEMA
+from src.data.summaries import load_summaries
+from src.data.spatial import load_region_cells
+from src.data.lake import MEASUREMENTS, PROFILES, get_lake_dir, lake_dataset, read_lake
 
 # Setup logging
 setup_logger()
 
+MEASUREMENT_BATCH_ROWS = 500_000  # Measurements read from parquet per load call
+
+# Derived columns stored in argo_ocean_properties (depth stays on argo_measurements)
+OCEAN_PROPERTY_COLUMNS = [name for name in DERIVED_COLUMNS if name != 'depth']
+
 
 def load_floats(floats_df, engine):
     """Load float data into database"""
@@ -65,6 +76,8 @@ def load_profiles(profiles_df, engine):
                 lambda row: f"POINT({row['longitude']} {row['latitude']})",
                 axis=1
             )
+            # Profiles without a position have no H3 cells
+            chunk[H3_COLUMNS] = chunk[H3_COLUMNS].astype(object).where(chunk[H3_COLUMNS].notna(), None)
             
             # Insert chunk
             with engine.connect() as conn:
@@ -73,10 +86,12 @@ def load_profiles(profiles_df, engine):
                         conn.execute(text("""
                             INSERT INTO argo_profiles 
                             (profile_id, float_id, cycle_number, latitude, longitude, 
-                             location, date, n_levels, created_at, updated_at)
+                             location, date, n_levels, data_mode,
+                             h3_index_res7, h3_index_res5, h3_index_res3, created_at, updated_at)
                             VALUES 
                             (:profile_id, :float_id, :cycle_number, :latitude, :longitude,
                              ST_GeomFromText(:location_wkt, 4326), :date, :n_levels, 
+                             :data_mode, :h3_index_res7, :h3_index_res5, :h3_index_res3,
                              :created_at, :updated_at)
                             ON CONFLICT (profile_id) DO NOTHING
                         """), {
@@ -88,6 +103,10 @@ def load_profiles(profiles_df, engine):
                             'location_wkt': row['location_wkt'],
                             'date': row['date'],
                             'n_levels': row['n_levels'],
+                            'data_mode': row['data_mode'],
+                            'h3_index_res7': row['h3_index_res7'],
+                            'h3_index_res5': row['h3_index_res5'],
+                            'h3_index_res3': row['h3_index_res3'],
                             'created_at': row['created_at'],
                             'updated_at': row['updated_at']
                         })
@@ -130,6 +149,72 @@ def load_measurements(measurements_df, engine):
     logger.success(f"Loaded {len(measurements_df):,} measurements")
 
 
+def load_ocean_properties(properties_df, engine):
+    """
+    Load derived TEOS-10 properties into argo_ocean_properties
+    
+    Rows must carry the measurement_id of the measurement they were derived
+    from (see load_measurement_batch).
+    """
+    logger.info(f"Loading {len(properties_df):,} derived property rows...")
+    
+    properties_df[['measurement_id', 'profile_id'] + OCEAN_PROPERTY_COLUMNS].to_sql(
+        'argo_ocean_properties',
+        engine,
+        if_exists='append',
+        index=False,
+        method='multi',
+        chunksize=1000
+    )
+    
+    logger.success(f"Loaded {len(properties_df):,} derived property rows")
+
+
+def load_measurement_batch(measurements_df, engine):
+    """
+    Load parsed measurements and their derived properties in one transaction
+    
+    Each row takes its measurement_id from the argo_measurements sequence
+    up front, so the property rows are keyed on exactly the measurement they
+    were derived with (repeated pressures and reloads cannot cross-match),
+    and a failed batch leaves neither table half-written.
+    """
+    with engine.begin() as conn:
+        measurement_ids = conn.execute(
+            text("SELECT nextval(pg_get_serial_sequence('argo_measurements', 'measurement_id')) "
+                 "FROM generate_series(1, :n)"),
+            {'n': len(measurements_df)}
+        ).scalars().all()
+        measurements_df = measurements_df.assign(measurement_id=measurement_ids)
+        
+        load_measurements(measurements_df.drop(columns=OCEAN_PROPERTY_COLUMNS), conn)
+        load_ocean_properties(measurements_df, conn)
+
+
+def delete_profiles(profile_ids, engine, chunk_size=1000):
+    """
+    Delete profiles (and, via ON DELETE CASCADE, their measurements)
+    
+    Used before re-loading profiles whose source file was re-processed or
+    removed on the GDAC.
+    """
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+    
+    logger.info(f"Deleting {len(profile_ids):,} stale profiles...")
+    
+    with engine.connect() as conn:
+        for i in range(0, len(profile_ids), chunk_size):
+            conn.execute(
+                text("DELETE FROM argo_profiles WHERE profile_id = ANY(:profile_ids)"),
+                {'profile_ids': profile_ids[i:i+chunk_size]}
+            )
+        conn.commit()
+    
+    logger.success(f"Deleted {len(profile_ids):,} stale profiles")
+
+
 def update_statistics(engine):
     """Update database statistics and vacuum"""
     logger.info("Updating database statistics...")
@@ -139,6 +224,8 @@ def update_statistics(engine):
         conn.execute(text("ANALYZE argo_floats"))
         conn.execute(text("ANALYZE argo_profiles"))
         conn.execute(text("ANALYZE argo_measurements"))
+        conn.execute(text("ANALYZE argo_ocean_properties"))
+        conn.execute(text("ANALYZE argo_summaries"))
         conn.commit()
     
     logger.success("Database statistics updated")
@@ -188,31 +275,47 @@ def print_database_stats(engine):
     logger.info("="*60 + "\n")
 
 
-def main():
-    """Main execution"""
+def main(processed_dir=None, changes=None, source_files=None):
+    """
+    Main execution
+    
+    Args:
+        processed_dir: Directory with floats.parquet and the Parquet lake (default: data/processed)
+        changes: Optional IndexChangeSet; profiles it modified or deleted are
+                 removed first so the re-parsed versions replace them
+        source_files: Only load the lake rows of these index paths (an
+                      incremental re-parse); their profiles are replaced
+    """
     logger.info("Starting ARGO Database Loading")
     
     try:
         # Load parsed data
-        processed_dir = Path(settings.data_processed_dir)
+        processed_dir = Path(processed_dir) if processed_dir else Path(settings.data_processed_dir)
         
         floats_file = processed_dir / "floats.parquet"
-        profiles_file = processed_dir / "profiles.parquet"
-        measurements_file = processed_dir / "measurements.parquet"
+        lake_dir = get_lake_dir(processed_dir)
         
-        if not all([floats_file.exists(), profiles_file.exists(), measurements_file.exists()]):
+        if not all([floats_file.exists(), (lake_dir / PROFILES).exists(), (lake_dir / MEASUREMENTS).exists()]):
             logger.error("Parsed data files not found!")
             logger.info("Run parse_netcdf.py first!")
             return
         
         logger.info("Loading parsed data files...")
         floats_df = pd.read_parquet(floats_file)
-        profiles_df = pd.read_parquet(profiles_file)
-        measurements_df = pd.read_parquet(measurements_file)
+        profiles_df = read_lake(PROFILES, lake_dir=lake_dir)
+        # Measurements are streamed batch by batch below
+        measurements = lake_dataset(MEASUREMENTS, lake_dir)
+        measurement_filter = None
+        
+        if source_files is not None:
+            source_files = list(source_files)
+            profiles_df = profiles_df[profiles_df['source_file'].isin(source_files)].reset_index(drop=True)
+            floats_df = floats_df[floats_df['float_id'].isin(profiles_df['float_id'])]
+            measurement_filter = ds.field('profile_id').isin(profiles_df['profile_id'].tolist())
         
         logger.info(f"Loaded {len(floats_df):,} floats")
         logger.info(f"Loaded {len(profiles_df):,} profiles")
-        logger.info(f"Loaded {len(measurements_df):,} measurements")
+        logger.info(f"Found {measurements.count_rows(filter=measurement_filter):,} measurements")
         
         # Get database engine
         engine = get_db_engine()
@@ -220,21 +323,39 @@ def main():
         # Load data
         logger.info("\nLoading data into PostgreSQL...")
         
+        # 0. Drop profiles superseded since the last load, and earlier copies of those reloaded
+        stale = set(changes.stale_profile_ids) if changes is not None else set()
+        if source_files is not None:
+            stale |= set(profiles_df['profile_id'])
+        delete_profiles(sorted(stale), engine)
+        
         # 1. Load floats
         load_floats(floats_df, engine)
         
-        # 2. Load profiles
+        # 2. Load profiles and their summaries
         load_profiles(profiles_df, engine)
+        load_summaries(profiles_df, engine)
         
-        # 3. Load measurements
-        load_measurements(measurements_df, engine)
+        # 3. Load measurements and their derived properties, one record batch at a time
+        for batch in measurements.to_batches(columns=MEASUREMENT_SCHEMA.names, filter=measurement_filter,
+                                             batch_size=MEASUREMENT_BATCH_ROWS):
+            load_measurement_batch(batch.to_pandas(), engine)
         
-        # 4. Update statistics
+        # 4. Region cells (first load only) and statistics
+        load_region_cells(engine, rebuild=False)
         update_statistics(engine)
         
         # 5. Print statistics
         print_database_stats(engine)
         
+        # 6. Mark the source files of this processed directory as loaded
+        with FileManifest() as manifest:
+            if source_files is not None:
+                loaded_files = manifest.mark_loaded(files=[manifest.local_path(f) for f in source_files])
+            else:
+                loaded_files = manifest.mark_loaded(processed_dir)
+        logger.info(f"Manifest: {loaded_files:,} files marked as loaded")
+        
         logger.success("Database loading complete!")
         logger.info("Data is now ready for AI/RAG pipeline!")
         
@@ -0,0 +1,310 @@
+"""
+ARGO File Manifest
+SQLite state database of the local NetCDF mirror: one row per verified file
+with its size, mtime, checksum, source date_update and parse/load status.
+Every pipeline stage updates it, so "what is left to do" and download
+statistics are indexed queries instead of filesystem walks
+"""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+
+# Parse / load status values
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+COLUMNS = {
+    'path': 'TEXT PRIMARY KEY',
+    'float_id': 'TEXT',
+    'size': 'INTEGER NOT NULL',
+    'mtime': 'REAL',
+    'checksum': 'TEXT',
+    'etag': 'TEXT',
+    'date_update': 'TEXT',
+    'downloaded_at': 'TEXT NOT NULL',
+    'parse_status': f"TEXT NOT NULL DEFAULT '{PENDING}'",
+    'parse_output': 'TEXT',
+    'parsed_at': 'TEXT',
+    'parse_error': 'TEXT',
+    'parsed_size': 'INTEGER',
+    'parsed_mtime': 'REAL',
+    'parsed_checksum': 'TEXT',
+    'load_status': f"TEXT NOT NULL DEFAULT '{PENDING}'",
+    'loaded_at': 'TEXT',
+}
+
+INDEXES = {
+    'idx_files_float': 'float_id',
+    'idx_files_parse': 'parse_status',
+    'idx_files_load': 'load_status, parse_output',
+}
+
+
+def get_manifest_path():
+    """Manifest database next to the NetCDF mirror"""
+    return Path(settings.data_raw_dir) / "netcdf_manifest.sqlite"
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def file_key(path, root):
+    """Local path under the mirror root -> index path"""
+    path = Path(path)
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+class FileManifest:
+    """
+    Per-file pipeline state keyed by index path ('aoml/2901234/profiles/...')
+
+    Download records are buffered and committed every ``batch_size`` files
+    (anything lost in a crash is re-verified on the next run); parse and load
+    updates are committed as one transaction per call.
+    """
+
+    def __init__(self, db_path=None, root=None, batch_size=500):
+        self.db_path = Path(db_path) if db_path else get_manifest_path()
+        self.root = Path(root) if root else Path(settings.data_raw_dir) / "netcdf"
+        self.batch_size = batch_size
+        self._pending = []
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # The async downloader records files from its callback thread; calls are never concurrent
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ", ".join(f"{name} {spec}" for name, spec in COLUMNS.items())
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS files ({columns})")
+
+            # Manifests written before the parse/load columns existed
+            existing = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+            for name, spec in COLUMNS.items():
+                if name not in existing:
+                    self.conn.execute(f"ALTER TABLE files ADD COLUMN {name} {spec.replace('NOT NULL ', '')}")
+            if 'float_id' not in existing:
+                self.conn.execute("UPDATE files SET float_id = substr(path, instr(path, '/') + 1, "
+                                  "instr(substr(path, instr(path, '/') + 1), '/') - 1)")
+
+            for name, columns in INDEXES.items():
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON files ({columns})")
+
+    def key(self, path):
+        """Local path under the mirror -> index path"""
+        return file_key(path, self.root)
+
+    def local_path(self, file_path):
+        """Index path -> local path under the mirror"""
+        return self.root / file_path
+
+    # ------------------------------------------------------------------
+    # Download stage
+    # ------------------------------------------------------------------
+
+    def completed(self):
+        """Set of index paths already downloaded and verified"""
+        return {row[0] for row in self.conn.execute("SELECT path FROM files")}
+
+    def record_download(self, local_path, info, date_update=None):
+        """
+        Queue a verified download (info from PartialDownload.finish())
+
+        New content resets the parse and load status to pending; the parse
+        ledger is kept so an identical re-download is not parsed again.
+        """
+        key = self.key(local_path)
+        self._pending.append((
+            key, key.split('/')[1] if key.count('/') >= 2 else None,
+            info['size'], info.get('mtime'), info.get('checksum'), info.get('etag'),
+            str(date_update) if date_update is not None else None, _now()
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO files "
+                "(path, float_id, size, mtime, checksum, etag, date_update, downloaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET float_id = excluded.float_id, size = excluded.size, "
+                "mtime = excluded.mtime, checksum = excluded.checksum, etag = excluded.etag, "
+                "date_update = excluded.date_update, downloaded_at = excluded.downloaded_at, "
+                f"parse_status = '{PENDING}', parse_error = NULL, "
+                f"load_status = '{PENDING}', loaded_at = NULL",
+                self._pending
+            )
+        self._pending = []
+
+    def remove(self, files):
+        """Forget files (deleted locally or about to be replaced)"""
+        self.flush()
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE path = ?", [(str(f),) for f in files])
+
+    # ------------------------------------------------------------------
+    # Parse / load stages
+    # ------------------------------------------------------------------
+
+    def files(self, parse_status=None, load_status=None, output_dir=None):
+        """Index paths, optionally restricted by parse/load status and parse output directory"""
+        self.flush()
+        query, params = "SELECT path FROM files WHERE 1=1", []
+        if parse_status:
+            query += " AND parse_status = ?"
+            params.append(parse_status)
+        if load_status:
+            query += " AND load_status = ?"
+            params.append(load_status)
+        if output_dir:
+            query += " AND parse_output = ?"
+            params.append(str(Path(output_dir).resolve()))
+        return [row[0] for row in self.conn.execute(query + " ORDER BY path", params)]
+
+    def mark_parsed(self, parsed, failed=(), output_dir=None, ledger=None):
+        """
+        Record a parse run
+
+        Args:
+            parsed: Local paths parsed successfully
+            failed: (local_path, error) pairs
+            output_dir: Processed directory the parsed rows were written to
+            ledger: Optional {local_path: {'size', 'mtime', 'checksum'}} of the
+                    parsed content, used by incremental re-parses
+        """
+        self.flush()
+        now = _now()
+        output = str(Path(output_dir).resolve()) if output_dir else None
+        ledger = {self.key(p): info for p, info in (ledger or {}).items()}
+
+        def ledger_values(key):
+            info = ledger.get(key, {})
+            return info.get('size'), info.get('mtime'), info.get('checksum')
+
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET parse_status = ?, parse_output = ?, parsed_at = ?, parse_error = NULL, "
+                "load_status = ?, parsed_size = ?, parsed_mtime = ?, parsed_checksum = ? "
+                "WHERE path = ?",
+                [(DONE, output, now, PENDING) + ledger_values(key) + (key,)
+                 for key in (self.key(p) for p in parsed)]
+            )
+            self.conn.executemany(
+                "UPDATE files SET parse_status = ?, parsed_at = ?, parse_error = ? WHERE path = ?",
+                [(FAILED, now, str(error), self.key(p)) for p, error in failed]
+            )
+
+    def record_parse_output(self, parsed, output_dir):
+        """Record that already parsed files now have their rows in output_dir (streaming runs)"""
+        self.flush()
+        output = str(Path(output_dir).resolve())
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET parse_output = ? WHERE path = ? AND parse_status = ?",
+                [(output, self.key(p), DONE) for p in parsed]
+            )
+
+    def parse_ledger(self, output_dir):
+        """
+        {index path: {'size', 'mtime', 'checksum'}} of the content last parsed
+        into output_dir (kept across re-downloads)
+        """
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT path, parsed_size, parsed_mtime, parsed_checksum FROM files "
+            "WHERE parse_output = ? AND parsed_checksum IS NOT NULL",
+            (str(Path(output_dir).resolve()),)
+        )
+        return {
+            path: {'size': size, 'mtime': mtime, 'checksum': checksum}
+            for path, size, mtime, checksum in rows
+        }
+
+    def refresh_parse_ledger(self, mtimes):
+        """
+        Mark files whose content matches the ledger as parsed again
+
+        Args:
+            mtimes: {local_path: current mtime}
+        """
+        self.flush()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET parse_status = ?, parsed_mtime = ?, parse_error = NULL "
+                "WHERE path = ? AND (parse_status != ? OR parsed_mtime != ?)",
+                [(DONE, mtime, self.key(p), DONE, mtime) for p, mtime in mtimes.items()]
+            )
+
+    def mark_loaded(self, output_dir=None, files=None):
+        """
+        Record a load into the database; returns the number of files marked
+
+        Args:
+            output_dir: Every file parsed into this processed directory was loaded
+            files: Or exactly these local paths (streaming loads)
+        """
+        self.flush()
+        now = _now()
+        with self.conn:
+            if files is not None:
+                cursor = self.conn.executemany(
+                    "UPDATE files SET load_status = ?, loaded_at = ? WHERE path = ?",
+                    [(DONE, now, self.key(p)) for p in files]
+                )
+            else:
+                cursor = self.conn.execute(
+                    "UPDATE files SET load_status = ?, loaded_at = ? "
+                    "WHERE parse_status = ? AND parse_output = ? AND load_status != ?",
+                    (DONE, now, DONE, str(Path(output_dir).resolve()), DONE)
+                )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def statistics(self):
+        """File/float/size totals and parse/load status counts"""
+        self.flush()
+        total_files, total_size, float_count = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COUNT(DISTINCT float_id) FROM files"
+        ).fetchone()
+        parse = dict(self.conn.execute("SELECT parse_status, COUNT(*) FROM files GROUP BY parse_status"))
+        load = dict(self.conn.execute("SELECT load_status, COUNT(*) FROM files GROUP BY load_status"))
+        return {
+            'total_files': total_files,
+            'total_size': total_size,
+            'float_count': float_count,
+            'parse_status': parse,
+            'load_status': load,
+        }
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+        logger.debug(f"File manifest saved: {self.db_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -4,9 +4,15 @@ Parses ARGO NetCDF files and extracts float, profile, and measurement data
 Uses xarray for efficient NetCDF reading
 """
 
+import os
+import re
+import shutil
+from functools import lru_cache
+from importlib.util import find_spec
 import xarray as xr
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from loguru import logger
@@ -17,105 +23,285 @@ from tqdm import tqdm
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.utils.config import settings
 from src.utils.logger import setup_logger
+from src.data.manifest import FileManifest, file_key
+from src.data.aggregate_download import covered_by_aggregates
+from src.data.download_integrity import file_md5
+from src.data.derived import derive_properties
+from src.data.summaries import empty_summaries, summarize_profiles
+from src.data.spatial import h3_cells
+from src.data.standard_levels import LEVEL_PARAMETERS, LEVEL_SCHEMA, empty_levels, profile_levels
+from src.data.columnar import (
+    MEASUREMENT_SCHEMA, PARAMETERS, PROFILE_SCHEMA, QC_MISSING, PartitionedBatchWriter
+)
+from src.data.lake import (
+    LAKE_SCHEMAS, LEVELS, MEASUREMENTS, PARTITION_COLS, PROFILES, TABLES, add_partition_keys, compact_lake,
+    get_lake_dir, lake_dataset, lake_is_current, lake_partition_sources, read_lake
+)
 
 # Setup logging
 setup_logger()
 
+# Variables parse_netcdf_file reads; history/calibration blocks are never decoded
+PARSE_VARIABLES = ['CYCLE_NUMBER', 'LATITUDE', 'LONGITUDE', 'JULD', 'DATA_MODE'] + [
+    f"{var}{suffix}"
+    for var in PARAMETERS.values()
+    for suffix in ('', '_QC', '_ADJUSTED', '_ADJUSTED_QC', '_ADJUSTED_ERROR')
+]
 
-def parse_netcdf_file(nc_file):
-    """Parse a single NetCDF file and extract data"""
+# Data modes whose *_ADJUSTED values are the ones to use
+ADJUSTED_MODES = ['A', 'D']
+
+# CYCLE_NUMBER _FillValue of the ARGO format; single-profile file names carry the cycle too
+CYCLE_FILL = 99999
+CYCLE_IN_NAME = re.compile(r"_(\d+)D?\.nc$")
+
+# xarray backends by on-disk format, fastest first, with the modules each needs
+NETCDF_ENGINES = {
+    'hdf5': ['netcdf4', 'h5netcdf'],
+    'classic': ['netcdf4', 'scipy'],
+}
+ENGINE_MODULES = {
+    'netcdf4': ['netCDF4'],
+    'h5netcdf': ['h5netcdf', 'h5py'],
+    'scipy': ['scipy'],
+}
+
+
+def _empty_columns(schema):
+    return {name: np.array([]) for name in schema.names}
+
+
+def _profile_values(ds, name, n_prof):
+    """(N_PROF,) values of a per-profile variable"""
+    if name not in ds:
+        return np.full(n_prof, np.nan)
+    return np.asarray(ds[name].values).reshape(n_prof)
+
+
+def _level_values(ds, name, shape):
+    """(N_PROF, N_LEVELS) float32 block of a measured parameter"""
+    if name not in ds:
+        return np.full(shape, np.nan, dtype=np.float32)
+    return np.asarray(ds[name].values, dtype=np.float32).reshape(shape)
+
+
+def _data_modes(ds, n_prof):
+    """(N_PROF,) data mode letters; blank or missing counts as real-time ('R')"""
+    if 'DATA_MODE' not in ds:
+        return np.full(n_prof, 'R', dtype=object)
+    values = np.asarray(ds['DATA_MODE'].values).reshape(n_prof)
+    if values.dtype.kind == 'O':
+        values = np.where(pd.isna(values), b' ', values)
+    modes = np.char.strip(values.astype('S1').astype('U1'))
+    return np.where(modes == '', 'R', modes).astype(object)
+
+
+def _cycle_numbers(ds, nc_file, n_prof):
+    """
+    (N_PROF,) int64 cycle numbers and the mask of known ones
+
+    Fill values (NaN once decoded, or the raw CYCLE_FILL) take the cycle from a
+    single-profile file name; elsewhere they stay unknown (-1).
+    """
+    if 'CYCLE_NUMBER' not in ds:
+        return np.arange(n_prof, dtype=np.int64), np.ones(n_prof, dtype=bool)
+    values = _profile_values(ds, 'CYCLE_NUMBER', n_prof).astype(np.float64)
+    known = np.isfinite(values) & (values >= 0) & (values < CYCLE_FILL)
+    match = CYCLE_IN_NAME.search(Path(nc_file).name)
+    if match and not known.all():
+        values = np.where(known, values, int(match.group(1)))
+        known = np.ones(n_prof, dtype=bool)
+    return np.where(known, values, -1).astype(np.int64), known
+
+
+def _first_profiles(profile_ids):
+    """Mask keeping the first profile of each profile_id (None when all are unique)"""
+    _, first = np.unique(profile_ids.astype(str), return_index=True)
+    if len(first) == len(profile_ids):
+        return None
+    keep = np.zeros(len(profile_ids), dtype=bool)
+    keep[first] = True
+    return keep
+
+
+def _qc_flags(ds, name, shape, missing=1):
+    """(N_PROF, N_LEVELS) int8 QC flags (QC_MISSING when blank), decoded through a uint8 view"""
+    if name not in ds:
+        return np.full(shape, missing, dtype=np.int8)
+    values = np.asarray(ds[name].values).reshape(shape)
+    if values.dtype.kind == 'O':
+        # Masked char variables come back as objects with NaN for the fill value
+        values = np.where(pd.isna(values), b' ', values)
+    if values.dtype.kind in 'OSU':
+        codes = values.astype('S1').view(np.uint8).astype(np.int16) - ord('0')
+    else:
+        codes = np.nan_to_num(values.astype(np.float64), nan=QC_MISSING)
+    return np.where((codes >= 0) & (codes <= 9), codes, QC_MISSING).astype(np.int8)
+
+
+@lru_cache(maxsize=None)
+def engine_available(engine):
+    """Whether an xarray backend's modules are installed"""
+    return all(find_spec(module) is not None for module in ENGINE_MODULES[engine])
+
+
+def netcdf_format(nc_file):
+    """'hdf5' (NetCDF-4) or 'classic' (NetCDF-3) from the file signature"""
+    with open(nc_file, 'rb') as f:
+        return 'hdf5' if f.read(4) == b'\x89HDF' else 'classic'
+
+
+def netcdf_engine(nc_file, engine=None):
+    """
+    xarray backend for a file: NETCDF_ENGINE, or for 'auto' the fastest
+    installed backend that reads the file's format (None lets xarray choose)
+    """
+    engine = engine or settings.netcdf_engine
+    if engine != 'auto':
+        return engine
+    for candidate in NETCDF_ENGINES[netcdf_format(nc_file)]:
+        if engine_available(candidate):
+            return candidate
+    return None
+
+
+def open_argo_dataset(nc_file, engine=None, variables=PARSE_VARIABLES):
+    """
+    Open only the given variables of an ARGO file
+    
+    The file is opened without CF decoding, and masking/scaling/time decoding
+    is then applied to the selected variables alone. Values stay lazy until
+    read. Closing the returned dataset closes the file.
+    """
+    raw = xr.open_dataset(nc_file, engine=netcdf_engine(nc_file, engine), decode_cf=False, cache=False)
     try:
-        # Open NetCDF file
-        ds = xr.open_dataset(nc_file)
-        
-        # Extract float information
-        float_id = str(nc_file.parent.parent.name)  # e.g., "2901234"
-        
-        # Extract profile data
-        profiles = []
-        measurements = []
-        
-        # Get number of profiles in this file
-        n_prof = ds.dims.get('N_PROF', 1)
-        n_levels = ds.dims.get('N_LEVELS', 0)
-        
-        for prof_idx in range(n_prof):
-            # Profile metadata
-            if n_prof == 1:
-                lat = float(ds['LATITUDE'].values)
-                lon = float(ds['LONGITUDE'].values)
-                date = pd.to_datetime(str(ds['JULD'].values))
-                cycle = int(ds['CYCLE_NUMBER'].values) if 'CYCLE_NUMBER' in ds else prof_idx
-            else:
-                lat = float(ds['LATITUDE'].values[prof_idx])
-                lon = float(ds['LONGITUDE'].values[prof_idx])
-                date = pd.to_datetime(str(ds['JULD'].values[prof_idx]))
-                cycle = int(ds['CYCLE_NUMBER'].values[prof_idx]) if 'CYCLE_NUMBER' in ds else prof_idx
+        ds = xr.decode_cf(raw[[name for name in variables if name in raw.variables]])
+    except Exception:
+        raw.close()
+        raise
+    ds.set_close(raw.close)
+    return ds
+
+
+def parse_netcdf_file(nc_file, engine=None):
+    """
+    Parse a single NetCDF file and extract data
+    
+    The PRES/TEMP/PSAL variables and their QC flags are read as whole
+    (N_PROF, N_LEVELS) blocks, together with their *_ADJUSTED values, QC and
+    errors; levels where every value is missing are masked out in one
+    operation. The best available value is the adjusted one for A/D-mode
+    profiles and the raw one for R-mode profiles; TEOS-10 properties, the
+    per-profile summaries and the standard pressure level values are derived
+    from the best values on the same blocks. Profiles, measurements and levels
+    are returned as columnar dicts of NumPy arrays typed for PROFILE_SCHEMA /
+    MEASUREMENT_SCHEMA / LEVEL_SCHEMA.
+    Only PARSE_VARIABLES are opened and decoded (see open_argo_dataset).
+    """
+    nc_file = Path(nc_file)
+    try:
+        with open_argo_dataset(nc_file, engine) as ds:
+            # Extract float information
+            # e.g., ".../2901234/profiles/R2901234_001.nc" or per-float ".../2901234/2901234_prof.nc"
+            float_dir = nc_file.parent if nc_file.name.endswith('_prof.nc') else nc_file.parent.parent
+            float_id = str(float_dir.name)  # e.g., "2901234"
             
-            profile_id = f"{float_id}_{cycle:03d}"
+            # Get number of profiles in this file
+            n_prof = ds.sizes.get('N_PROF', 1)
+            n_levels = ds.sizes.get('N_LEVELS', 0)
             
-            # Profile record
-            profile = {
-                'profile_id': profile_id,
-                'float_id': float_id,
-                'cycle_number': cycle,
-                'latitude': lat,
-                'longitude': lon,
-                'date': date,
-                'n_levels': n_levels
+            # Profile metadata
+            data_modes = _data_modes(ds, n_prof)
+            cycles, known_cycles = _cycle_numbers(ds, nc_file, n_prof)
+            profile_ids = np.char.add(f"{float_id}_", np.char.zfill(cycles.astype(str), 3)).astype(object)
+            
+            profiles = {
+                'profile_id': profile_ids,
+                'float_id': np.full(n_prof, float_id, dtype=object),
+                'cycle_number': cycles.astype(np.int32),
+                'latitude': _profile_values(ds, 'LATITUDE', n_prof).astype(np.float64),
+                'longitude': _profile_values(ds, 'LONGITUDE', n_prof).astype(np.float64),
+                'date': pd.to_datetime(_profile_values(ds, 'JULD', n_prof)).to_numpy(),
+                'n_levels': np.full(n_prof, n_levels, dtype=np.int32),
+                'data_mode': data_modes,
             }
-            profiles.append(profile)
+            profiles.update(h3_cells(profiles['latitude'], profiles['longitude']))
+            levels = {name: profiles[name] for name in ('profile_id', 'latitude', 'longitude', 'date')}
             
             # Extract measurements
-            if n_levels > 0:
-                # Get pressure, temperature, salinity
-                if n_prof == 1:
-                    pres = ds['PRES'].values
-                    temp = ds['TEMP'].values if 'TEMP' in ds else np.full(n_levels, np.nan)
-                    psal = ds['PSAL'].values if 'PSAL' in ds else np.full(n_levels, np.nan)
-                    
-                    # Quality flags
-                    pres_qc = ds['PRES_QC'].values if 'PRES_QC' in ds else np.full(n_levels, '1')
-                    temp_qc = ds['TEMP_QC'].values if 'TEMP_QC' in ds else np.full(n_levels, '1')
-                    psal_qc = ds['PSAL_QC'].values if 'PSAL_QC' in ds else np.full(n_levels, '1')
-                else:
-                    pres = ds['PRES'].values[prof_idx, :]
-                    temp = ds['TEMP'].values[prof_idx, :] if 'TEMP' in ds else np.full(n_levels, np.nan)
-                    psal = ds['PSAL'].values[prof_idx, :] if 'PSAL' in ds else np.full(n_levels, np.nan)
-                    
-                    pres_qc = ds['PRES_QC'].values[prof_idx, :] if 'PRES_QC' in ds else np.full(n_levels, '1')
-                    temp_qc = ds['TEMP_QC'].values[prof_idx, :] if 'TEMP_QC' in ds else np.full(n_levels, '1')
-                    psal_qc = ds['PSAL_QC'].values[prof_idx, :] if 'PSAL_QC' in ds else np.full(n_levels, '1')
+            if n_levels == 0 or 'PRES' not in ds:
+                measurements = _empty_columns(MEASUREMENT_SCHEMA)
+                profiles.update(empty_summaries(n_prof))
+                levels.update(empty_levels(n_prof))
+            else:
+                shape = (n_prof, n_levels)
+                raw = {name: _level_values(ds, var, shape) for name, var in PARAMETERS.items()}
+                adjusted = {name: _level_values(ds, f"{var}_ADJUSTED", shape) for name, var in PARAMETERS.items()}
                 
-                # Create measurement records
-                for level_idx in range(n_levels):
-                    # Skip if all values are NaN
-                    if np.isnan(pres[level_idx]) and np.isnan(temp[level_idx]) and np.isnan(psal[level_idx]):
-                        continue
-                    
-                    # Convert QC flags to strings
-                    pres_qc_str = str(pres_qc[level_idx]) if isinstance(pres_qc[level_idx], (int, float)) else pres_qc[level_idx].decode() if isinstance(pres_qc[level_idx], bytes) else '1'
-                    temp_qc_str = str(temp_qc[level_idx]) if isinstance(temp_qc[level_idx], (int, float)) else temp_qc[level_idx].decode() if isinstance(temp_qc[level_idx], bytes) else '1'
-                    psal_qc_str = str(psal_qc[level_idx]) if isinstance(psal_qc[level_idx], (int, float)) else psal_qc[level_idx].decode() if isinstance(psal_qc[level_idx], bytes) else '1'
-                    
-                    measurement = {
-                        'profile_id': profile_id,
-                        'level': level_idx,
-                        'pressure': float(pres[level_idx]) if not np.isnan(pres[level_idx]) else None,
-                        'temperature': float(temp[level_idx]) if not np.isnan(temp[level_idx]) else None,
-                        'salinity': float(psal[level_idx]) if not np.isnan(psal[level_idx]) else None,
-                        'pressure_qc': pres_qc_str,
-                        'temperature_qc': temp_qc_str,
-                        'salinity_qc': psal_qc_str
-                    }
-                    measurements.append(measurement)
-        
-        ds.close()
+                # Skip levels where all values are NaN
+                valid = ~np.logical_and.reduce([np.isnan(v) for v in (*raw.values(), *adjusted.values())])
+                prof_idx, level_idx = np.nonzero(valid)
+                use_adjusted = np.isin(data_modes, ADJUSTED_MODES)[:, np.newaxis]
+                
+                measurements = {
+                    'profile_id': profile_ids[prof_idx],
+                    'level': level_idx.astype(np.int32),
+                }
+                best = {}
+                best_qc = {}
+                for name, var in PARAMETERS.items():
+                    qc = _qc_flags(ds, f"{var}_QC", shape)
+                    adjusted_qc = _qc_flags(ds, f"{var}_ADJUSTED_QC", shape, missing=QC_MISSING)
+                    best[name] = np.where(use_adjusted, adjusted[name], raw[name])
+                    best_qc[name] = np.where(use_adjusted, adjusted_qc, qc)
+                    measurements[name] = raw[name][valid]
+                    measurements[f'{name}_qc'] = qc[valid]
+                    measurements[f'{name}_adjusted'] = adjusted[name][valid]
+                    measurements[f'{name}_adjusted_qc'] = adjusted_qc[valid]
+                    measurements[f'{name}_adjusted_error'] = _level_values(ds, f"{var}_ADJUSTED_ERROR", shape)[valid]
+                    measurements[f'{name}_best'] = best[name][valid]
+                    measurements[f'{name}_best_qc'] = best_qc[name][valid]
+                
+                # TEOS-10 properties of the whole block at once
+                derived = derive_properties(
+                    best['pressure'], best['temperature'], best['salinity'],
+                    profiles['latitude'], profiles['longitude']
+                )
+                for name, values in derived.items():
+                    measurements[name] = values[valid]
+                
+                profiles.update(summarize_profiles(
+                    best['pressure'], best['temperature'], best['salinity'],
+                    best_qc['temperature'], best_qc['salinity'],
+                    derived['depth'], derived['sigma_theta'], valid
+                ))
+                levels.update(profile_levels(
+                    best['pressure'], best_qc['pressure'],
+                    {name: (best[name], best_qc[name]) for name in LEVEL_PARAMETERS}, valid
+                ))
+            
+            # Profiles without a cycle number have no stable profile_id
+            keep = known_cycles
+            if not keep.all():
+                logger.warning(f"{nc_file.name}: dropping {int((~keep).sum())} profiles without a cycle number")
+            # Per-float files may repeat a cycle (e.g. its descending profile): one row per profile_id
+            first = _first_profiles(profile_ids[keep])
+            if first is not None:
+                logger.warning(f"{nc_file.name}: dropping {int((~first).sum())} profiles with repeated cycle numbers")
+                keep = keep.copy()
+                keep[keep] = first
+            if not keep.all():
+                profiles = {name: values[keep] for name, values in profiles.items()}
+                levels = {name: values[keep] for name, values in levels.items()}
+                if len(measurements['profile_id']):
+                    rows = keep[prof_idx]
+                    measurements = {name: values[rows] for name, values in measurements.items()}
         
         return {
             'float_id': float_id,
             'profiles': profiles,
             'measurements': measurements,
+            'levels': levels,
             'success': True,
             'error': None
         }
@@ -124,77 +310,267 @@ def parse_netcdf_file(nc_file):
         logger.error(f"Failed to parse {nc_file}: {e}")
         return {
             'float_id': None,
-            'profiles': [],
-            'measurements': [],
+            'profiles': _empty_columns(PROFILE_SCHEMA),
+            'measurements': _empty_columns(MEASUREMENT_SCHEMA),
+            'levels': _empty_columns(LEVEL_SCHEMA),
             'success': False,
             'error': str(e)
         }
 
 
-def parse_all_netcdf_files():
-    """Parse all downloaded NetCDF files"""
+def get_parse_workers(workers=None):
+    """Parser process count (PARSE_WORKERS, 0 = one per core minus one)"""
+    workers = settings.parse_workers if workers is None else workers
+    return workers if workers > 0 else max(1, (os.cpu_count() or 2) - 1)
+
+
+def file_fingerprint(nc_file):
+    """Size, mtime and MD5 of a file, as recorded in the manifest parse ledger"""
+    stat = Path(nc_file).stat()
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'checksum': file_md5(nc_file)}
+
+
+def select_changed_files(nc_files, ledger, root):
+    """
+    Split files into those needing a (re-)parse and those already parsed
+    
+    A file whose size and mtime match the ledger is skipped without reading
+    it; otherwise its MD5 decides, so a touched or re-downloaded but identical
+    file is not parsed again.
+    
+    Returns:
+        (changed files, {unchanged file: current mtime})
+    """
+    changed = []
+    unchanged = {}
+    for nc_file in nc_files:
+        entry = ledger.get(file_key(nc_file, root))
+        if entry is None:
+            changed.append(nc_file)
+            continue
+        try:
+            stat = nc_file.stat()
+        except OSError:
+            changed.append(nc_file)
+            continue
+        if stat.st_size == entry['size'] and (
+                stat.st_mtime == entry['mtime'] or file_md5(nc_file) == entry['checksum']):
+            unchanged[nc_file] = stat.st_mtime
+        else:
+            changed.append(nc_file)
+    return changed, unchanged
+
+
+def parse_file_chunk(chunk_index, nc_files, parts_dir, root=None):
+    """
+    Parse one chunk of files into Hive-partitioned profile/measurement/level part-files
+    
+    Runs in a worker process; only file lists, counts and the parse ledger
+    (size/mtime/MD5 per parsed file) travel back to the parent, the rows go
+    straight to Parquet one record batch at a time. Profiles are tagged with
+    their source file's manifest path (relative to root).
+    """
+    parts_dir = Path(parts_dir)
+    root = Path(root) if root else Path(settings.data_raw_dir) / "netcdf"
+    prefix = f"part-{chunk_index:05d}"
+    floats = set()
+    parsed_files = []
+    failed_files = []
+    ledger = {}
+    
+    with PartitionedBatchWriter(parts_dir / PROFILES, LAKE_SCHEMAS[PROFILES], PARTITION_COLS, prefix) as profiles, \
+            PartitionedBatchWriter(parts_dir / MEASUREMENTS, LAKE_SCHEMAS[MEASUREMENTS], PARTITION_COLS, prefix) as measurements, \
+            PartitionedBatchWriter(parts_dir / LEVELS, LAKE_SCHEMAS[LEVELS], PARTITION_COLS, prefix) as levels:
+        for nc_file in nc_files:
+            result = parse_netcdf_file(nc_file)
+            
+            if result['success']:
+                parsed_files.append(nc_file)
+                ledger[nc_file] = file_fingerprint(nc_file)
+                floats.add(result['float_id'])
+                n_prof = len(result['profiles']['profile_id'])
+                result['profiles']['source_file'] = np.full(n_prof, file_key(nc_file, root), dtype=object)
+                add_partition_keys(result['profiles'], result['measurements'], result['levels'])
+                profiles.append(result['profiles'])
+                measurements.append(result['measurements'])
+                levels.append(result['levels'])
+            else:
+                failed_files.append((nc_file, result['error']))
+    
+    return {
+        'chunk': chunk_index,
+        'floats': floats,
+        'parsed_files': parsed_files,
+        'failed_files': failed_files,
+        'ledger': ledger,
+        'n_profiles': profiles.rows,
+        'n_measurements': measurements.rows,
+    }
+
+
+def parse_all_netcdf_files(nc_files=None, output_dir=None, workers=None, incremental=False):
+    """
+    Parse downloaded NetCDF files
+    
+    Files are split into PARSE_CHUNK_SIZE chunks parsed by a process pool;
+    each chunk writes its own part-files, which are then compacted into the
+    sorted, Hive-partitioned lake (see src/data/lake.py), so the output does
+    not depend on worker scheduling.
+    
+    Incremental mode only parses files that are new or whose content changed
+    since they were last parsed into output_dir (see select_changed_files),
+    and only rewrites the lake partitions holding their old or new rows.
+    When nc_files is the whole manifest, rows of files that left it are
+    dropped as well.
+    
+    Args:
+        nc_files: Files to parse (default: every downloaded file in the manifest)
+        output_dir: Where to write the parquet outputs (default: data/processed)
+        workers: Parser processes (default: PARSE_WORKERS; 1 parses in-process)
+        incremental: Re-parse changed files only instead of rebuilding the lake
+    
+    Returns:
+        (floats_df, profiles_df, lake_dir) - measurements are left on disk,
+        since they do not fit in memory for the full archive
+    """
     logger.info("Starting NetCDF parsing...")
     
     netcdf_dir = Path(settings.data_raw_dir) / "netcdf"
+    manifest = FileManifest(root=netcdf_dir)
+    whole_manifest = nc_files is None
     
-    if not netcdf_dir.exists():
-        logger.error(f"NetCDF directory not found: {netcdf_dir}")
-        logger.info("Run download_netcdf.py first!")
-        return
+    if nc_files is None:
+        if not netcdf_dir.exists():
+            logger.error(f"NetCDF directory not found: {netcdf_dir}")
+            logger.info("Run download_netcdf.py first!")
+            manifest.close()
+            return
+        
+        # Downloaded files come from the manifest, not a directory walk
+        nc_files = [manifest.local_path(f) for f in manifest.files()]
+        if not nc_files:
+            logger.warning("Download manifest is empty - scanning the NetCDF directory")
+            nc_files = list(netcdf_dir.rglob("*.nc"))
     
-    # Find all NetCDF files
-    nc_files = list(netcdf_dir.rglob("*.nc"))
+    nc_files = [Path(f) for f in nc_files]
     logger.info(f"Found {len(nc_files):,} NetCDF files")
     
+    processed_dir = Path(output_dir) if output_dir else Path(settings.data_processed_dir)
+    lake_dir = get_lake_dir(processed_dir)
+    if incremental and not lake_is_current(lake_dir):
+        logger.warning("No lake with the current schema to update - parsing everything")
+        incremental = False
+    
+    # A float's <wmo>_prof.nc holds every cycle: its single-profile files would
+    # repeat those profile_ids, so they are skipped (and their lake rows dropped)
+    keys = pd.Series([file_key(f, netcdf_dir) for f in nc_files], dtype=object)
+    partition_sources = lake_partition_sources(lake_dir) if incremental else {}
+    lake_sources = set().union(*partition_sources.values())
+    superseded = covered_by_aggregates(keys, set(keys) | lake_sources)
+    if superseded.any():
+        logger.warning(f"Skipping {int(superseded.sum()):,} single-profile files superseded by per-float files")
+        nc_files = [f for f, skip in zip(nc_files, superseded) if not skip]
+    stale_sources = pd.Series(sorted(lake_sources), dtype=object)
+    superseded_sources = set(stale_sources[covered_by_aggregates(stale_sources, set(keys) | lake_sources)])
+    
     if len(nc_files) == 0:
         logger.warning("No NetCDF files found!")
+        manifest.close()
         return
     
-    # Parse all files
-    all_floats = set()
-    all_profiles = []
-    all_measurements = []
-    failed_files = []
+    # Incremental: skip files whose content is unchanged since their last parse
+    orphans = set()
+    if incremental:
+        nc_files, unchanged = select_changed_files(nc_files, manifest.parse_ledger(processed_dir), netcdf_dir)
+        known = set(manifest.files()) if whole_manifest else set()
+        if known:
+            orphans = lake_sources - known
+        orphans |= superseded_sources
+        logger.info(
+            f"Incremental parse: {len(nc_files):,} new or changed files, "
+            f"{len(unchanged):,} unchanged, {len(orphans):,} removed"
+        )
+        manifest.refresh_parse_ledger(unchanged)
+        if not nc_files and not orphans:
+            logger.success("Lake is up to date - nothing to parse")
+            manifest.close()
+            return
     
-    for nc_file in tqdm(nc_files, desc="Parsing NetCDF files"):
-        result = parse_netcdf_file(nc_file)
-        
-        if result['success']:
-            all_floats.add(result['float_id'])
-            all_profiles.extend(result['profiles'])
-            all_measurements.extend(result['measurements'])
-        else:
-            failed_files.append((nc_file, result['error']))
+    parts_dir = processed_dir / "_parts"
+    if parts_dir.exists():
+        shutil.rmtree(parts_dir)
+    for table in TABLES:
+        (parts_dir / table).mkdir(parents=True)
     
-    # Convert to DataFrames
-    logger.info("Converting to DataFrames...")
+    # Parse all files, one set of part-files per chunk
+    chunk_size = max(1, settings.parse_chunk_size)
+    chunks = [nc_files[i:i + chunk_size] for i in range(0, len(nc_files), chunk_size)]
+    workers = min(get_parse_workers(workers), max(1, len(chunks)))
+    logger.info(f"Parsing in {len(chunks):,} chunks of up to {chunk_size} files with {workers} worker(s)")
+    
+    results = []
+    with tqdm(total=len(nc_files), desc="Parsing NetCDF files") as pbar:
+        if workers == 1:
+            for i, chunk in enumerate(chunks):
+                results.append(parse_file_chunk(i, chunk, parts_dir, netcdf_dir))
+                pbar.update(len(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(parse_file_chunk, i, chunk, parts_dir, netcdf_dir) for i, chunk in enumerate(chunks)]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    pbar.update(len(chunks[result['chunk']]))
     
-    floats_df = pd.DataFrame([{'float_id': fid} for fid in all_floats])
-    profiles_df = pd.DataFrame(all_profiles)
-    measurements_df = pd.DataFrame(all_measurements)
+    # Deterministic order regardless of which worker finished first
+    results.sort(key=lambda r: r['chunk'])
+    parsed_files = [f for r in results for f in r['parsed_files']]
+    failed_files = [f for r in results for f in r['failed_files']]
+    ledger = {f: entry for r in results for f, entry in r['ledger'].items()}
     
-    # Save to parquet
-    processed_dir = Path(settings.data_processed_dir)
-    processed_dir.mkdir(parents=True, exist_ok=True)
+    # Compact the part-files into the lake
+    logger.info("Compacting part-files into the Parquet lake...")
+    if incremental:
+        # Rows of re-parsed and removed files are replaced; failed re-parses keep their old rows
+        replace = {file_key(f, netcdf_dir) for f in parsed_files} | orphans
+        rows = compact_lake(
+            parts_dir, lake_dir, replace_sources=replace,
+            partitions=[p for p, sources in partition_sources.items() if sources & replace],
+        )
+    else:
+        rows = compact_lake(parts_dir, lake_dir)
+    shutil.rmtree(parts_dir)
     
+    # Profiles are small; measurements stay on disk
+    profiles_df = read_lake(PROFILES, lake_dir=lake_dir)
+    n_measurements = lake_dataset(MEASUREMENTS, lake_dir).count_rows() if incremental else rows[MEASUREMENTS]
+    floats_df = pd.DataFrame({'float_id': sorted(profiles_df['float_id'].unique())})
     floats_df.to_parquet(processed_dir / "floats.parquet", index=False)
-    profiles_df.to_parquet(processed_dir / "profiles.parquet", index=False)
-    measurements_df.to_parquet(processed_dir / "measurements.parquet", index=False)
+    
+    # Drop monolithic outputs of earlier versions so nothing reads stale data
+    for table in (PROFILES, MEASUREMENTS):
+        (processed_dir / f"{table}.parquet").unlink(missing_ok=True)
     
     logger.success(f"Saved floats: {len(floats_df):,}")
     logger.success(f"Saved profiles: {len(profiles_df):,}")
-    logger.success(f"Saved measurements: {len(measurements_df):,}")
+    logger.success(f"Saved measurements: {n_measurements:,}")
+    
+    # Record the parse run in the manifest (one transaction)
+    with manifest:
+        manifest.mark_parsed(parsed_files, failed_files, output_dir=processed_dir, ledger=ledger)
     
     # Print statistics
     logger.info("\n" + "="*60)
     logger.info("PARSING STATISTICS")
     logger.info("="*60)
     logger.info(f"Files Processed: {len(nc_files):,}")
+    if incremental:
+        logger.info(f"Files Unchanged: {len(unchanged):,}")
     logger.info(f"Files Failed: {len(failed_files):,}")
     logger.info(f"Unique Floats: {len(floats_df):,}")
     logger.info(f"Total Profiles: {len(profiles_df):,}")
-    logger.info(f"Total Measurements: {len(measurements_df):,}")
-    logger.info(f"Avg Measurements/Profile: {len(measurements_df)/len(profiles_df):.1f}")
+    logger.info(f"Total Measurements: {n_measurements:,}")
+    logger.info(f"Avg Measurements/Profile: {n_measurements/max(len(profiles_df), 1):.1f}")
     logger.info("="*60 + "\n")
     
     if failed_files:
@@ -205,15 +581,24 @@ def parse_all_netcdf_files():
                 f.write(f"{file}\t{error}\n")
         logger.warning(f"Failed files logged to: {failed_log}")
     
-    return floats_df, profiles_df, measurements_df
+    return floats_df, profiles_df, lake_dir
 
 
 def main():
     """Main execution"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Parse downloaded ARGO NetCDF files into the Parquet lake')
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only re-parse new or changed files (by size/mtime, then MD5)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parser processes (default: PARSE_WORKERS)")
+    args = parser.parse_args()
+    
     logger.info("Starting ARGO NetCDF Parsing")
     
     try:
-        floats_df, profiles_df, measurements_df = parse_all_netcdf_files()
+        parse_all_netcdf_files(workers=args.workers, incremental=args.incremental)
         
         logger.success("NetCDF parsing complete!")
         logger.info("Next step: Load into database using: python src/data/load_database.py")
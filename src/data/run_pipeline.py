@@ -5,6 +5,7 @@ Runs the complete data acquisition and processing pipeline:
 2. Download NetCDF files
 3. Parse NetCDF files
 4. Load into database
+5. Update the climatology cube
 """
 
 from pathlib import Path
@@ -19,13 +20,23 @@ from src.utils.logger import setup_logger
 setup_logger()
 
 
-def run_pipeline(download_limit=100):
-    """Run the complete ARGO data pipeline"""
+def run_pipeline(download_limit=100, incremental=False, streaming=False):
+    """
+    Run the complete ARGO data pipeline
+    
+    Args:
+        download_limit: Max NetCDF files to download (None for all)
+        incremental: Only download, parse and load the profiles that changed
+                     in the index since the previous run
+        streaming: Run steps 2-4 concurrently, parsing and loading files
+                   while the rest are still downloading
+    """
     
     logger.info("="*70)
     logger.info("ARGO DATA ACQUISITION PIPELINE")
     logger.info("="*70)
     logger.info(f"Download Limit: {download_limit} files")
+    logger.info(f"Mode: {'incremental' if incremental else 'full'}{' (streaming)' if streaming else ''}")
     logger.info("="*70 + "\n")
     
     try:
@@ -36,29 +47,12 @@ def run_pipeline(download_limit=100):
         download_index_main()
         logger.info("\n")
         
-        # Step 2: Download NetCDF files
-        logger.info("STEP 2: Downloading NetCDF Files...")
-        logger.info("-" * 70)
-        from src.data.download_netcdf import load_filtered_index, download_netcdf_files, get_download_statistics
-        
-        df = load_filtered_index()
-        download_netcdf_files(df, limit=download_limit)
-        get_download_statistics()
-        logger.info("\n")
-        
-        # Step 3: Parse NetCDF files
-        logger.info("STEP 3: Parsing NetCDF Files...")
-        logger.info("-" * 70)
-        from src.data.parse_netcdf import parse_all_netcdf_files
-        parse_all_netcdf_files()
-        logger.info("\n")
-        
-        # Step 4: Load into database
-        logger.info("STEP 4: Loading into Database...")
-        logger.info("-" * 70)
-        from src.data.load_database import main as load_database_main
-        load_database_main()
-        logger.info("\n")
+        if streaming:
+            run_streaming_steps(download_limit, incremental)
+        elif incremental:
+            run_incremental_steps(download_limit)
+        else:
+            run_full_steps(download_limit)
         
         # Success!
         logger.info("="*70)
@@ -73,6 +67,106 @@ def run_pipeline(download_limit=100):
         raise
 
 
+def run_full_steps(download_limit):
+    """Steps 2-5: download, parse and load the whole filtered index"""
+    # Step 2: Download NetCDF files
+    logger.info("STEP 2: Downloading NetCDF Files...")
+    logger.info("-" * 70)
+    from src.data.download_netcdf import load_filtered_index, download_netcdf_files, get_download_statistics
+    
+    df = load_filtered_index()
+    download_netcdf_files(df, limit=download_limit)
+    get_download_statistics()
+    logger.info("\n")
+    
+    # Step 3: Parse NetCDF files
+    logger.info("STEP 3: Parsing NetCDF Files...")
+    logger.info("-" * 70)
+    from src.data.parse_netcdf import parse_all_netcdf_files
+    parse_all_netcdf_files()
+    logger.info("\n")
+    
+    # Step 4: Load into database
+    logger.info("STEP 4: Loading into Database...")
+    logger.info("-" * 70)
+    from src.data.load_database import main as load_database_main
+    load_database_main()
+    logger.info("\n")
+    
+    # Step 5: Fold the new standard-level rows into the climatology
+    logger.info("STEP 5: Updating Climatology Cube...")
+    logger.info("-" * 70)
+    from src.data.climatology import update_climatology
+    update_climatology()
+    logger.info("\n")
+
+
+def run_incremental_steps(download_limit):
+    """
+    Steps 2-5 restricted to the index change set written in step 1
+    
+    Changed files are re-parsed into the main lake through the parse ledger
+    (see parse_all_netcdf_files(incremental=True)), so lake readers, the
+    database and the climatology all see the same rows.
+    """
+    from src.data.index_diff import IndexChangeSet
+    from src.data.manifest import DONE, PENDING, FileManifest
+    from src.utils.config import settings
+    
+    changes = IndexChangeSet.load()
+    if changes.is_empty():
+        logger.success("Index unchanged since the previous run - nothing to do")
+        return
+    
+    # Step 2: Download only added/modified files, delete removed ones
+    logger.info("STEP 2: Downloading Changed NetCDF Files...")
+    logger.info("-" * 70)
+    from src.data.download_netcdf import download_index_changes
+    download_index_changes(changes, limit=download_limit)
+    logger.info("\n")
+    
+    # Step 3: Re-parse new/changed files and drop rows of removed ones in the main lake
+    logger.info("STEP 3: Re-parsing Changed NetCDF Files into the Lake...")
+    logger.info("-" * 70)
+    from src.data.parse_netcdf import parse_all_netcdf_files
+    parse_all_netcdf_files(incremental=True)
+    logger.info("\n")
+    
+    # Step 4: Replace stale profiles and load the rows parsed since the last load
+    logger.info("STEP 4: Loading Changes into Database...")
+    logger.info("-" * 70)
+    from src.data.load_database import main as load_database_main
+    with FileManifest() as manifest:
+        source_files = manifest.files(
+            parse_status=DONE, load_status=PENDING, output_dir=settings.data_processed_dir
+        )
+    load_database_main(changes=changes, source_files=source_files)
+    logger.info("\n")
+    
+    # Step 5: Fold the lake changes into the climatology
+    logger.info("STEP 5: Updating Climatology Cube...")
+    logger.info("-" * 70)
+    from src.data.climatology import update_climatology
+    update_climatology()
+    logger.info("\n")
+
+
+def run_streaming_steps(download_limit, incremental):
+    """Steps 2-4 as concurrent download -> parse -> load stages, then step 5"""
+    logger.info("STEPS 2-4: Streaming Download -> Parse -> Load...")
+    logger.info("-" * 70)
+    from src.data.streaming_pipeline import run_streaming_pipeline
+    run_streaming_pipeline(download_limit=download_limit, incremental=incremental)
+    logger.info("\n")
+    
+    # Step 5: The streamed rows were merged into the lake; fold them into the climatology
+    logger.info("STEP 5: Updating Climatology Cube...")
+    logger.info("-" * 70)
+    from src.data.climatology import update_climatology
+    update_climatology()
+    logger.info("\n")
+
+
 def main():
     """Main execution"""
     import argparse
@@ -84,12 +178,22 @@ def main():
         default=100,
         help='Number of NetCDF files to download (default: 100, use 0 for all)'
     )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only process profiles added/modified/deleted in the index since the last run'
+    )
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Parse and load files while downloads are still running'
+    )
     
     args = parser.parse_args()
     
     download_limit = None if args.limit == 0 else args.limit
     
-    run_pipeline(download_limit=download_limit)
+    run_pipeline(download_limit=download_limit, incremental=args.incremental, streaming=args.streaming)
 
 
 if __name__ == "__main__":
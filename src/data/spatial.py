@@ -0,0 +1,170 @@
+"""
+ARGO H3 Spatial Index
+H3 cells of the profile positions (res 7, and its res 5 / res 3 parents),
+computed per parsed block so region and heatmap queries group and join on
+indexed cell ids instead of evaluating geometry predicates per row.
+
+Region membership is precomputed once into ocean_region_cells (the res 3
+cells whose centres fall inside each region):
+    python src/data/spatial.py
+"""
+
+import h3
+import h3.api.numpy_int as h3_int
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import text
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.logger import setup_logger
+from src.ai.query_examples import OCEAN_REGIONS
+from src.data.columnar import H3_COLUMNS, H3_RESOLUTIONS
+from src.data.index_filters import parse_wkt_polygons, points_in_polygon, region_polygons
+
+REGION_RESOLUTION = 3
+DENSITY_RESOLUTION = 5
+
+_RES_MASK = np.uint64(0xF << 52)
+
+
+def _parent_cells(cells, res):
+    """Parents of H3 cell ids (uint64) at a coarser resolution, by bit masking"""
+    unused_digits = np.uint64((1 << (3 * (15 - res))) - 1)
+    return (cells & ~_RES_MASK) | np.uint64(res << 52) | unused_digits
+
+
+def h3_cells(latitude, longitude):
+    """
+    H3 cells of a block of positions
+
+    Returns:
+        dict keyed by H3_COLUMNS of object arrays holding the cell ids as H3
+        strings (None where the position is missing or out of range)
+    """
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    ok = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90)
+
+    finest = np.array(
+        [h3_int.latlng_to_cell(a, b, H3_RESOLUTIONS[0]) for a, b in zip(lat[ok], lon[ok])],
+        dtype=np.uint64
+    )
+    cells = {}
+    for res, name in zip(H3_RESOLUTIONS, H3_COLUMNS):
+        column = np.full(lat.shape, None, dtype=object)
+        column[ok] = [format(cell, 'x') for cell in _parent_cells(finest, res).tolist()]
+        cells[name] = column
+    return cells
+
+
+def polygon_cells(polygons, resolution=REGION_RESOLUTION):
+    """H3 cells whose centres lie inside any of the (lon, lat) polygons"""
+    cells = np.array(h3.uncompact_cells(h3.get_res0_cells(), resolution), dtype=object)
+    centres = np.array([h3.cell_to_latlng(cell) for cell in cells])
+    inside = np.zeros(len(cells), dtype=bool)
+    for polygon in polygons:
+        inside |= points_in_polygon(centres[:, 1], centres[:, 0], polygon)
+    return sorted(cells[inside])
+
+
+def load_region_cells(engine, rebuild=True, resolution=REGION_RESOLUTION):
+    """
+    Fill ocean_region_cells for OCEAN_REGIONS and the ocean_regions table
+
+    Args:
+        engine: Database engine
+        rebuild: Recompute even if the table is already filled
+        resolution: H3 resolution of the region cells
+
+    Returns:
+        {region_name: number of cells}
+    """
+    if not rebuild:
+        with engine.connect() as conn:
+            existing = dict(conn.execute(text(
+                "SELECT region_name, COUNT(*) FROM ocean_region_cells GROUP BY region_name"
+            )).all())
+        if existing:
+            return existing
+
+    regions = {name: region_polygons(name) for name in OCEAN_REGIONS}
+    with engine.connect() as conn:
+        for name, wkt in conn.execute(text(
+            "SELECT region_name, ST_AsText(boundary::geometry) FROM ocean_regions"
+        )):
+            regions[name] = parse_wkt_polygons(wkt)
+
+    rows = pd.DataFrame(
+        [(name, cell) for name, polygons in regions.items() for cell in polygon_cells(polygons, resolution)],
+        columns=['region_name', f'h3_index_res{resolution}']
+    )
+    with engine.connect() as conn:
+        conn.execute(text("TRUNCATE ocean_region_cells"))
+        rows.to_sql('ocean_region_cells', conn, if_exists='append', index=False, method='multi', chunksize=5000)
+        conn.commit()
+
+    counts = rows.groupby('region_name').size().to_dict()
+    logger.success(f"Loaded {len(rows):,} region cells for {len(counts)} regions")
+    return counts
+
+
+def profile_density(engine, resolution=DENSITY_RESOLUTION, region=None, date_start=None, date_end=None):
+    """
+    Profile counts per H3 cell (heatmap data)
+
+    Args:
+        engine: Database engine
+        resolution: One of H3_RESOLUTIONS
+        region: Region name in ocean_region_cells (default: everywhere)
+        date_start, date_end: Optional date bounds
+
+    Returns:
+        DataFrame with h3_cell, latitude, longitude (cell centre), profiles, floats
+    """
+    if resolution not in H3_RESOLUTIONS:
+        raise ValueError(f"Unsupported H3 resolution {resolution}; choose from {H3_RESOLUTIONS}")
+
+    column = f"p.h3_index_res{resolution}"
+    joins, conditions = [], [f"{column} IS NOT NULL"]
+    if region:
+        joins.append(
+            f"JOIN ocean_region_cells c ON c.h3_index_res{REGION_RESOLUTION} = p.h3_index_res{REGION_RESOLUTION}"
+        )
+        conditions.append("c.region_name = :region")
+    if date_start:
+        conditions.append("p.profile_datetime >= :date_start")
+    if date_end:
+        conditions.append("p.profile_datetime <= :date_end")
+
+    query = f"""
+        SELECT {column} AS h3_cell, COUNT(*) AS profiles, COUNT(DISTINCT p.float_id) AS floats
+        FROM argo_profiles p
+        {' '.join(joins)}
+        WHERE {' AND '.join(conditions)}
+        GROUP BY {column}
+    """
+    with engine.connect() as conn:
+        density = pd.read_sql(text(query), conn, params={
+            'region': region, 'date_start': date_start, 'date_end': date_end
+        })
+
+    centres = [h3.cell_to_latlng(cell) for cell in density['h3_cell']]
+    density.insert(1, 'latitude', [lat for lat, _ in centres])
+    density.insert(2, 'longitude', [lon for _, lon in centres])
+    return density
+
+
+def main():
+    """Main execution"""
+    from src.database.connection import get_db_engine
+
+    setup_logger()
+    load_region_cells(get_db_engine())
+
+
+if __name__ == "__main__":
+    main()
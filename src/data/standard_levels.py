@@ -0,0 +1,137 @@
+"""
+ARGO Standard Pressure Levels
+Best temperature and salinity of each profile linearly interpolated onto a
+fixed set of pressure levels, computed on whole (N_PROF, N_LEVELS) blocks at
+parse time. Each profile becomes one row of fixed-size lists in the 'levels'
+lake table, so a depth slice is one contiguous column read instead of a
+pressure range scan plus client-side interpolation.
+"""
+
+import json
+import numpy as np
+import pyarrow as pa
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.data.summaries import GOOD_QC
+
+DEFAULT_LEVELS = [
+    5, 10, 20, 30, 50, 75, 100, 125, 150, 200, 250, 300, 400, 500,
+    600, 700, 800, 900, 1000, 1100, 1200, 1300, 1400, 1500, 1750, 2000,
+]
+LEVEL_PARAMETERS = ['temperature', 'salinity']
+
+# Widest pressure gap (dbar) interpolated across, by depth of the standard level
+MAX_GAPS = [(300, 50.0), (1000, 100.0), (np.inf, 250.0)]
+
+
+def parse_levels(value):
+    """'10, 50,100' -> array([10., 50., 100.]); empty -> DEFAULT_LEVELS"""
+    parts = [p.strip() for p in str(value or '').split(',') if p.strip()]
+    levels = np.array([float(p) for p in parts] if parts else DEFAULT_LEVELS, dtype=np.float64)
+    if (levels < 0).any() or (np.diff(levels) <= 0).any():
+        raise ValueError(f"Standard pressure levels must be non-negative and increasing: {value!r}")
+    return levels
+
+
+STANDARD_LEVELS = parse_levels(settings.standard_pressure_levels)
+
+# One row per profile; the position and date are repeated so slices can be mapped without a join
+LEVEL_SCHEMA = pa.schema(
+    [
+        ('profile_id', pa.string()),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('date', pa.timestamp('ns')),
+    ]
+    + [(name, pa.list_(pa.float32(), len(STANDARD_LEVELS))) for name in LEVEL_PARAMETERS],
+    metadata={'standard_levels': json.dumps(STANDARD_LEVELS.tolist())},
+)
+
+
+def level_index(pressure, levels=STANDARD_LEVELS):
+    """Position of a standard pressure level (ValueError if it is not one)"""
+    matches = np.flatnonzero(np.isclose(levels, float(pressure)))
+    if not len(matches):
+        raise ValueError(
+            f"{pressure} dbar is not a standard level; choose from {', '.join(f'{p:g}' for p in levels)}"
+        )
+    return int(matches[0])
+
+
+def max_gap(levels):
+    """Widest interpolation gap allowed at each standard level"""
+    levels = np.asarray(levels, dtype=np.float64)
+    return np.select([levels <= depth for depth, _ in MAX_GAPS], [gap for _, gap in MAX_GAPS])
+
+
+def interpolate_to_levels(pressure, values, levels=STANDARD_LEVELS):
+    """
+    Linear interpolation of a block of profiles onto standard levels
+
+    Args:
+        pressure, values: (N_PROF, N_LEVELS) with NaN where a level is
+            missing or rejected; levels need not be sorted
+        levels: (K,) increasing standard pressures
+
+    Returns:
+        (N_PROF, K) float32, NaN outside each profile's pressure range and
+        where the bracketing levels are more than max_gap apart
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    p = np.asarray(pressure, dtype=np.float64)
+    v = np.asarray(values, dtype=np.float64)
+    ok = np.isfinite(p) & np.isfinite(v)
+
+    # Usable levels first, in pressure order
+    order = np.argsort(np.where(ok, p, np.inf), axis=1, kind='stable')
+    p = np.take_along_axis(np.where(ok, p, np.inf), order, axis=1)
+    v = np.take_along_axis(v, order, axis=1)
+    n_ok = ok.sum(axis=1)[:, np.newaxis]
+    if p.shape[1] == 0:
+        return np.full((p.shape[0], len(levels)), np.nan, dtype=np.float32)
+
+    # Bracketing levels: above = deepest usable level not below the target, below = the next one
+    above = (p[:, :, np.newaxis] <= levels).sum(axis=1) - 1
+    below = above + 1
+    p_above = np.take_along_axis(p, np.clip(above, 0, None), axis=1)
+    v_above = np.take_along_axis(v, np.clip(above, 0, None), axis=1)
+    p_below = np.take_along_axis(p, np.clip(below, None, p.shape[1] - 1), axis=1)
+    v_below = np.take_along_axis(v, np.clip(below, None, p.shape[1] - 1), axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = (levels - p_above) / (p_below - p_above)
+        interpolated = v_above + weight * (v_below - v_above)
+        exact = (above >= 0) & (p_above == levels)
+        inside = (above >= 0) & (below < n_ok) & (p_below - p_above <= max_gap(levels))
+    result = np.where(exact, v_above, np.where(inside, interpolated, np.nan))
+    return result.astype(np.float32)
+
+
+def profile_levels(pressure, pressure_qc, parameters, valid, levels=STANDARD_LEVELS):
+    """
+    Standard-level values of a parsed block
+
+    Args:
+        pressure, pressure_qc: (N_PROF, N_LEVELS) best pressure and its QC
+        parameters: {name: (values, qc)} of (N_PROF, N_LEVELS) best values
+        valid: (N_PROF, N_LEVELS) levels that are measurements
+
+    Returns:
+        {name: (N_PROF, K) float32}; only good or probably good (QC 1/2)
+        pressures and values are used
+    """
+    good_pressure = valid & np.isin(pressure_qc, GOOD_QC)
+    p = np.where(good_pressure, pressure, np.nan)
+    return {
+        name: interpolate_to_levels(p, np.where(np.isin(qc, GOOD_QC), values, np.nan), levels)
+        for name, (values, qc) in parameters.items()
+    }
+
+
+def empty_levels(n_prof, levels=STANDARD_LEVELS):
+    """Standard-level values of profiles without measurements"""
+    return {name: np.full((n_prof, len(levels)), np.nan, dtype=np.float32) for name in LEVEL_PARAMETERS}
@@ -0,0 +1,429 @@
+"""
+ARGO Streaming Pipeline
+Download -> parse -> load as three concurrent stages joined by bounded
+queues: each verified download goes straight to a pool of parser processes,
+and parsed batches go straight to the database loader. A full queue blocks
+the stage feeding it (back-pressure), so memory stays bounded and the first
+profiles are queryable seconds after their files arrive. Parsed rows are also
+staged as lake part-files and compacted into the Parquet lake at the end
+"""
+
+import multiprocessing
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.config import settings
+from src.data.manifest import PENDING, FileManifest, file_key
+from src.data.columnar import MEASUREMENT_SCHEMA, PROFILE_SCHEMA, PartitionedBatchWriter, frame_from_columns
+from src.data.lake import (
+    LAKE_SCHEMAS, LEVELS, MEASUREMENTS, PARTITION_COLS, PROFILES, TABLES, add_partition_keys, compact_lake,
+    get_lake_dir, lake_is_current, lake_partition_sources
+)
+from src.data.parse_netcdf import file_fingerprint, get_parse_workers, parse_netcdf_file
+
+# Stage sizing
+PARSE_QUEUE_SIZE = 256  # Downloaded files waiting for a parser
+LOAD_QUEUE_SIZE = 4  # Parsed batches waiting for the loader
+BATCH_PROFILES = 1000  # Profiles per load batch
+FLUSH_INTERVAL = 5.0  # Seconds before a partial batch is loaded anyway
+
+_DONE = object()  # End-of-stream marker
+
+
+class _Stopped(Exception):
+    """Another stage failed; unwind quietly"""
+
+
+class _Stage(threading.Thread):
+    """Pipeline thread that records its exception and stops the others on failure"""
+
+    def __init__(self, name, target, stop, *args):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self._args = args
+        self.stop = stop
+        self.error = None
+
+    def run(self):
+        try:
+            self._target_fn(*self._args)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self.error = e
+            self.stop.set()
+            logger.error(f"{self.name} stage failed: {e}")
+
+
+def _put(q, item, stop):
+    """Blocking put that gives up once the pipeline is stopping"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+    raise _Stopped()
+
+
+def _get(q, stop, timeout=None):
+    """Blocking get that gives up once the pipeline is stopping (queue.Empty on timeout)"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not stop.is_set():
+        wait_for = 0.5 if deadline is None else min(0.5, max(0.0, deadline - time.monotonic()))
+        try:
+            return q.get(timeout=wait_for)
+        except queue.Empty:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise
+    raise _Stopped()
+
+
+# ----------------------------------------------------------------------
+# Stages
+# ----------------------------------------------------------------------
+
+def _download_stage(download, parse_queue, stop):
+    """Run the downloader, forwarding each verified file to the parsers"""
+    try:
+        download(lambda path: _put(parse_queue, Path(path), stop))
+    finally:
+        if not stop.is_set():
+            _put(parse_queue, _DONE, stop)
+
+
+def parse_file(nc_file):
+    """parse_netcdf_file plus the parse-ledger fingerprint of the file (runs in a worker)"""
+    result = parse_netcdf_file(nc_file)
+    result['fingerprint'] = file_fingerprint(nc_file) if result['success'] else None
+    return result
+
+
+class _LakeParts:
+    """Parse results staged as Hive-partitioned part-files, like parse_file_chunk writes them"""
+
+    def __init__(self, parts_dir, root):
+        self.root = Path(root)
+        self.writers = {
+            table: PartitionedBatchWriter(Path(parts_dir) / table, LAKE_SCHEMAS[table], PARTITION_COLS, "stream")
+            for table in TABLES
+        }
+
+    def add(self, nc_file, result):
+        # Copies: the batch keeps the plain columns for the database loader
+        tables = {PROFILES: dict(result['profiles']), MEASUREMENTS: dict(result['measurements']),
+                  LEVELS: dict(result['levels'])}
+        n_prof = len(tables[PROFILES]['profile_id'])
+        tables[PROFILES]['source_file'] = np.full(n_prof, file_key(nc_file, self.root), dtype=object)
+        add_partition_keys(tables[PROFILES], tables[MEASUREMENTS], tables[LEVELS])
+        for table, columns in tables.items():
+            self.writers[table].append(columns)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+class _Batch:
+    """Parse results accumulated for one load"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.floats = set()
+        self.profiles = []
+        self.measurements = []
+        self.n_profiles = 0
+        self.n_measurements = 0
+        self.parsed_files = []
+        self.failed_files = []
+        self.ledger = {}
+
+    def add(self, nc_file, result):
+        if result['success']:
+            self.parsed_files.append(nc_file)
+            self.ledger[nc_file] = result['fingerprint']
+            self.floats.add(result['float_id'])
+            self.profiles.append(result['profiles'])
+            self.measurements.append(result['measurements'])
+            self.n_profiles += len(result['profiles']['profile_id'])
+            self.n_measurements += len(result['measurements']['profile_id'])
+        else:
+            self.failed_files.append((nc_file, result['error']))
+
+    def profiles_frame(self):
+        return frame_from_columns(self.profiles, PROFILE_SCHEMA)
+
+    def measurements_frame(self):
+        return frame_from_columns(self.measurements, MEASUREMENT_SCHEMA)
+
+    def is_empty(self):
+        return not (self.parsed_files or self.failed_files)
+
+    def is_due(self, batch_profiles, flush_interval):
+        return (self.n_profiles >= batch_profiles
+                or (not self.is_empty() and time.monotonic() - self.started >= flush_interval))
+
+
+def _parse_stage(parse_queue, load_queue, stop, workers, batch_profiles, flush_interval,
+                 parts_dir=None, parsed_files=None):
+    """
+    Parse files in worker processes and emit batches of DataFrames
+
+    With parts_dir, every parsed file's rows are also staged there for the
+    lake, and its path is appended to parsed_files.
+    """
+    manifest = FileManifest()
+    lake_parts = _LakeParts(parts_dir, manifest.root) if parts_dir else None
+    batch = _Batch()
+    pending = {}
+    inputs_done = False
+
+    def flush():
+        nonlocal batch
+        if batch.is_empty():
+            return
+        # parse_output is recorded once the staged rows are in the lake
+        manifest.mark_parsed(batch.parsed_files, batch.failed_files, ledger=batch.ledger)
+        if parsed_files is not None:
+            parsed_files.extend(batch.parsed_files)
+        if batch.parsed_files:
+            _put(load_queue, batch, stop)
+        batch = _Batch()
+
+    # Spawned workers: forking a process that runs event loop/SQLite threads is unsafe
+    context = multiprocessing.get_context('spawn')
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            while not inputs_done or pending:
+                # Keep every worker busy with one file queued behind it
+                while not inputs_done and len(pending) < 2 * workers:
+                    try:
+                        nc_file = _get(parse_queue, stop, timeout=0.05 if pending else flush_interval)
+                    except queue.Empty:
+                        break
+                    if nc_file is _DONE:
+                        inputs_done = True
+                    else:
+                        pending[pool.submit(parse_file, nc_file)] = nc_file
+
+                if pending:
+                    done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        nc_file, result = pending.pop(future), future.result()
+                        batch.add(nc_file, result)
+                        if lake_parts and result['success']:
+                            lake_parts.add(nc_file, result)
+
+                if batch.is_due(batch_profiles, flush_interval):
+                    flush()
+
+            flush()
+    finally:
+        if lake_parts:
+            lake_parts.close()
+        manifest.close()
+        if not stop.is_set():
+            _put(load_queue, _DONE, stop)
+
+
+def load_batch_to_database(batch, engine, loaded_floats):
+    """Default loader: bulk insert one parsed batch with the load_database helpers"""
+    from src.data.load_database import load_floats, load_measurement_batch, load_profiles
+    from src.data.summaries import load_summaries
+
+    new_floats = sorted(batch.floats - loaded_floats)
+    if new_floats:
+        load_floats(pd.DataFrame({'float_id': new_floats}), engine)
+        loaded_floats.update(new_floats)
+    profiles = batch.profiles_frame()
+    load_profiles(profiles, engine)
+    load_summaries(profiles, engine)
+    if batch.n_measurements:
+        load_measurement_batch(batch.measurements_frame(), engine)
+
+
+def _load_stage(load_queue, stop, load_batch, stats):
+    """Load batches as they arrive and mark their files as loaded"""
+    manifest = FileManifest()
+    try:
+        while True:
+            batch = _get(load_queue, stop)
+            if batch is _DONE:
+                return
+            load_batch(batch)
+            manifest.mark_loaded(files=batch.parsed_files)
+
+            stats['files'] += len(batch.parsed_files)
+            stats['profiles'] += batch.n_profiles
+            stats['measurements'] += batch.n_measurements
+            if stats['first_load'] is None:
+                stats['first_load'] = time.monotonic()
+                logger.success(
+                    f"First {batch.n_profiles:,} profiles loaded "
+                    f"{stats['first_load'] - stats['started']:.1f}s after start"
+                )
+    finally:
+        manifest.close()
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+def run_streaming(download, load_batch, seed_files=(), workers=None,
+                  batch_profiles=BATCH_PROFILES, flush_interval=FLUSH_INTERVAL,
+                  parse_queue_size=PARSE_QUEUE_SIZE, load_queue_size=LOAD_QUEUE_SIZE, parts_dir=None):
+    """
+    Run download, parse and load concurrently
+
+    Args:
+        download: Callable taking an ``on_complete(local_path)`` callback and
+                  running the downloads (e.g. a download_netcdf_files partial)
+        load_batch: Callable loading one parsed batch (see load_batch_to_database)
+        seed_files: Already downloaded files to parse before/alongside new downloads
+        workers: Parser processes (default: PARSE_WORKERS)
+        parts_dir: Also stage the parsed rows there as lake part-files
+                   (see merge_into_lake)
+
+    Returns:
+        dict with files/profiles/measurements loaded, the parsed files and timings
+    """
+    stop = threading.Event()
+    parse_queue = queue.Queue(maxsize=parse_queue_size)
+    load_queue = queue.Queue(maxsize=load_queue_size)
+    stats = {'files': 0, 'profiles': 0, 'measurements': 0, 'parsed_files': [],
+             'started': time.monotonic(), 'first_load': None}
+
+    def download_with_seed(on_complete):
+        for path in seed_files:
+            on_complete(path)
+        download(on_complete)
+
+    stages = [
+        _Stage("Download", _download_stage, stop, download_with_seed, parse_queue, stop),
+        _Stage("Parse", _parse_stage, stop, parse_queue, load_queue, stop,
+               get_parse_workers(workers), batch_profiles, flush_interval, parts_dir, stats['parsed_files']),
+        _Stage("Load", _load_stage, stop, load_queue, stop, load_batch, stats),
+    ]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+
+    errors = [stage.error for stage in stages if stage.error is not None]
+    if errors:
+        raise errors[0]
+
+    stats['elapsed'] = time.monotonic() - stats['started']
+    logger.info(
+        f"Streaming pipeline: {stats['files']:,} files, {stats['profiles']:,} profiles, "
+        f"{stats['measurements']:,} measurements in {stats['elapsed']:.1f}s"
+    )
+    return stats
+
+
+def merge_into_lake(parts_dir, lake_dir, parsed_files, removed=()):
+    """
+    Compact streamed part-files into the lake and record where they went
+
+    Only partitions holding staged rows or rows of the parsed/removed files are
+    rewritten, as in an incremental parse_all_netcdf_files run.
+
+    Args:
+        parts_dir: Part-files staged by run_streaming
+        lake_dir: Lake root (of the processed directory the files are recorded under)
+        parsed_files: Local paths whose rows were staged
+        removed: Index paths whose lake rows are dropped (files deleted from the index)
+    """
+    with FileManifest() as manifest:
+        replace = {manifest.key(f) for f in parsed_files} | set(removed)
+        if replace:
+            sources = lake_partition_sources(lake_dir)
+            compact_lake(
+                parts_dir, lake_dir, replace_sources=replace,
+                partitions=[p for p, files in sources.items() if files & replace],
+            )
+            manifest.record_parse_output(parsed_files, Path(lake_dir).parent)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def run_streaming_pipeline(download_limit=None, incremental=False, workers=None):
+    """
+    Steps 2-4 of run_pipeline as one streaming pass
+
+    Full mode streams the filtered index (plus any downloaded-but-unparsed files
+    from earlier runs); incremental mode streams the index change set after
+    removing the profiles it supersedes. The parsed rows are merged into the
+    Parquet lake afterwards, so the standard levels and the climatology follow;
+    without a current lake to merge into, the lake is rebuilt by a batch parse.
+    """
+    from src.data.download_netcdf import (
+        download_index_changes, download_netcdf_files, load_filtered_index
+    )
+    from src.data.index_diff import IndexChangeSet
+    from src.data.load_database import (
+        delete_profiles, get_db_engine, print_database_stats, update_statistics
+    )
+
+    engine = get_db_engine()
+    loaded_floats = set()
+    processed_dir = Path(settings.data_processed_dir)
+    lake_dir = get_lake_dir(processed_dir)
+    parts_dir = processed_dir / "_parts_stream"
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    merge_lake = lake_is_current(lake_dir)
+    removed = ()
+
+    if incremental:
+        changes = IndexChangeSet.load()
+        if changes.is_empty():
+            logger.success("Index unchanged since the previous run - nothing to do")
+            return None
+        delete_profiles(changes.stale_profile_ids, engine)
+        seed_files = []
+        removed = changes.obsolete_files
+
+        def download(on_complete):
+            download_index_changes(changes, limit=download_limit, on_complete=on_complete)
+    else:
+        df = load_filtered_index()
+        with FileManifest() as manifest:
+            seed_files = [manifest.local_path(f) for f in manifest.files(parse_status=PENDING)]
+        if seed_files:
+            logger.info(f"Parsing {len(seed_files):,} previously downloaded files first")
+
+        def download(on_complete):
+            download_netcdf_files(df, limit=download_limit, on_complete=on_complete)
+
+    stats = run_streaming(
+        download,
+        lambda batch: load_batch_to_database(batch, engine, loaded_floats),
+        seed_files=seed_files,
+        workers=workers,
+        parts_dir=parts_dir if merge_lake else None,
+    )
+
+    if merge_lake:
+        logger.info("Merging streamed rows into the Parquet lake...")
+        merge_into_lake(parts_dir, lake_dir, stats['parsed_files'], removed)
+    else:
+        from src.data.parse_netcdf import parse_all_netcdf_files
+        logger.warning("No lake with the current schema to merge into - building it with a batch parse")
+        parse_all_netcdf_files(output_dir=processed_dir)
+        # The streamed files are in the database already
+        with FileManifest() as manifest:
+            manifest.mark_loaded(files=stats['parsed_files'])
+
+    update_statistics(engine)
+    print_database_stats(engine)
+    return stats
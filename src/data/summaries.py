@@ -0,0 +1,279 @@
+"""
+ARGO Profile Summaries
+Per-profile statistics (mixed layer and thermocline depth, surface/mean
+values, ranges, quality score) computed on whole (N_PROF, N_LEVELS) blocks
+at parse time and stored in argo_summaries, so common questions read one
+row per profile instead of scanning argo_measurements.
+
+Also a backfill command for profiles already in the database:
+    python src/data/summaries.py [--rebuild]
+"""
+
+import uuid
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import text
+from loguru import logger
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.logger import setup_logger
+from src.data.columnar import SUMMARY_COLUMNS
+from src.data.derived import derive_properties
+
+GOOD_QC = [1, 2]  # Good and probably good
+SURFACE_PRESSURE = 10.0  # dbar; shallowest good value above this is the surface value
+MLD_REFERENCE_PRESSURE = 10.0  # dbar
+MLD_SIGMA_THRESHOLD = 0.03  # kg/m³ increase over the reference (de Boyer Montégut et al. 2004)
+THERMOCLINE_MAX_PRESSURE = 1000.0  # dbar; the steepest gradient is searched above this
+BACKFILL_BATCH_PROFILES = 2000
+
+
+def _first(values, mask):
+    """Value at the first True position of each row (NaN if none)"""
+    index = np.argmax(mask, axis=1)[:, np.newaxis]
+    return np.where(mask.any(axis=1), np.take_along_axis(values, index, axis=1)[:, 0], np.nan)
+
+
+def _stats(values):
+    """Row count, mean, min and max ignoring NaN, without all-NaN warnings"""
+    ok = ~np.isnan(values)
+    count = ok.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(ok, values, 0).sum(axis=1) / count
+    low = np.where(count > 0, np.where(ok, values, np.inf).min(axis=1), np.nan)
+    high = np.where(count > 0, np.where(ok, values, -np.inf).max(axis=1), np.nan)
+    return count, mean, low, high
+
+
+def summarize_profiles(pressure, temperature, salinity, temperature_qc, salinity_qc,
+                       depth, sigma_theta, valid=None):
+    """
+    Summary statistics of a block of profiles
+
+    Args:
+        pressure, temperature, salinity: (N_PROF, N_LEVELS) best values in any
+            level order (descending profiles are deepest first), NaN-padded
+        temperature_qc, salinity_qc: (N_PROF, N_LEVELS) QC flags
+        depth, sigma_theta: (N_PROF, N_LEVELS) derived properties
+        valid: (N_PROF, N_LEVELS) levels that are measurements (default: pressure present)
+
+    Returns:
+        dict of (N_PROF,) arrays keyed by SUMMARY_COLUMNS. Only good or
+        probably good (QC 1/2) temperatures and salinities are used.
+    """
+    p = np.asarray(pressure, dtype=np.float64)
+    valid = ~np.isnan(p) if valid is None else np.asarray(valid)
+
+    # The surface, mixed layer and thermocline picks scan levels top down
+    order = np.argsort(np.where(valid & ~np.isnan(p), p, np.inf), axis=1, kind='stable')
+    p, valid, temperature, salinity, temperature_qc, salinity_qc, depth, sigma_theta = (
+        np.take_along_axis(np.asarray(values), order, axis=1)
+        for values in (p, valid, temperature, salinity, temperature_qc, salinity_qc, depth, sigma_theta)
+    )
+    good_t = valid & np.isin(temperature_qc, GOOD_QC) & ~np.isnan(temperature)
+    good_s = valid & np.isin(salinity_qc, GOOD_QC) & ~np.isnan(salinity)
+    t = np.where(good_t, temperature, np.nan).astype(np.float64)
+    s = np.where(good_s, salinity, np.nan).astype(np.float64)
+    z = np.where(valid, depth, np.nan).astype(np.float64)
+
+    _, mean_t, min_t, max_t = _stats(t)
+    _, mean_s, min_s, max_s = _stats(s)
+    count = valid.sum(axis=1)
+
+    # Mixed layer: first level whose potential density exceeds the 10 dbar reference by the threshold
+    dense = good_t & good_s & ~np.isnan(sigma_theta)
+    reference = dense & (p >= MLD_REFERENCE_PRESSURE)
+    sigma_ref = _first(sigma_theta, reference)
+    p_ref = _first(p, reference)
+    with np.errstate(invalid='ignore'):
+        exceeds = dense & (p > p_ref[:, np.newaxis]) & (sigma_theta - sigma_ref[:, np.newaxis] >= MLD_SIGMA_THRESHOLD)
+    mixed_layer_depth = _first(z, exceeds)
+
+    # Thermocline: mid-depth of the steepest temperature decrease between adjacent
+    # good levels, below the mixed layer (when known) and above THERMOCLINE_MAX_PRESSURE
+    thermocline_depth = np.full(p.shape[0], np.nan)
+    if p.shape[1] > 1:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dz = np.diff(z, axis=1)
+            gradient = -np.diff(t, axis=1) / dz
+            below_mixed_layer = ~(z[:, :-1] < mixed_layer_depth[:, np.newaxis])
+            searched = ((dz > 0) & below_mixed_layer & np.isfinite(gradient)
+                        & (p[:, :-1] >= MLD_REFERENCE_PRESSURE) & (p[:, 1:] <= THERMOCLINE_MAX_PRESSURE))
+            gradient = np.where(searched, gradient, -np.inf)
+        steepest = np.argmax(gradient, axis=1)[:, np.newaxis]
+        has_gradient = np.isfinite(np.take_along_axis(gradient, steepest, axis=1)[:, 0])
+        mid = (np.take_along_axis(z, steepest, axis=1) + np.take_along_axis(z, steepest + 1, axis=1))[:, 0] / 2
+        thermocline_depth = np.where(has_gradient, mid, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        quality = (good_t & good_s).sum(axis=1) / count
+
+    summary = {
+        'mixed_layer_depth': mixed_layer_depth,
+        'thermocline_depth': thermocline_depth,
+        'max_depth': _stats(z)[3],
+        'surface_temperature': _first(t, good_t & (p <= SURFACE_PRESSURE)),
+        'surface_salinity': _first(s, good_s & (p <= SURFACE_PRESSURE)),
+        'mean_temperature': mean_t,
+        'mean_salinity': mean_s,
+        'temperature_range': max_t - min_t,
+        'salinity_range': max_s - min_s,
+        'profile_quality_score': quality,
+    }
+    summary = {name: values.astype(np.float32) for name, values in summary.items()}
+    summary['measurement_count'] = count.astype(np.int32)
+    return summary
+
+
+def empty_summaries(n_prof):
+    """Summaries of profiles without measurements"""
+    summary = {name: np.full(n_prof, np.nan, dtype=np.float32) for name in SUMMARY_COLUMNS}
+    summary['measurement_count'] = np.zeros(n_prof, dtype=np.int32)
+    return summary
+
+
+def to_blocks(df, profile_ids, columns):
+    """
+    Flat measurement rows -> (N_PROF, N_LEVELS) NaN-padded blocks
+
+    Rows are placed in pressure order within each profile; profiles follow
+    the order of profile_ids.
+    """
+    df = df.sort_values(['profile_id', 'pressure'], kind='stable')
+    row = pd.Index(profile_ids).get_indexer(df['profile_id'])
+    level = df.groupby('profile_id', sort=False).cumcount().to_numpy()
+    shape = (len(profile_ids), int(level.max()) + 1 if len(level) else 0)
+    blocks = {}
+    for name in columns:
+        block = np.full(shape, np.nan)
+        block[row, level] = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        blocks[name] = block
+    valid = np.zeros(shape, dtype=bool)
+    valid[row, level] = True
+    return blocks, valid
+
+
+# ============================================
+# Database
+# ============================================
+
+def load_summaries(summaries_df, engine):
+    """Upsert summary rows (profile_id + SUMMARY_COLUMNS) into argo_summaries"""
+    logger.info(f"Loading {len(summaries_df):,} profile summaries...")
+
+    columns = ", ".join(SUMMARY_COLUMNS)
+    updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in SUMMARY_COLUMNS)
+    # Per-run name so concurrent loads (e.g. streaming and a backfill) never share a staging table;
+    # it is created inside the transaction, so a failed load leaves nothing behind
+    staging = f"staging_summaries_{uuid.uuid4().hex}"
+    with engine.begin() as conn:
+        summaries_df[['profile_id'] + SUMMARY_COLUMNS].to_sql(
+            staging,
+            conn,
+            if_exists='fail',
+            index=False,
+            method='multi',
+            chunksize=1000
+        )
+        conn.execute(text(f"""
+            INSERT INTO argo_summaries (profile_id, {columns})
+            SELECT profile_id, {columns} FROM {staging}
+            ON CONFLICT (profile_id) DO UPDATE SET {updates}, updated_at = NOW()
+        """))
+        conn.execute(text(f"DROP TABLE {staging}"))
+
+    logger.success(f"Loaded {len(summaries_df):,} profile summaries")
+
+
+def _summarize_from_database(profile_ids, engine):
+    """Summaries of profiles already loaded, recomputed from argo_measurements"""
+    with engine.connect() as conn:
+        profiles = pd.read_sql(
+            text("SELECT profile_id, latitude, longitude FROM argo_profiles WHERE profile_id = ANY(:ids)"),
+            conn, params={'ids': list(profile_ids)}
+        )
+        # Rows loaded before the best-value columns existed fall back to the raw values
+        measurements = pd.read_sql(text("""
+            SELECT profile_id,
+                   COALESCE(pressure_best, pressure) AS pressure,
+                   COALESCE(temperature_best, temperature) AS temperature,
+                   COALESCE(salinity_best, salinity) AS salinity,
+                   COALESCE(temperature_best_qc, temperature_qc) AS temperature_qc,
+                   COALESCE(salinity_best_qc, salinity_qc) AS salinity_qc
+            FROM argo_measurements
+            WHERE profile_id = ANY(:ids)
+        """), conn, params={'ids': list(profile_ids)})
+
+    ids = profiles['profile_id'].tolist()
+    blocks, valid = to_blocks(
+        measurements, ids, ['pressure', 'temperature', 'salinity', 'temperature_qc', 'salinity_qc']
+    )
+    derived = derive_properties(
+        blocks['pressure'], blocks['temperature'], blocks['salinity'],
+        profiles['latitude'].astype(float), profiles['longitude'].astype(float)
+    )
+    summary = summarize_profiles(
+        blocks['pressure'], blocks['temperature'], blocks['salinity'],
+        blocks['temperature_qc'], blocks['salinity_qc'],
+        derived['depth'], derived['sigma_theta'], valid
+    )
+    return pd.DataFrame({'profile_id': ids, **summary})
+
+
+def backfill_summaries(engine, rebuild=False, batch_profiles=BACKFILL_BATCH_PROFILES):
+    """
+    Fill argo_summaries for loaded profiles
+
+    Args:
+        engine: Database engine
+        rebuild: Recompute every profile instead of only those without a summary
+        batch_profiles: Profiles summarized per round trip
+
+    Returns:
+        Number of profiles summarized
+    """
+    missing = "" if rebuild else (
+        "AND NOT EXISTS (SELECT 1 FROM argo_summaries s WHERE s.profile_id = p.profile_id)"
+    )
+    total = 0
+    last_id = None
+    while True:
+        with engine.connect() as conn:
+            ids = [row[0] for row in conn.execute(text(f"""
+                SELECT p.profile_id FROM argo_profiles p
+                WHERE (CAST(:last_id AS TEXT) IS NULL OR p.profile_id > :last_id) {missing}
+                ORDER BY p.profile_id
+                LIMIT :limit
+            """), {'last_id': last_id, 'limit': batch_profiles})]
+        if not ids:
+            break
+        load_summaries(_summarize_from_database(ids, engine), engine)
+        total += len(ids)
+        last_id = ids[-1]
+        logger.info(f"Summarized {total:,} profiles")
+
+    logger.success(f"Backfill complete: {total:,} profile summaries written")
+    return total
+
+
+def main():
+    """Main execution"""
+    import argparse
+    from src.database.connection import get_db_engine
+
+    parser = argparse.ArgumentParser(description='Backfill argo_summaries for loaded profiles')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Recompute every profile, not just those without a summary')
+    parser.add_argument('--batch-profiles', type=int, default=BACKFILL_BATCH_PROFILES,
+                        help='Profiles summarized per batch')
+    args = parser.parse_args()
+
+    setup_logger()
+    backfill_summaries(get_db_engine(), rebuild=args.rebuild, batch_profiles=args.batch_profiles)
+
+
+if __name__ == "__main__":
+    main()
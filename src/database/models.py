@@ -60,8 +60,10 @@ class ArgoProfile(Base):
     position_qc = Column(Integer)
     vertical_sampling_scheme = Column(String(20))
     profile_type = Column(String(20))
+    data_mode = Column(String(1))  # R, A or D
     h3_index_res7 = Column(String(20))
     h3_index_res5 = Column(String(20))
+    h3_index_res3 = Column(String(20))
     created_at = Column(TIMESTAMP, default=datetime.now)
     updated_at = Column(TIMESTAMP, default=datetime.now, onupdate=datetime.now)
     
@@ -103,8 +105,22 @@ class ArgoMeasurement(Base):
     temperature_qc = Column(Integer)
     salinity = Column(DECIMAL(7, 4))
     salinity_qc = Column(Integer)
+    pressure_adjusted = Column(DECIMAL(8, 2))
+    pressure_adjusted_qc = Column(Integer)
+    pressure_adjusted_error = Column(DECIMAL(8, 4))
     temperature_adjusted = Column(DECIMAL(6, 3))
+    temperature_adjusted_qc = Column(Integer)
+    temperature_adjusted_error = Column(DECIMAL(8, 4))
     salinity_adjusted = Column(DECIMAL(7, 4))
+    salinity_adjusted_qc = Column(Integer)
+    salinity_adjusted_error = Column(DECIMAL(8, 4))
+    # Best available value: adjusted for A/D-mode profiles, raw for R-mode
+    pressure_best = Column(DECIMAL(8, 2))
+    pressure_best_qc = Column(Integer)
+    temperature_best = Column(DECIMAL(6, 3))
+    temperature_best_qc = Column(Integer)
+    salinity_best = Column(DECIMAL(7, 4))
+    salinity_best_qc = Column(Integer)
     created_at = Column(TIMESTAMP, default=datetime.now)
     
     # Relationships
@@ -132,10 +148,12 @@ class ArgoOceanProperty(Base):
         BigInteger,
         ForeignKey('argo_profiles.profile_id', ondelete='CASCADE')
     )
+    absolute_salinity = Column(DECIMAL(7, 4))
+    conservative_temperature = Column(DECIMAL(6, 3))
     potential_temperature = Column(DECIMAL(6, 3))
     potential_density = Column(DECIMAL(8, 4))
     sigma_theta = Column(DECIMAL(8, 4))
-    buoyancy_frequency = Column(DECIMAL(12, 8))
+    buoyancy_frequency = Column(DECIMAL(12, 8))  # N² (1/s²)
     created_at = Column(TIMESTAMP, default=datetime.now)
     
     # Relationships
@@ -195,6 +213,17 @@ class OceanRegion(Base):
         return f"<OceanRegion(name='{self.region_name}', type='{self.region_type}')>"
 
 
+class OceanRegionCell(Base):
+    """H3 res 3 cells covering each ocean region (for equality-join region filters)"""
+    __tablename__ = 'ocean_region_cells'
+    
+    region_name = Column(String(100), primary_key=True)
+    h3_index_res3 = Column(String(20), primary_key=True)
+    
+    def __repr__(self):
+        return f"<OceanRegionCell(region='{self.region_name}', cell='{self.h3_index_res3}')>"
+
+
 class SchemaVersion(Base):
     """Track database schema versions"""
     __tablename__ = 'schema_version'
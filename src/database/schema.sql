@@ -52,8 +52,10 @@ CREATE TABLE IF NOT EXISTS argo_profiles (
     position_qc INTEGER,
     vertical_sampling_scheme VARCHAR(20),
     profile_type VARCHAR(20),
+    data_mode CHAR(1),
     h3_index_res7 VARCHAR(20),
     h3_index_res5 VARCHAR(20),
+    h3_index_res3 VARCHAR(20),
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW(),
     UNIQUE (float_id, cycle_number)
@@ -65,6 +67,7 @@ CREATE INDEX IF NOT EXISTS idx_profiles_datetime ON argo_profiles(profile_dateti
 CREATE INDEX IF NOT EXISTS idx_profiles_location ON argo_profiles USING GIST(location);
 CREATE INDEX IF NOT EXISTS idx_profiles_h3_res7 ON argo_profiles(h3_index_res7);
 CREATE INDEX IF NOT EXISTS idx_profiles_h3_res5 ON argo_profiles(h3_index_res5);
+CREATE INDEX IF NOT EXISTS idx_profiles_h3_res3 ON argo_profiles(h3_index_res3);
 CREATE INDEX IF NOT EXISTS idx_profiles_float_cycle ON argo_profiles(float_id, cycle_number);
 CREATE INDEX IF NOT EXISTS idx_profiles_lat_lon ON argo_profiles(latitude, longitude);
 
@@ -81,8 +84,22 @@ CREATE TABLE IF NOT EXISTS argo_measurements (
     temperature_qc INTEGER,
     salinity DECIMAL(7,4),
     salinity_qc INTEGER,
+    pressure_adjusted DECIMAL(8,2),
+    pressure_adjusted_qc INTEGER,
+    pressure_adjusted_error DECIMAL(8,4),
     temperature_adjusted DECIMAL(6,3),
+    temperature_adjusted_qc INTEGER,
+    temperature_adjusted_error DECIMAL(8,4),
     salinity_adjusted DECIMAL(7,4),
+    salinity_adjusted_qc INTEGER,
+    salinity_adjusted_error DECIMAL(8,4),
+    -- Best available value: adjusted for A/D-mode profiles, raw for R-mode
+    pressure_best DECIMAL(8,2),
+    pressure_best_qc INTEGER,
+    temperature_best DECIMAL(6,3),
+    temperature_best_qc INTEGER,
+    salinity_best DECIMAL(7,4),
+    salinity_best_qc INTEGER,
     created_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -101,16 +118,19 @@ CREATE TABLE IF NOT EXISTS argo_ocean_properties (
     property_id BIGSERIAL PRIMARY KEY,
     measurement_id BIGINT REFERENCES argo_measurements(measurement_id) ON DELETE CASCADE,
     profile_id BIGINT REFERENCES argo_profiles(profile_id) ON DELETE CASCADE,
+    absolute_salinity DECIMAL(7,4),
+    conservative_temperature DECIMAL(6,3),
     potential_temperature DECIMAL(6,3),
     potential_density DECIMAL(8,4),
     sigma_theta DECIMAL(8,4),
-    buoyancy_frequency DECIMAL(12,8),
+    buoyancy_frequency DECIMAL(12,8),  -- N² (1/s²)
     created_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Indexes for argo_ocean_properties
 CREATE INDEX IF NOT EXISTS idx_properties_measurement_id ON argo_ocean_properties(measurement_id);
 CREATE INDEX IF NOT EXISTS idx_properties_profile_id ON argo_ocean_properties(profile_id);
+CREATE INDEX IF NOT EXISTS idx_properties_sigma_theta ON argo_ocean_properties(sigma_theta) WHERE sigma_theta IS NOT NULL;
 
 -- ============================================
 -- ARGO Profile Summaries Table
@@ -186,6 +206,20 @@ INSERT INTO ocean_regions (region_name, region_type, boundary, description) VALU
 )
 ON CONFLICT (region_name) DO NOTHING;
 
+-- ============================================
+-- Ocean Region Cells Table
+-- H3 res 3 cells whose centres lie in each region, so region filters are
+-- equality joins on argo_profiles.h3_index_res3 (filled by src/data/spatial.py)
+-- ============================================
+CREATE TABLE IF NOT EXISTS ocean_region_cells (
+    region_name VARCHAR(100) NOT NULL,
+    h3_index_res3 VARCHAR(20) NOT NULL,
+    PRIMARY KEY (region_name, h3_index_res3)
+);
+
+-- Indexes for ocean_region_cells
+CREATE INDEX IF NOT EXISTS idx_region_cells_h3_res3 ON ocean_region_cells(h3_index_res3);
+
 -- ============================================
 -- Materialized Views for Performance
 -- ============================================
@@ -217,7 +251,8 @@ SELECT
     MIN(p.profile_datetime) as earliest_date,
     MAX(p.profile_datetime) as latest_date
 FROM ocean_regions r
-LEFT JOIN argo_profiles p ON ST_Contains(r.boundary, p.location)
+LEFT JOIN ocean_region_cells c ON c.region_name = r.region_name
+LEFT JOIN argo_profiles p ON p.h3_index_res3 = c.h3_index_res3
 LEFT JOIN argo_summaries s ON p.profile_id = s.profile_id
 GROUP BY r.region_name;
 
@@ -79,6 +79,43 @@ class Settings(BaseSettings):
         default="https://data-argo.ifremer.fr/ar_index_global_prof.txt",
         env="ARGO_INDEX_URL"
     )
+    argo_gdac_url: str = Field(default="https://data-argo.ifremer.fr", env="ARGO_GDAC_URL")
+    
+    # ============================================
+    # NetCDF Download Settings
+    # ============================================
+    download_engine: str = Field(default="async", env="DOWNLOAD_ENGINE")  # async | threads
+    download_concurrency: int = Field(default=32, env="DOWNLOAD_CONCURRENCY")  # Initial window
+    download_adaptive: bool = Field(default=True, env="DOWNLOAD_ADAPTIVE")  # AIMD window control
+    download_min_concurrency: int = Field(default=2, env="DOWNLOAD_MIN_CONCURRENCY")
+    download_max_concurrency: int = Field(default=128, env="DOWNLOAD_MAX_CONCURRENCY")
+    download_aggregate: bool = Field(default=False, env="DOWNLOAD_AGGREGATE")  # Per-float <wmo>_prof.nc files
+    download_aggregate_min_coverage: float = Field(default=0.8, env="DOWNLOAD_AGGREGATE_MIN_COVERAGE")
+    download_priority: str = Field(default="newest", env="DOWNLOAD_PRIORITY")  # newest, regions, delayed
+    download_priority_regions: str = Field(default="", env="DOWNLOAD_PRIORITY_REGIONS")
+    download_bandwidth_limit: float = Field(default=0.0, env="DOWNLOAD_BANDWIDTH_LIMIT")  # MB/s, 0 = unlimited
+    download_queue_size: int = Field(default=1000, env="DOWNLOAD_QUEUE_SIZE")
+    
+    # ============================================
+    # NetCDF Parse Settings
+    # ============================================
+    parse_workers: int = Field(default=0, env="PARSE_WORKERS")  # Processes, 0 = one per core minus one
+    parse_chunk_size: int = Field(default=100, env="PARSE_CHUNK_SIZE")  # Files per worker task / part-file
+    netcdf_engine: str = Field(default="auto", env="NETCDF_ENGINE")  # auto, netcdf4, h5netcdf or scipy
+    standard_pressure_levels: str = Field(default="", env="STANDARD_PRESSURE_LEVELS")  # dbar, comma-separated; empty = default set
+    
+    # ============================================
+    # ARGO Index Filtering
+    # Comma-separated lists; empty means no restriction
+    # ============================================
+    index_date_start: str = Field(default="2018-01-01", env="INDEX_DATE_START")
+    index_date_end: str = Field(default="2024-12-31", env="INDEX_DATE_END")
+    index_bbox: str = Field(default="", env="INDEX_BBOX")  # lat_min,lat_max,lon_min,lon_max
+    index_regions: str = Field(default="", env="INDEX_REGIONS")  # Names from OCEAN_REGIONS
+    index_polygons: str = Field(default="", env="INDEX_POLYGONS")  # WKT (lon lat) or GeoJSON file path
+    index_institutions: str = Field(default="", env="INDEX_INSTITUTIONS")
+    index_profiler_types: str = Field(default="", env="INDEX_PROFILER_TYPES")
+    index_float_ids: str = Field(default="", env="INDEX_FLOAT_IDS")
     
     # ============================================
     # API Configuration
@@ -0,0 +1,111 @@
+"""
+Shared fixtures: a local HTTP server with ETag, conditional and Range support
+"""
+
+import hashlib
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+_RANGE = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class FileServer(ThreadingHTTPServer):
+    """
+    Serves ``files`` ({'/path': bytes}) like a static mirror
+
+    Knobs:
+        ignore_range: answer Range requests with the whole file (200)
+        truncate: {'/path': n} sends only n body bytes of the next response
+            for that path, then drops the connection
+        requests: (method, path, headers dict, status) of every request served
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.files = {}
+        self.ignore_range = False
+        self.truncate = {}
+        self.requests = []
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+    def etag(self, path):
+        return '"' + hashlib.md5(self.files[path]).hexdigest() + '"'
+
+    def statuses(self, path):
+        return [status for _, p, _, status in self.requests if p == path]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, headers=(), body=b''):
+        """Send a response; HEAD gets the headers of the matching GET"""
+        self.server.requests.append((self.command, self.path, dict(self.headers), status))
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if self.command == 'HEAD':
+            return
+
+        truncate = self.server.truncate.pop(self.path, None)
+        if truncate is not None:
+            self.wfile.write(body[:truncate])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        data = self.server.files.get(self.path)
+        if data is None:
+            return self._reply(404)
+
+        etag = self.server.etag(self.path)
+        validators = [('ETag', etag), ('Accept-Ranges', 'bytes')]
+        if self.headers.get('If-None-Match') == etag:
+            return self._reply(304, validators)
+        if self.headers.get('If-Match') not in (None, etag):
+            return self._reply(412, validators)
+
+        match = _RANGE.fullmatch(self.headers.get('Range') or '')
+        if not match or self.server.ignore_range:
+            return self._reply(200, validators, data)
+
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else len(data) - 1, len(data) - 1)
+        if start >= len(data):
+            return self._reply(416, validators + [('Content-Range', f'bytes */{len(data)}')])
+        return self._reply(
+            206, validators + [('Content-Range', f'bytes {start}-{end}/{len(data)}')], data[start:end + 1]
+        )
+
+
+@pytest.fixture
+def file_server():
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
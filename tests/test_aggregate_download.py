@@ -0,0 +1,41 @@
+"""
+Tests for per-float aggregate planning (src/data/aggregate_download.py)
+"""
+
+import pandas as pd
+
+from src.data.aggregate_download import covered_by_aggregates, route_changes_to_aggregates
+
+AGGREGATE = 'aoml/2901234/2901234_prof.nc'
+
+
+def test_single_files_of_mirrored_aggregates_are_covered():
+    files = pd.Series([
+        'aoml/2901234/profiles/R2901234_001.nc',
+        'aoml/2901234/profiles/D2901234_002.nc',
+        AGGREGATE,
+        'aoml/1900000/profiles/R1900000_001.nc',
+    ])
+
+    covered = covered_by_aggregates(files, {AGGREGATE, 'aoml/1900000/profiles/R1900000_001.nc'})
+
+    assert covered.tolist() == [True, True, False, False]
+
+
+def test_changes_of_aggregate_floats_refetch_the_aggregate():
+    changes = pd.DataFrame({
+        'change': ['modify', 'delete', 'add'],
+        'file': [
+            'aoml/2901234/profiles/D2901234_001.nc',
+            'aoml/2901234/profiles/R2901234_002.nc',
+            'aoml/1900000/profiles/R1900000_001.nc',
+        ],
+        'date_update': pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-01']),
+    })
+
+    aggregates, singles = route_changes_to_aggregates(changes, {AGGREGATE})
+
+    # Deletions re-fetch the aggregate too, so its re-parse drops the profile
+    assert aggregates['file'].tolist() == [AGGREGATE]
+    assert aggregates['date_update'].tolist() == [pd.Timestamp('2024-01-03')]
+    assert singles['file'].tolist() == ['aoml/1900000/profiles/R1900000_001.nc']
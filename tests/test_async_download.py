@@ -0,0 +1,147 @@
+"""
+Tests for the async NetCDF downloader (src/data/async_download.py)
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from src.data import async_download
+from src.data.async_download import download_files_async
+from src.data.download_integrity import partial_path
+
+
+def netcdf_bytes(size, seed=0):
+    """Bytes that pass the NetCDF signature check"""
+    return b'CDF\x01' + bytes((seed + i * 7) % 251 for i in range(size - 4))
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(async_download, 'MAX_BACKOFF', 0)
+
+
+def download(server, paths, tmp_path, **kwargs):
+    finished = {}
+    pairs = [(server.url(path), tmp_path / path.lstrip('/')) for path in paths]
+    successful, failed = download_files_async(
+        pairs, concurrency=4, on_success=lambda path, info: finished.update({str(path): info}), **kwargs
+    )
+    return successful, failed, finished
+
+
+def test_downloads_files_with_verified_info(file_server, tmp_path):
+    paths = [f'/aoml/1900000/profiles/R1900000_{i:03d}.nc' for i in range(5)]
+    for i, path in enumerate(paths):
+        file_server.files[path] = netcdf_bytes(20_000 + i, seed=i)
+
+    successful, failed, finished = download(file_server, paths, tmp_path)
+
+    assert (successful, failed) == (5, [])
+    for path in paths:
+        local = tmp_path / path.lstrip('/')
+        assert local.read_bytes() == file_server.files[path]
+        assert not partial_path(local).exists()
+        assert finished[str(local)]['size'] == len(file_server.files[path])
+        assert finished[str(local)]['etag'] == file_server.etag(path)
+
+
+def test_truncated_body_resumes_part_file(file_server, tmp_path):
+    path = '/aoml/1900000/profiles/R1900000_001.nc'
+    data = netcdf_bytes(200_000)
+    file_server.files[path] = data
+    file_server.truncate[path] = 70_000
+
+    successful, failed, _ = download(file_server, [path], tmp_path, retry_attempts=2)
+
+    assert (successful, failed) == (1, [])
+    assert (tmp_path / path.lstrip('/')).read_bytes() == data
+    # Second attempt continued from the bytes the first one flushed to the .part file
+    ranges = [headers.get('Range') for _, p, headers, _ in file_server.requests if p == path]
+    assert ranges[0] is None
+    resumed_from = int(ranges[1].removeprefix('bytes=').rstrip('-'))
+    assert 0 < resumed_from <= 70_000
+    assert file_server.statuses(path) == [200, 206]
+
+
+def test_existing_part_file_is_resumed(file_server, tmp_path):
+    path = '/aoml/1900000/profiles/R1900000_002.nc'
+    data = netcdf_bytes(50_000)
+    file_server.files[path] = data
+    local = tmp_path / path.lstrip('/')
+    local.parent.mkdir(parents=True)
+    partial_path(local).write_bytes(data[:12_345])
+
+    successful, _, _ = download(file_server, [path], tmp_path)
+
+    assert successful == 1
+    assert local.read_bytes() == data
+    assert file_server.requests[0][2]['Range'] == 'bytes=12345-'
+
+
+def test_range_answered_with_200_restarts_from_zero(file_server, tmp_path):
+    path = '/aoml/1900000/profiles/R1900000_003.nc'
+    data = netcdf_bytes(50_000)
+    file_server.files[path] = data
+    file_server.ignore_range = True
+    local = tmp_path / path.lstrip('/')
+    local.parent.mkdir(parents=True)
+    # Stale partial that must not be prepended to the full body
+    partial_path(local).write_bytes(b'stale bytes from an older version')
+
+    successful, _, finished = download(file_server, [path], tmp_path)
+
+    assert successful == 1
+    assert local.read_bytes() == data
+    assert finished[str(local)]['size'] == len(data)
+    assert file_server.statuses(path) == [200]
+
+
+def test_overwrite_discards_stale_part_file(file_server, tmp_path):
+    path = '/aoml/1900000/profiles/R1900000_004.nc'
+    data = netcdf_bytes(30_000)
+    file_server.files[path] = data
+    local = tmp_path / path.lstrip('/')
+    local.parent.mkdir(parents=True)
+    partial_path(local).write_bytes(netcdf_bytes(10_000, seed=3))
+
+    successful, _, _ = download(file_server, [path], tmp_path, overwrite=True)
+
+    assert successful == 1
+    assert local.read_bytes() == data
+    assert 'Range' not in file_server.requests[0][2]
+
+
+def test_blocking_callback_does_not_stall_other_transfers(file_server, tmp_path):
+    paths = [f'/aoml/1900000/profiles/R1900000_{i:03d}.nc' for i in range(4)]
+    for i, path in enumerate(paths):
+        file_server.files[path] = netcdf_bytes(30_000 + i, seed=i)
+    locals_ = [tmp_path / path.lstrip('/') for path in paths]
+    seen = {}
+
+    def on_success(path, info):
+        seen.setdefault('threads', set()).add(threading.current_thread().name)
+        if 'others_finished' not in seen:
+            # Like a full parse queue: the transfers already in flight must still finish
+            deadline = time.monotonic() + 5
+            while not all(p.exists() for p in locals_) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            seen['others_finished'] = all(p.exists() for p in locals_)
+
+    pairs = [(file_server.url(path), local) for path, local in zip(paths, locals_)]
+    successful, failed = download_files_async(pairs, concurrency=4, on_success=on_success)
+
+    assert (successful, failed) == (4, [])
+    assert seen['others_finished']
+    assert all(name.startswith('on-success') for name in seen['threads'])
+
+
+def test_missing_file_is_reported_failed(file_server, tmp_path):
+    successful, failed, finished = download(file_server, ['/aoml/missing.nc'], tmp_path, retry_attempts=0)
+
+    assert successful == 0
+    assert len(failed) == 1 and '404' in failed[0][1]
+    assert finished == {}
+    assert not os.path.exists(tmp_path / 'aoml' / 'missing.nc')
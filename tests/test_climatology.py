@@ -0,0 +1,122 @@
+"""
+Tests for the climatology cube (src/data/climatology.py)
+"""
+
+import numpy as np
+import netCDF4
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.data.climatology import CUBE_FILE, ClimatologyCube, update_climatology
+from src.data.standard_levels import LEVEL_SCHEMA, STANDARD_LEVELS
+
+INDIAN = (-10.3, 70.6)  # Inside the Indian Ocean region
+
+
+def write_partition(lake_dir, partition, rows):
+    """Write levels rows [(profile_id, date, (lat, lon), surface temperature)] as one lake partition"""
+    directory = lake_dir / 'levels' / partition
+    directory.mkdir(parents=True, exist_ok=True)
+    for f in directory.glob("*.parquet"):
+        f.unlink()
+    temperature = np.full((len(rows), len(STANDARD_LEVELS)), np.nan, dtype=np.float32)
+    temperature[:, 0] = [r[3] for r in rows]
+    temperature[:, 1] = [r[3] - 1 for r in rows]
+    salinity = np.full_like(temperature, np.nan)
+    salinity[:, 0] = 35.0
+    table = pa.table({
+        'profile_id': [r[0] for r in rows],
+        'latitude': [r[2][0] for r in rows],
+        'longitude': [r[2][1] for r in rows],
+        'date': pd.to_datetime([r[1] for r in rows]).to_numpy(),
+        **{name: pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), len(STANDARD_LEVELS))
+           for name, values in (('temperature', temperature), ('salinity', salinity))},
+    })
+    pq.write_table(table.cast(LEVEL_SCHEMA), directory / 'part-0.parquet')
+
+
+def remove_partition(lake_dir, partition):
+    for f in (lake_dir / 'levels' / partition).glob("*.parquet"):
+        f.unlink()
+
+
+def cube_arrays(climatology_dir):
+    with netCDF4.Dataset(climatology_dir / CUBE_FILE) as nc:
+        nc.set_auto_mask(False)
+        return {name: nc[name][:] for name in nc.variables if name != 'region'}
+
+
+JANUARY = 'year=2023/month=1/basin=indian'
+FEBRUARY = 'year=2023/month=2/basin=indian'
+MARCH = 'year=2023/month=3/basin=pacific'
+
+
+def test_incremental_update_matches_rebuild(tmp_path):
+    lake_dir = tmp_path / 'lake'
+    write_partition(lake_dir, JANUARY, [('1_001', '2023-01-05', INDIAN, 28.0), ('1_002', '2023-01-06', INDIAN, 27.0),
+                                        ('1_003', '2023-01-07', (-20.5, 80.5), 25.0)])
+    write_partition(lake_dir, FEBRUARY, [('2_001', '2023-02-01', INDIAN, 29.0), ('2_002', '2023-02-02', INDIAN, 29.5)])
+    write_partition(lake_dir, MARCH, [('3_001', '2023-03-01', (0.5, -150.5), 26.0)])
+    incremental = tmp_path / 'incremental'
+    assert update_climatology(lake_dir, incremental) == {'added': 6, 'replaced': 0, 'removed': 0}
+
+    # January: 1_002 re-parsed with new values, 1_003 removed, 1_004 added;
+    # February: 2_001 moved to another cell, 2_002 removed; March untouched
+    write_partition(lake_dir, JANUARY, [('1_001', '2023-01-05', INDIAN, 28.0), ('1_002', '2023-01-06', INDIAN, 26.5),
+                                        ('1_004', '2023-01-08', INDIAN, 27.5), ('1_005', '2023-01-09', INDIAN, 27.7)])
+    write_partition(lake_dir, FEBRUARY, [('2_001', '2023-02-01', (-30.5, 90.5), 22.0)])
+    assert update_climatology(lake_dir, incremental) == {'added': 2, 'replaced': 2, 'removed': 2}
+
+    # A third update with nothing rewritten reads nothing
+    assert update_climatology(lake_dir, incremental) == {'added': 0, 'replaced': 0, 'removed': 0}
+
+    rebuilt = tmp_path / 'rebuilt'
+    update_climatology(lake_dir, rebuilt, rebuild=True)
+    expected = cube_arrays(rebuilt)
+    for name, values in cube_arrays(incremental).items():
+        np.testing.assert_allclose(values, expected[name], rtol=0, atol=1e-9, err_msg=name)
+
+    # Dropping a whole partition subtracts its profiles
+    remove_partition(lake_dir, MARCH)
+    assert update_climatology(lake_dir, incremental)['removed'] == 1
+    with ClimatologyCube(incremental / CUBE_FILE) as cube:
+        assert cube.region_stats('Pacific Ocean', 'temperature')['count'].sum() == 0
+
+
+def test_region_stats_round_trip_the_moments(tmp_path):
+    lake_dir = tmp_path / 'lake'
+    values = [28.0, 27.0, 26.5, 25.0]
+    write_partition(lake_dir, JANUARY, [(f'1_{i:03d}', '2023-01-05', INDIAN, v) for i, v in enumerate(values)])
+    update_climatology(lake_dir, tmp_path / 'climatology')
+
+    with ClimatologyCube(tmp_path / 'climatology' / CUBE_FILE) as cube:
+        stats = cube.region_stats('Indian Ocean', 'temperature')
+        january = cube.region_stats('Indian Ocean', 'temperature', months=[1], pressure=STANDARD_LEVELS[1])
+        assert cube.region_stats('Indian Ocean', 'temperature', months=[7])['count'].sum() == 0
+
+    surface = stats.iloc[0]
+    assert surface['count'] == 4
+    assert surface['mean'] == pytest.approx(np.mean(values))
+    assert surface['std'] == pytest.approx(np.std(values, ddof=1))
+    assert january['pressure'].tolist() == [STANDARD_LEVELS[1]]
+    assert january['mean'].iloc[0] == pytest.approx(np.mean(values) - 1)
+    assert stats['count'].iloc[2:].sum() == 0 and stats['std'].iloc[2:].isna().all()
+
+
+def test_box_stats_across_the_antimeridian(tmp_path):
+    lake_dir = tmp_path / 'lake'
+    write_partition(lake_dir, MARCH, [('3_001', '2023-03-01', (0.5, 179.5), 26.0),
+                                      ('3_002', '2023-03-02', (0.5, -179.5), 28.0),
+                                      ('3_003', '2023-03-03', (0.5, 0.5), 15.0)])
+    update_climatology(lake_dir, tmp_path / 'climatology')
+
+    with ClimatologyCube(tmp_path / 'climatology' / CUBE_FILE) as cube:
+        crossing = cube.box_stats(0, 1, 179, -179, pressure=STANDARD_LEVELS[0]).iloc[0]
+        east = cube.box_stats(0, 1, 179, 180, pressure=STANDARD_LEVELS[0]).iloc[0]
+        around_greenwich = cube.box_stats(0, 1, -1, 1, pressure=STANDARD_LEVELS[0]).iloc[0]
+
+    assert crossing['count'] == 2 and crossing['mean'] == pytest.approx(27.0)
+    assert east['count'] == 1 and east['mean'] == pytest.approx(26.0)
+    assert around_greenwich['count'] == 1 and around_greenwich['mean'] == pytest.approx(15.0)
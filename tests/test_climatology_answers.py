@@ -0,0 +1,77 @@
+"""
+Tests for routing regional averages to the climatology cube (src/ai/climatology_answers.py)
+"""
+
+import pandas as pd
+import pytest
+
+from src.ai import climatology_answers
+from src.ai.climatology_answers import answer_from_climatology, parse_climatology_question
+
+
+class FakeCube:
+    """Stands in for ClimatologyCube; records the region_stats calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def region_stats(self, region, parameter, months=None, pressure=None):
+        self.calls.append((region, parameter, months))
+        return pd.DataFrame({'pressure': [0.0, 10.0, 500.0, 1000.0], 'count': [0, 40, 12, 3],
+                             'mean': [float('nan'), 28.1, 9.5, 5.2], 'std': [float('nan'), 0.8, 0.4, 0.2]})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def cube(monkeypatch):
+    cube = FakeCube()
+    monkeypatch.setattr(climatology_answers, 'open_climatology', lambda: cube)
+    return cube
+
+
+@pytest.mark.parametrize('question, region, parameter, months', [
+    ("What is the average temperature in the Pacific Ocean?", 'Pacific Ocean', 'temperature', None),
+    ("Mean salinity of the Indian Ocean in summer", 'Indian Ocean', 'salinity', [6, 7, 8]),
+    ("avg temperature in the Atlantic during May and June", 'Atlantic Ocean', 'temperature', [5, 6]),
+])
+def test_cube_questions(cube, question, region, parameter, months):
+    result = answer_from_climatology(question)
+    assert result['sql'] is None
+    assert cube.calls == [(region, parameter, months)]
+    # Shallowest level with data
+    assert result['data'][0]['pressure'] == 10.0 and result['data'][0]['mean'] == pytest.approx(28.1)
+
+
+def test_depth_picks_the_nearest_level_with_data(cube):
+    result = answer_from_climatology("average temperature in the Southern Ocean at 2000 m")
+    assert result['data'][0]['pressure'] == 1000.0
+    assert result['data'][0]['requested_pressure'] == 2000.0
+    assert "nearest standard level" in result['response']
+
+
+@pytest.mark.parametrize('question', [
+    "average temperature of float 2901234 in the Pacific",
+    "average temperature in the Pacific over the last 6 months",
+    "recent average salinity in the Atlantic",
+    "average temperature in the Pacific in 2023",
+    "average temperature in the Pacific between 10N and 20N",
+    "average temperature in the Pacific at lat -10 lon 150",
+    "What may the average temperature in the Indian Ocean be?",
+    "compare average temperature in the Pacific and Atlantic",
+    "average temperature and salinity in the Arctic",
+    "maximum temperature in the Pacific",
+])
+def test_other_questions_fall_through_to_sql(cube, question):
+    assert parse_climatology_question(question) is None
+    assert answer_from_climatology(question) is None
+    assert cube.calls == []
+
+
+def test_missing_cube_falls_through(monkeypatch):
+    monkeypatch.setattr(climatology_answers, 'open_climatology', lambda: None)
+    assert answer_from_climatology("average temperature in the Pacific") is None
@@ -0,0 +1,114 @@
+"""
+Tests for the AIMD download concurrency controller (src/data/concurrency.py)
+"""
+
+import asyncio
+import time
+import types
+
+import pytest
+
+from src.data import concurrency
+from src.data.concurrency import ERROR, OK, THROTTLED, AIMDController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # Only the controller's clock: asyncio keeps the real one
+    monkeypatch.setattr(concurrency, 'time', types.SimpleNamespace(monotonic=fake, sleep=time.sleep))
+    return fake
+
+
+def run(controller, *releases):
+    """Acquire and release one slot per (nbytes, outcome[, retry_after])"""
+    async def main():
+        for release in releases:
+            await controller.acquire()
+            await controller.release(*release)
+    asyncio.run(main())
+
+
+def test_window_grows_while_throughput_holds(clock):
+    controller = AIMDController(initial=4, interval=2.0, tolerance=0.05)
+
+    clock.now += 2
+    run(controller, (1000, OK))        # First interval: 500 B/s
+    assert controller.window == 5
+    clock.now += 2
+    run(controller, (960, OK))         # 96% of the last interval
+    assert controller.window == 6
+    clock.now += 2
+    run(controller, (800, OK))         # 83%: hold
+    assert controller.window == 6
+
+
+def test_errors_alone_do_not_grow_the_window(clock):
+    controller = AIMDController(initial=4, interval=2.0)
+
+    clock.now += 2
+    run(controller, (0, ERROR))
+
+    assert controller.window == 4
+    assert controller.error_rate == 1.0
+
+
+def test_throttling_halves_at_most_once_per_interval(clock):
+    controller = AIMDController(initial=16, interval=2.0)
+
+    run(controller, (0, THROTTLED), (0, THROTTLED), (0, THROTTLED))
+    assert controller.window == 8
+    clock.now += 1
+    run(controller, (0, THROTTLED))
+    assert controller.window == 8
+    clock.now += 1.5
+    run(controller, (0, THROTTLED))
+    assert controller.window == 4
+    assert controller.total_throttled == 5
+
+
+def test_window_is_clamped(clock):
+    controller = AIMDController(initial=3, minimum=2, maximum=4, interval=1.0)
+
+    for _ in range(5):
+        clock.now += 1
+        run(controller, (100, OK))
+    assert controller.window == 4
+
+    for _ in range(5):
+        clock.now += 1
+        run(controller, (0, THROTTLED))
+    assert controller.window == 2
+
+    assert AIMDController(initial=100, maximum=8).window == 8
+    assert AIMDController(initial=0, minimum=0).window == 1
+
+
+def test_retry_after_pauses_new_requests(clock):
+    controller = AIMDController(initial=4, interval=2.0)
+
+    async def main():
+        await controller.acquire()
+        await controller.acquire()
+        await controller.release(0, THROTTLED, retry_after=30)
+
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not waiting.done()
+
+        # Once the pause is over, the next release wakes the waiter
+        clock.now += 31
+        await controller.release(100, OK)
+        await asyncio.wait_for(waiting, timeout=1)
+        return blocked
+
+    assert asyncio.run(main())
+    assert controller.in_flight == 1
@@ -0,0 +1,110 @@
+"""
+Tests for the incremental ARGO index sync (src/data/download_index.py)
+"""
+
+import json
+
+import pytest
+
+from src.utils.config import settings
+from src.data.download_index import get_index_path, sync_index_file
+
+INDEX_PATH = '/ar_index_global_prof.txt'
+
+
+def make_index(n_rows, updated='20240101120000', data_mode='R', rewritten=()):
+    """Small ar_index_global_prof.txt: header block plus n_rows sorted rows"""
+    lines = [
+        '# Title : Profile directory file of the Argo Global Data Assembly Center',
+        '# Description : The directory file describes all individual profile files of the argo GDAC ftp site.',
+        '# Project : ARGO',
+        '# Format version : 2.0',
+        f'# Date of update : {updated}',
+        '# FTP root number 1 : ftp://ftp.ifremer.fr/ifremer/argo/dac',
+        'file,date,latitude,longitude,ocean,profiler_type,institution,date_update',
+    ]
+    for i in range(n_rows):
+        mode, row_updated = ('D', updated) if i in rewritten else (data_mode, '20200102000000')
+        lines.append(
+            f'aoml/{1900000 + i // 100}/profiles/{mode}{1900000 + i // 100}_{i % 100:03d}.nc,'
+            f'20200101000000,{-30 + i % 60:.3f},{60 + i % 40:.3f},I,846,AO,{row_updated}'
+        )
+    return ('\n'.join(lines) + '\n').encode()
+
+
+@pytest.fixture
+def index_server(file_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'data_raw_dir', str(tmp_path))
+    file_server.files[INDEX_PATH] = make_index(3000)
+    return file_server
+
+
+def sync(server):
+    index_file = sync_index_file(server.url(INDEX_PATH))
+    assert index_file == get_index_path()
+    return index_file
+
+
+def test_first_sync_downloads_full_index(index_server):
+    index_file = sync(index_server)
+
+    assert index_file.read_bytes() == index_server.files[INDEX_PATH]
+    state = json.loads(index_file.with_suffix('.sync.json').read_text())
+    assert state['length'] == len(index_server.files[INDEX_PATH])
+    assert state['etag'] == index_server.etag(INDEX_PATH)
+
+
+def test_unchanged_index_is_not_modified(index_server):
+    sync(index_server)
+    sync(index_server)
+
+    assert index_server.statuses(INDEX_PATH) == [200, 304]
+
+
+def test_regenerated_index_is_fetched_with_one_request(index_server):
+    sync(index_server)
+    old_etag = index_server.etag(INDEX_PATH)
+    # Nightly regeneration: new header date and appended rows
+    new = make_index(3500, updated='20240102120000')
+    index_server.files[INDEX_PATH] = new
+    index_server.requests.clear()
+
+    index_file = sync(index_server)
+
+    assert index_file.read_bytes() == new
+    # One conditional GET answered with the whole file, never a Range request
+    assert index_server.statuses(INDEX_PATH) == [200]
+    request = index_server.requests[0][2]
+    assert 'Range' not in request
+    assert request['If-None-Match'] == old_etag
+    assert not index_file.with_suffix('.txt.part').exists()
+    state = json.loads(index_file.with_suffix('.sync.json').read_text())
+    assert state['length'] == len(new)
+    assert state['etag'] == index_server.etag(INDEX_PATH)
+
+
+def test_in_place_rewrite_same_length_downloads_full_index(index_server):
+    sync(index_server)
+    # Delayed-mode replacement of a few rows deep in the file: same row length
+    rewritten = make_index(3000, updated='20240102120000', rewritten={1500})
+    assert len(rewritten) == len(index_server.files[INDEX_PATH])
+    index_server.files[INDEX_PATH] = rewritten
+    index_server.requests.clear()
+
+    index_file = sync(index_server)
+
+    assert index_file.read_bytes() == rewritten
+    assert index_server.statuses(INDEX_PATH)[-1] == 200
+
+
+def test_rewrite_with_growth_downloads_full_index(index_server):
+    sync(index_server)
+    # Rows appended, but the header date and a middle row changed too
+    rewritten = make_index(3500, updated='20240102120000', rewritten={1500})
+    index_server.files[INDEX_PATH] = rewritten
+    index_server.requests.clear()
+
+    index_file = sync(index_server)
+
+    assert index_file.read_bytes() == rewritten
+    assert index_server.statuses(INDEX_PATH)[-1] == 200
@@ -0,0 +1,61 @@
+"""
+Tests for the NetCDF download driver (src/data/download_netcdf.py)
+"""
+
+import pandas as pd
+import pytest
+
+from src.utils.config import settings
+from src.data import download_netcdf
+from src.data.download_integrity import partial_path
+from src.data.manifest import FileManifest
+
+FILE = 'aoml/1900000/profiles/R1900000_001.nc'
+
+
+@pytest.fixture
+def mirror(file_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'data_raw_dir', str(tmp_path))
+    monkeypatch.setattr(download_netcdf, 'ARGO_BASE_URL', file_server.url(''))
+    monkeypatch.setattr(download_netcdf, 'DOWNLOAD_ENGINE', 'threads')
+    monkeypatch.setattr(download_netcdf, 'RETRY_ATTEMPTS', 0)
+    file_server.files['/' + FILE] = b'CDF\x01' + bytes(i % 251 for i in range(40_000))
+    local = download_netcdf.get_netcdf_dir() / FILE
+    local.parent.mkdir(parents=True)
+    return file_server, local
+
+
+def download(file_path=FILE):
+    df = pd.DataFrame({'file': [file_path], 'date_update': ['20240101000000']})
+    download_netcdf.download_netcdf_files(df, aggregate=False)
+    with FileManifest(root=download_netcdf.get_netcdf_dir()) as manifest:
+        return manifest.completed()
+
+
+def test_complete_file_missing_from_manifest_is_verified_in_place(mirror):
+    server, local = mirror
+    local.write_bytes(server.files['/' + FILE])
+
+    assert download() == {FILE}
+    assert [method for method, *_ in server.requests] == ['HEAD']
+    assert local.read_bytes() == server.files['/' + FILE]
+
+
+def test_truncated_file_is_replaced_only_once_verified(mirror):
+    server, local = mirror
+    local.write_bytes(server.files['/' + FILE][:10_000])
+
+    assert download() == {FILE}
+    assert local.read_bytes() == server.files['/' + FILE]
+    assert not partial_path(local).exists()
+
+
+def test_failed_redownload_keeps_existing_file(mirror):
+    server, local = mirror
+    truncated = server.files['/' + FILE][:10_000]
+    local.write_bytes(truncated)
+    server.truncate['/' + FILE] = 5_000
+
+    assert download() == set()
+    # The old copy stays where the parser's fallback scan looks for it
+    assert local.read_bytes() == truncated
@@ -0,0 +1,87 @@
+"""
+Tests for index snapshot diffing (src/data/index_diff.py)
+"""
+
+import pandas as pd
+
+from src.data.index_diff import ADD, DELETE, MODIFY, compute_index_changes, get_previous_store_path
+from src.data.index_store import write_index_store
+
+
+def index_rows(files):
+    """Index DataFrame of {file: date_update} with fixed positions"""
+    return pd.DataFrame({
+        'file': list(files),
+        'date': '20230101000000',
+        'latitude': -10.0,
+        'longitude': 70.0,
+        'ocean': 'I',
+        'profiler_type': 846,
+        'institution': 'AO',
+        'date_update': list(files.values()),
+    })
+
+
+def changes(tmp_path, previous, current):
+    store_dir = tmp_path / 'index_store'
+    write_index_store(index_rows(previous), get_previous_store_path(store_dir))
+    write_index_store(index_rows(current), store_dir)
+    change_set = compute_index_changes(store_dir)
+    return change_set, change_set.changes.set_index('file')['change'].to_dict()
+
+
+def test_add_modify_delete_and_delayed_mode_rename(tmp_path):
+    previous = {
+        'aoml/2901234/profiles/R2901234_001.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_002.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_003.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_004.nc': '20230101000000',
+    }
+    current = {
+        'aoml/2901234/profiles/R2901234_001.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_002.nc': '20230601000000',
+        'aoml/2901234/profiles/D2901234_003.nc': '20230601000000',
+        'aoml/2901234/profiles/R2901234_005.nc': '20230601000000',
+    }
+
+    change_set, kinds = changes(tmp_path, previous, current)
+
+    assert kinds == {
+        'aoml/2901234/profiles/R2901234_002.nc': MODIFY,
+        'aoml/2901234/profiles/D2901234_003.nc': MODIFY,
+        'aoml/2901234/profiles/R2901234_004.nc': DELETE,
+        'aoml/2901234/profiles/R2901234_005.nc': ADD,
+    }
+    assert sorted(change_set.stale_profile_ids) == ['2901234_002', '2901234_003', '2901234_004']
+    assert sorted(change_set.obsolete_files) == [
+        'aoml/2901234/profiles/R2901234_003.nc', 'aoml/2901234/profiles/R2901234_004.nc'
+    ]
+    assert sorted(change_set.to_download) == [
+        'aoml/2901234/profiles/D2901234_003.nc',
+        'aoml/2901234/profiles/R2901234_002.nc',
+        'aoml/2901234/profiles/R2901234_005.nc',
+    ]
+
+
+def test_descending_file_changes_keep_the_ascending_profile(tmp_path):
+    previous = {
+        'aoml/2901234/profiles/R2901234_001.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_001D.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_002.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_002D.nc': '20230101000000',
+    }
+    current = {
+        'aoml/2901234/profiles/R2901234_001.nc': '20230101000000',
+        'aoml/2901234/profiles/R2901234_001D.nc': '20230601000000',
+        'aoml/2901234/profiles/R2901234_002.nc': '20230101000000',
+    }
+
+    change_set, kinds = changes(tmp_path, previous, current)
+
+    assert kinds == {
+        'aoml/2901234/profiles/R2901234_001D.nc': MODIFY,
+        'aoml/2901234/profiles/R2901234_002D.nc': DELETE,
+    }
+    # The unchanged ascending files are not re-parsed, so their rows must stay
+    assert change_set.stale_profile_ids == []
+    assert change_set.obsolete_files == ['aoml/2901234/profiles/R2901234_002D.nc']
@@ -0,0 +1,159 @@
+"""
+Tests for the Parquet lake merge (src/data/lake.py, merge_into_lake)
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.config import settings
+from src.data import lake
+from src.data.columnar import MEASUREMENT_SCHEMA, PROFILE_SCHEMA
+from src.data.lake import LEVELS, MEASUREMENTS, PROFILES, compact_lake, read_lake
+from src.data.standard_levels import LEVEL_SCHEMA, STANDARD_LEVELS
+from src.data.streaming_pipeline import _LakeParts, merge_into_lake
+
+
+def columns(schema, n, **values):
+    """Columnar parse output with the given columns and empty values elsewhere"""
+    result = {}
+    for field in schema:
+        if field.name in values:
+            result[field.name] = np.asarray(values[field.name])
+        elif field.type == 'string' or str(field.type).startswith('dictionary'):
+            result[field.name] = np.full(n, None, dtype=object)
+        elif str(field.type).startswith('fixed_size_list'):
+            result[field.name] = np.full((n, field.type.list_size), np.nan, dtype=np.float32)
+        elif str(field.type).startswith('int'):
+            result[field.name] = np.zeros(n, dtype=np.int64)
+        else:
+            result[field.name] = np.full(n, np.nan)
+    return result
+
+
+def parse_result(rows):
+    """[(profile_id, date, temperature)] -> parse_netcdf_file-like result with two levels per profile"""
+    ids = np.array([r[0] for r in rows], dtype=object)
+    dates = pd.to_datetime([r[1] for r in rows]).to_numpy()
+    temperature = np.array([r[2] for r in rows], dtype=np.float32)
+    position = {'latitude': np.full(len(rows), -10.0), 'longitude': np.full(len(rows), 70.0)}
+    level_temperature = np.full((len(rows), len(STANDARD_LEVELS)), np.nan, dtype=np.float32)
+    level_temperature[:, 0] = temperature
+    return {
+        'profiles': columns(PROFILE_SCHEMA, len(rows), profile_id=ids, date=dates, **position),
+        'measurements': columns(
+            MEASUREMENT_SCHEMA, 2 * len(rows), profile_id=np.repeat(ids, 2),
+            level=np.tile([0, 1], len(rows)), pressure=np.tile([10.0, 20.0], len(rows)),
+            temperature=np.repeat(temperature, 2),
+        ),
+        'levels': columns(LEVEL_SCHEMA, len(rows), profile_id=ids, date=dates, temperature=level_temperature, **position),
+    }
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'data_raw_dir', str(tmp_path / 'raw'))
+    # Tiny batches so merges stream several record batches per partition
+    monkeypatch.setattr(lake, 'ROW_GROUP_ROWS', 2)
+    root = tmp_path / 'raw' / 'netcdf'
+    return root, tmp_path / 'processed' / 'lake'
+
+
+def stage(parts_dir, root, files):
+    """Stage {index path: rows} like the streaming parser does"""
+    parts = _LakeParts(parts_dir, root)
+    for path, rows in files.items():
+        parts.add(root / path, parse_result(rows))
+    parts.close()
+    return [root / path for path in files]
+
+
+def lake_rows(lake_dir):
+    profiles = read_lake(PROFILES, columns=['profile_id', 'source_file', 'year', 'month'], lake_dir=lake_dir)
+    measurements = read_lake(MEASUREMENTS, columns=['profile_id', 'level', 'temperature'], lake_dir=lake_dir)
+    levels = read_lake(LEVELS, columns=['profile_id', 'temperature'], lake_dir=lake_dir)
+    return (
+        profiles.sort_values('profile_id').reset_index(drop=True),
+        measurements.assign(profile_id=measurements['profile_id'].astype(str))
+                    .sort_values(['profile_id', 'level']).reset_index(drop=True),
+        {pid: values[0] for pid, values in zip(levels['profile_id'], levels['temperature'])},
+    )
+
+
+FIRST = {
+    'aoml/1/profiles/R1_001.nc': [('1_001', '2023-01-05', 10.0), ('1_003', '2023-01-07', 12.0),
+                                  ('1_005', '2023-01-09', 14.0)],
+    'aoml/2/profiles/R2_001.nc': [('2_001', '2023-02-01', 20.0)],
+    'aoml/3/profiles/R3_001.nc': [('3_001', None, 30.0)],
+}
+
+
+def test_merge_adds_replaces_and_deletes(mirror):
+    root, lake_dir = mirror
+    compact_lake_from(FIRST, root, lake_dir)
+
+    # R1_001 re-parsed (1_003 changed, 1_005 gone), R4 new and sorting in between, R2 deleted
+    parts_dir = lake_dir.parent / '_parts_stream'
+    parsed = stage(parts_dir, root, {
+        'aoml/1/profiles/R1_001.nc': [('1_001', '2023-01-05', 10.0), ('1_003', '2023-01-07', 13.0)],
+        'aoml/1/profiles/R1_002.nc': [('1_002', '2023-01-06', 11.0)],
+    })
+    merge_into_lake(parts_dir, lake_dir, parsed, removed=['aoml/2/profiles/R2_001.nc'])
+
+    profiles, measurements, levels = lake_rows(lake_dir)
+    assert profiles['profile_id'].tolist() == ['1_001', '1_002', '1_003', '3_001']
+    assert measurements['profile_id'].tolist() == ['1_001', '1_001', '1_002', '1_002', '1_003', '1_003',
+                                                   '3_001', '3_001']
+    assert measurements.loc[measurements['profile_id'] == '1_003', 'temperature'].tolist() == [13.0, 13.0]
+    assert levels == {'1_001': 10.0, '1_002': 11.0, '1_003': 13.0, '3_001': 30.0}
+
+    # Files stay sorted, the emptied partition is gone and the staging directory removed
+    for table in (PROFILES, MEASUREMENTS, LEVELS):
+        ids = pq.read_table(lake_dir / table / 'year=2023' / 'month=1' / 'basin=indian' / 'part-0.parquet',
+                            columns=['profile_id'])['profile_id'].cast('string').to_pylist()
+        assert ids == sorted(ids)
+        assert not (lake_dir / table / 'year=2023' / 'month=2').exists()
+    assert not parts_dir.exists()
+
+
+def test_nat_dates_go_to_the_null_partition_and_merge(mirror):
+    root, lake_dir = mirror
+    compact_lake_from(FIRST, root, lake_dir)
+
+    profiles, _, _ = lake_rows(lake_dir)
+    undated = profiles[profiles['profile_id'] == '3_001']
+    assert undated['year'].isna().all() and undated['month'].isna().all()
+
+    parts_dir = lake_dir.parent / '_parts_stream'
+    parsed = stage(parts_dir, root, {'aoml/3/profiles/R3_001.nc': [('3_001', None, 31.0)]})
+    merge_into_lake(parts_dir, lake_dir, parsed)
+
+    profiles, measurements, levels = lake_rows(lake_dir)
+    assert profiles['profile_id'].tolist().count('3_001') == 1
+    assert measurements.loc[measurements['profile_id'] == '3_001', 'temperature'].tolist() == [31.0, 31.0]
+    assert levels['3_001'] == 31.0
+
+
+def test_incremental_merge_matches_full_rebuild(mirror, tmp_path):
+    root, lake_dir = mirror
+    compact_lake_from(FIRST, root, lake_dir)
+    changes = {'aoml/2/profiles/R2_001.nc': [('2_001', '2023-02-01', 21.0), ('2_002', '2023-01-03', 22.0)]}
+    parts_dir = lake_dir.parent / '_parts_stream'
+    merge_into_lake(parts_dir, lake_dir, stage(parts_dir, root, changes))
+
+    rebuilt = tmp_path / 'rebuilt'
+    compact_lake_from({**FIRST, **changes}, root, rebuilt)
+
+    for merged, full in zip(lake_rows(lake_dir), lake_rows(rebuilt)):
+        if isinstance(merged, dict):
+            assert merged == full
+        else:
+            pd.testing.assert_frame_equal(merged, full)
+
+
+def compact_lake_from(files, root, lake_dir):
+    """Full (non-incremental) compaction of staged files"""
+    parts_dir = lake_dir.parent / f'_parts_{lake_dir.name}'
+    stage(parts_dir, root, files)
+    compact_lake(parts_dir, lake_dir)
@@ -0,0 +1,87 @@
+"""
+Tests for the per-file pipeline manifest (src/data/manifest.py)
+"""
+
+import sqlite3
+
+import pytest
+
+from src.data.manifest import DONE, PENDING, FileManifest
+
+FILE = 'aoml/2901234/profiles/R2901234_001.nc'
+OTHER = 'coriolis/6901234/profiles/D6901234_010.nc'
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with FileManifest(db_path=tmp_path / 'manifest.sqlite', root=tmp_path / 'netcdf') as manifest:
+        yield manifest
+
+
+def status(manifest, path):
+    return manifest.conn.execute(
+        "SELECT parse_status, load_status, parsed_checksum, float_id FROM files WHERE path = ?", (path,)
+    ).fetchone()
+
+
+def test_manifest_without_pipeline_columns_is_migrated(tmp_path):
+    db_path = tmp_path / 'manifest.sqlite'
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL, "
+            "checksum TEXT, downloaded_at TEXT NOT NULL)"
+        )
+        conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+            [(FILE, 100, 1.0, 'a', '2024-01-01'), (OTHER, 200, 2.0, 'b', '2024-01-01')],
+        )
+    conn.close()
+
+    with FileManifest(db_path=db_path, root=tmp_path / 'netcdf') as manifest:
+        assert status(manifest, FILE) == (PENDING, PENDING, None, '2901234')
+        assert status(manifest, OTHER) == (PENDING, PENDING, None, '6901234')
+        assert manifest.files(parse_status=PENDING) == [FILE, OTHER]
+        assert manifest.statistics()['float_count'] == 2
+
+    # Opening a migrated manifest again is a no-op
+    with FileManifest(db_path=db_path, root=tmp_path / 'netcdf') as manifest:
+        assert manifest.completed() == {FILE, OTHER}
+
+
+def test_redownload_resets_status_but_keeps_parse_ledger(manifest, tmp_path):
+    local = manifest.local_path(FILE)
+    manifest.record_download(local, {'size': 100, 'mtime': 1.0, 'checksum': 'a'}, '2024-01-01')
+    manifest.mark_parsed([local], output_dir=tmp_path, ledger={local: {'size': 100, 'mtime': 1.0, 'checksum': 'a'}})
+    manifest.mark_loaded(output_dir=tmp_path)
+    assert status(manifest, FILE) == (DONE, DONE, 'a', '2901234')
+
+    manifest.record_download(local, {'size': 120, 'mtime': 2.0, 'checksum': 'b'}, '2024-02-01')
+    manifest.flush()
+
+    assert status(manifest, FILE) == (PENDING, PENDING, 'a', '2901234')
+    size, checksum, date_update = manifest.conn.execute(
+        "SELECT size, checksum, date_update FROM files WHERE path = ?", (FILE,)
+    ).fetchone()
+    assert (size, checksum, date_update) == (120, 'b', '2024-02-01')
+
+
+def test_parse_ledger_round_trip(manifest, tmp_path):
+    local, other = manifest.local_path(FILE), manifest.local_path(OTHER)
+    for path in (local, other):
+        manifest.record_download(path, {'size': 100, 'mtime': 1.0, 'checksum': 'a'})
+    manifest.mark_parsed(
+        [local, other], output_dir=tmp_path, ledger={local: {'size': 100, 'mtime': 1.0, 'checksum': 'a'}}
+    )
+
+    # Only files parsed with a ledger entry into this output directory
+    assert manifest.parse_ledger(tmp_path) == {FILE: {'size': 100, 'mtime': 1.0, 'checksum': 'a'}}
+    assert manifest.parse_ledger(tmp_path / 'elsewhere') == {}
+
+    # An identical re-download (new mtime) is marked parsed again without re-parsing
+    manifest.record_download(local, {'size': 100, 'mtime': 5.0, 'checksum': 'a'})
+    assert manifest.files(parse_status=PENDING) == [FILE]
+    manifest.refresh_parse_ledger({local: 5.0})
+
+    assert manifest.files(parse_status=DONE) == [FILE, OTHER]
+    assert manifest.parse_ledger(tmp_path)[FILE]['mtime'] == 5.0
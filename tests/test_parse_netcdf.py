@@ -0,0 +1,173 @@
+"""
+Tests for the vectorized NetCDF parser (src/data/parse_netcdf.py)
+"""
+
+import netCDF4
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from src.data.columnar import QC_MISSING
+from src.data.parse_netcdf import _qc_flags, parse_netcdf_file
+from src.data.standard_levels import STANDARD_LEVELS, level_index
+
+FILL = 99999.0
+PRESSURE = [5.0, 10.0, 20.0, 50.0, 100.0]
+
+
+def chars(rows):
+    """['1 41', ...] -> (N_PROF, N_LEVELS) S1 array"""
+    return np.array([list(row) for row in rows], dtype='S1')
+
+
+def write_prof(path, cycles, modes, temperature, temperature_qc, adjusted=None, adjusted_qc=None):
+    """Minimal ARGO profile file with PRES/TEMP/PSAL blocks and their QC"""
+    n_prof, n_levels = len(cycles), len(PRESSURE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with netCDF4.Dataset(path, 'w', format='NETCDF3_CLASSIC') as nc:
+        nc.createDimension('N_PROF', n_prof)
+        nc.createDimension('N_LEVELS', n_levels)
+
+        def variable(name, dtype, dims, values, fill=None):
+            var = nc.createVariable(name, dtype, dims, fill_value=fill)
+            var[:] = values
+            return var
+
+        variable('CYCLE_NUMBER', 'i4', ('N_PROF',), cycles, fill=99999)
+        variable('DATA_MODE', 'S1', ('N_PROF',), np.array(list(modes), dtype='S1'))
+        variable('LATITUDE', 'f8', ('N_PROF',), np.full(n_prof, -10.0), fill=FILL)
+        variable('LONGITUDE', 'f8', ('N_PROF',), np.full(n_prof, 70.0), fill=FILL)
+        juld = variable('JULD', 'f8', ('N_PROF',), 26000.5 + np.arange(n_prof), fill=999999.0)
+        juld.units = 'days since 1950-01-01 00:00:00 UTC'
+
+        levels = ('N_PROF', 'N_LEVELS')
+        temperature = np.asarray(temperature, dtype=np.float64)
+        blank = chars([' ' * n_levels] * n_prof)
+        pressure = np.where(np.isnan(temperature), FILL, np.array(PRESSURE))
+        variable('PRES', 'f4', levels, pressure, fill=FILL)
+        variable('PRES_QC', 'S1', levels, chars(['1' * n_levels] * n_prof))
+        variable('TEMP', 'f4', levels, np.nan_to_num(temperature, nan=FILL), fill=FILL)
+        variable('TEMP_QC', 'S1', levels, chars(temperature_qc))
+        variable('PSAL', 'f4', levels, np.where(np.isnan(temperature), FILL, 35.0), fill=FILL)
+        variable('PSAL_QC', 'S1', levels, chars(['1' * n_levels] * n_prof))
+
+        adjusted = np.full(temperature.shape, np.nan) if adjusted is None else np.asarray(adjusted, dtype=np.float64)
+        variable('PRES_ADJUSTED', 'f4', levels, np.where(np.isnan(adjusted), FILL, pressure), fill=FILL)
+        variable('PRES_ADJUSTED_QC', 'S1', levels, np.where(np.isnan(adjusted), blank, b'1'))
+        variable('TEMP_ADJUSTED', 'f4', levels, np.nan_to_num(adjusted, nan=FILL), fill=FILL)
+        variable('TEMP_ADJUSTED_QC', 'S1', levels, blank if adjusted_qc is None else chars(adjusted_qc))
+        variable('PSAL_ADJUSTED', 'f4', levels, np.where(np.isnan(adjusted), FILL, 35.1), fill=FILL)
+        variable('PSAL_ADJUSTED_QC', 'S1', levels, np.where(np.isnan(adjusted), blank, b'1'))
+    return path
+
+
+@pytest.fixture
+def aggregate(tmp_path):
+    nan = np.nan
+    temperature = [
+        [20.0, 19.0, 99.0, 15.0, nan],   # R, blank mode; level 2 flagged bad, level 4 empty
+        [21.0, 20.0, 18.0, 14.0, 12.0],  # A: adjusted values are the best ones
+        [22.0, 21.0, 19.0, 15.0, 13.0],  # Same cycle again (descending profile)
+        [23.0, 22.0, 20.0, 16.0, 14.0],  # Fill-valued cycle number
+    ]
+    adjusted = np.full((4, 5), nan)
+    adjusted[1:] = np.array(temperature[1:]) + 0.5
+    return write_prof(
+        tmp_path / '2901234' / '2901234_prof.nc',
+        cycles=np.ma.masked_array([1, 2, 2, 0], mask=[0, 0, 0, 1]),
+        modes=' ADD',
+        temperature=temperature,
+        temperature_qc=['1141 ', '11111', '11111', '11111'],
+        adjusted=adjusted,
+        adjusted_qc=['     ', '12111', '11111', '11111'],
+    )
+
+
+def reference_measurements(path):
+    """Per-profile, per-level reading of the kept profiles, like the pre-vectorized parser"""
+    rows = []
+    with netCDF4.Dataset(path) as nc:
+        nc.set_auto_mask(True)
+        for p, cycle in enumerate(nc['CYCLE_NUMBER'][:]):
+            mode = nc['DATA_MODE'][p].tobytes().decode().strip() or 'R'
+            if np.ma.is_masked(cycle) or f"2901234_{cycle:03d}" in {r[0] for r in rows}:
+                continue
+            for level in range(len(PRESSURE)):
+                raw = nc['TEMP'][p, level]
+                adjusted = nc['TEMP_ADJUSTED'][p, level]
+                if np.ma.is_masked(raw) and np.ma.is_masked(adjusted) and np.ma.is_masked(nc['PRES'][p, level]):
+                    continue
+                use_adjusted = mode in 'AD'
+                qc = (nc['TEMP_ADJUSTED_QC'] if use_adjusted else nc['TEMP_QC'])[p, level].tobytes().decode()
+                best = adjusted if use_adjusted else raw
+                rows.append((
+                    f"2901234_{cycle:03d}", level, float(nc['PRES'][p, level]),
+                    float(raw), float(best), int(qc) if qc.strip() else QC_MISSING,
+                ))
+    return rows
+
+
+def test_profiles_keep_one_row_per_known_cycle(aggregate):
+    result = parse_netcdf_file(aggregate)
+
+    assert result['success'], result['error']
+    profiles = result['profiles']
+    assert profiles['profile_id'].tolist() == ['2901234_001', '2901234_002']
+    assert profiles['cycle_number'].tolist() == [1, 2]
+    assert profiles['data_mode'].tolist() == ['R', 'A']
+    assert profiles['float_id'].tolist() == ['2901234', '2901234']
+    assert pd.Timestamp(profiles['date'][0]) == pd.Timestamp('1950-01-01') + pd.Timedelta(days=26000.5)
+    assert result['levels']['profile_id'].tolist() == ['2901234_001', '2901234_002']
+
+
+def test_measurements_match_per_profile_reading(aggregate):
+    m = parse_netcdf_file(aggregate)['measurements']
+
+    rows = list(zip(
+        m['profile_id'], m['level'].tolist(), m['pressure'].tolist(),
+        m['temperature'].tolist(), m['temperature_best'].tolist(), m['temperature_best_qc'].tolist(),
+    ))
+    assert rows == reference_measurements(aggregate)
+    # Adjusted values for the A-mode profile, raw ones (and raw QC) for R mode
+    assert m['temperature_best'][m['profile_id'] == '2901234_002'].tolist() == [21.5, 20.5, 18.5, 14.5, 12.5]
+    assert m['temperature_best_qc'][m['profile_id'] == '2901234_001'].tolist() == [1, 1, 4, 1]
+    assert m['temperature_adjusted_qc'][m['profile_id'] == '2901234_001'].tolist() == [QC_MISSING] * 4
+
+
+def test_standard_levels_use_good_best_values(aggregate):
+    levels = parse_netcdf_file(aggregate)['levels']
+    temperature = levels['temperature']
+
+    assert temperature[0, level_index(5)] == 20.0
+    assert temperature[1, level_index(10)] == 20.5
+    # The QC-4 value at 20 dbar is replaced by interpolation between 10 and 50 dbar
+    assert temperature[0, level_index(20)] == pytest.approx(19.0 + (15.0 - 19.0) * 10 / 40)
+    # Beyond the deepest good level
+    assert np.isnan(temperature[0, level_index(100)])
+    assert temperature.shape == (2, len(STANDARD_LEVELS))
+
+
+def test_fill_cycle_of_single_profile_file_comes_from_its_name(tmp_path):
+    path = write_prof(
+        tmp_path / '2901234' / 'profiles' / 'R2901234_007.nc',
+        cycles=np.ma.masked_array([0], mask=[1]), modes='R',
+        temperature=[[20.0, 19.0, 18.0, 15.0, 12.0]], temperature_qc=['11111'],
+    )
+
+    result = parse_netcdf_file(path)
+
+    assert result['profiles']['profile_id'].tolist() == ['2901234_007']
+    assert set(result['measurements']['profile_id']) == {'2901234_007'}
+
+
+def test_qc_flags_decode_chars_blanks_and_object_fill():
+    ds = xr.Dataset({
+        'TEMP_QC': (('N_PROF', 'N_LEVELS'), np.array([[b'1', b' ', b'9', b'A']], dtype='S1')),
+        'PSAL_QC': (('N_PROF', 'N_LEVELS'), np.array([[b'1', np.nan, b'3', b'4']], dtype=object)),
+    })
+
+    assert _qc_flags(ds, 'TEMP_QC', (1, 4)).tolist() == [[1, QC_MISSING, 9, QC_MISSING]]
+    assert _qc_flags(ds, 'PSAL_QC', (1, 4)).tolist() == [[1, QC_MISSING, 3, 4]]
+    assert _qc_flags(ds, 'PRES_QC', (1, 4)).tolist() == [[1, 1, 1, 1]]
+    assert _qc_flags(ds, 'PRES_QC', (1, 4), missing=QC_MISSING).tolist() == [[QC_MISSING] * 4]
@@ -0,0 +1,63 @@
+"""
+Tests for download priority ordering (src/data/scheduler.py)
+"""
+
+import pandas as pd
+import pytest
+
+from src.utils.config import settings
+from src.data.scheduler import prioritize
+
+
+def selection():
+    return pd.DataFrame({
+        'file': [
+            'aoml/1/profiles/R1_001.nc',      # Pacific, 2020
+            'aoml/2/profiles/D2_001.nc',      # Indian, 2021
+            'aoml/3/profiles/R3_001.nc',      # Indian, 2023
+            'aoml/4/profiles/D4_001.nc',      # Pacific, 2023
+            'aoml/5/profiles/R5_001.nc',      # Indian, undated
+        ],
+        'date': pd.to_datetime(['2020-01-01', '2021-01-01', '2023-01-01', '2023-01-01', None]),
+        'latitude': [0.0, -10.0, -10.0, 0.0, -10.0],
+        'longitude': [-150.0, 70.0, 70.0, -150.0, 70.0],
+    })
+
+
+def order(df, **kwargs):
+    return [f.split('/')[1] for f in prioritize(df, **kwargs)['file']]
+
+
+def test_newest_first_with_undated_last_and_stable_ties():
+    assert order(selection(), criteria='newest') == ['3', '4', '2', '1', '5']
+
+
+def test_criteria_combine_most_significant_first():
+    df = selection()
+
+    assert order(df, criteria='regions,newest', regions='Indian Ocean') == ['3', '2', '5', '4', '1']
+    assert order(df, criteria=['delayed', 'newest']) == ['4', '2', '3', '1', '5']
+
+
+def test_defaults_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, 'download_priority', 'regions, delayed')
+    monkeypatch.setattr(settings, 'download_priority_regions', 'Pacific Ocean')
+
+    result = prioritize(selection())
+
+    assert [f.split('/')[1] for f in result['file']] == ['4', '1', '2', '3', '5']
+    assert result['priority'].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_change_sets_fall_back_to_date_update_and_skip_regions():
+    changes = pd.DataFrame({
+        'file': ['aoml/1/profiles/R1_001.nc', 'aoml/2/profiles/R2_001.nc'],
+        'date_update': pd.to_datetime(['2024-01-01', '2024-03-01']),
+    })
+
+    assert order(changes, criteria='regions,newest', regions='Indian Ocean') == ['2', '1']
+
+
+def test_unknown_criterion_is_rejected():
+    with pytest.raises(ValueError, match='Unknown download priority'):
+        prioritize(selection(), criteria='biggest')
@@ -0,0 +1,63 @@
+"""
+Tests for the H3 spatial index (src/data/spatial.py)
+"""
+
+import h3
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.data.spatial import h3_cells, profile_density
+
+POSITIONS = [  # (float_id, datetime, latitude, longitude)
+    (1, '2023-01-05 00:00:00', -10.0, 70.0),
+    (1, '2023-01-15 00:00:00', -10.01, 70.01),
+    (2, '2023-03-01 00:00:00', -10.0, 70.0),
+    (3, '2023-02-01 00:00:00', 40.0, -30.0),
+]
+
+
+@pytest.fixture
+def engine():
+    """SQLite stand-in for the argo_profiles / ocean_region_cells columns the query uses"""
+    engine = create_engine("sqlite://")
+    cells = h3_cells([p[2] for p in POSITIONS], [p[3] for p in POSITIONS])
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE argo_profiles (profile_id INTEGER PRIMARY KEY, float_id INTEGER, "
+            "profile_datetime TIMESTAMP, h3_index_res7 TEXT, h3_index_res5 TEXT, h3_index_res3 TEXT)"
+        ))
+        conn.execute(text("CREATE TABLE ocean_region_cells (region_name TEXT, h3_index_res3 TEXT)"))
+        for i, (float_id, when, _, _) in enumerate(POSITIONS):
+            conn.execute(text(
+                "INSERT INTO argo_profiles VALUES (:id, :float_id, :when, :res7, :res5, :res3)"
+            ), {'id': i, 'float_id': float_id, 'when': when, 'res7': cells['h3_index_res7'][i],
+                'res5': cells['h3_index_res5'][i], 'res3': cells['h3_index_res3'][i]})
+        conn.execute(text("INSERT INTO ocean_region_cells VALUES ('Indian Ocean', :cell)"),
+                     {'cell': cells['h3_index_res3'][0]})
+    return engine
+
+
+def test_h3_cells_match_the_library_parents():
+    cells = h3_cells([-10.0, 40.0, np.nan], [70.0, -30.0, 0.0])
+    assert cells['h3_index_res7'][0] == h3.latlng_to_cell(-10.0, 70.0, 7)
+    assert cells['h3_index_res3'][1] == h3.cell_to_parent(h3.latlng_to_cell(40.0, -30.0, 7), 3)
+    assert all(cells[name][2] is None for name in cells)
+
+
+def test_profile_density_groups_on_cells(engine):
+    density = profile_density(engine, resolution=3).sort_values('profiles', ascending=False)
+    assert density['profiles'].tolist() == [3, 1]
+    assert density['floats'].tolist() == [2, 1]
+    lat, lon = h3.cell_to_latlng(density['h3_cell'].iloc[0])
+    assert (density['latitude'].iloc[0], density['longitude'].iloc[0]) == (lat, lon)
+
+
+def test_profile_density_filters_region_and_dates(engine):
+    density = profile_density(engine, resolution=3, region='Indian Ocean',
+                              date_start='2023-01-10', date_end='2023-02-28')
+    assert density['profiles'].tolist() == [1]
+    assert density['floats'].tolist() == [1]
+
+    with pytest.raises(ValueError):
+        profile_density(engine, resolution=4)
@@ -0,0 +1,48 @@
+"""
+Tests for per-profile summaries (src/data/summaries.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data.summaries import summarize_profiles, to_blocks
+
+PRESSURE = [5.0, 10.0, 20.0, 30.0, 40.0, 50.0, np.nan]
+TEMPERATURE = [20.0, 20.0, 19.9, 19.8, 15.0, 10.0, np.nan]
+SALINITY = [35.0] * 6 + [np.nan]
+# 0.03 kg/m³ above the 10 dbar reference is first reached at 40 dbar
+SIGMA_THETA = [25.0, 25.0, 25.01, 25.02, 25.05, 26.0, np.nan]
+
+
+def summarize(rows):
+    """Summaries of profiles given as level index lists into the columns above"""
+    block = lambda values: np.array([[values[i] for i in row] for row in rows])
+    pressure = block(PRESSURE)
+    qc = np.where(np.isnan(pressure), 9, 1)
+    return summarize_profiles(pressure, block(TEMPERATURE), block(SALINITY), qc, qc,
+                              pressure, block(SIGMA_THETA))
+
+
+def test_known_mixed_layer_thermocline_and_surface():
+    summary = summarize([[0, 1, 2, 3, 4, 5, 6]])
+    assert summary['mixed_layer_depth'][0] == 40.0
+    # Steepest decrease below the mixed layer is 40-50 dbar
+    assert summary['thermocline_depth'][0] == 45.0
+    assert summary['surface_temperature'][0] == 20.0
+    assert summary['measurement_count'][0] == 6
+
+
+def test_descending_profiles_match_ascending():
+    ascending = summarize([[0, 1, 2, 3, 4, 5, 6]])
+    # Deepest-first, padded at the end like a D file, and shuffled
+    descending = summarize([[5, 4, 3, 2, 1, 0, 6], [3, 0, 5, 1, 4, 2, 6]])
+    for name, values in ascending.items():
+        np.testing.assert_array_equal(descending[name], np.repeat(values, 2), err_msg=name)
+
+
+def test_to_blocks_orders_levels_by_pressure():
+    df = pd.DataFrame({'profile_id': ['b', 'a', 'a', 'b', 'a'],
+                       'pressure': [20.0, 30.0, 10.0, 5.0, 20.0]})
+    blocks, valid = to_blocks(df, ['a', 'b'], ['pressure'])
+    np.testing.assert_array_equal(blocks['pressure'], [[10.0, 20.0, 30.0], [5.0, 20.0, np.nan]])
+    np.testing.assert_array_equal(valid, [[True, True, True], [True, True, False]])